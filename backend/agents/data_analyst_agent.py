@@ -4,13 +4,20 @@ import json
 from typing import Dict, List, Optional
 import time
 
-import openai
-
 from ..utils.logger import logger
+from ..utils.llm import get_client
+from ..utils.model_router import has_fields, run_cascade
+from ..utils.structured_output import StructuredOutputError, complete_json
+from ..tools import brave_news
+from .schemas import Analysis
 
-client = openai.OpenAI()
+# Keys of the analyst's JSON answer
+ANALYSIS_KEYS = tuple(Analysis.model_fields)
+# Fields that must be non-empty for an answer to be kept
+ANALYSIS_REQUIRED = ("company_summary", "sector")
 
-from ..tools import brave_news
+# Prompt characters reserved for passages retrieved from the crawled site
+SITE_PASSAGES_CHARS = 6000
 
 
 def make_prompt(
@@ -18,6 +25,7 @@ def make_prompt(
     linkedin_data: Dict[str, object],
     news_data: Dict[str, object],
     extra_search: Optional[List[Dict[str, str]]] = None,
+    site_passages: Optional[Dict[str, List[str]]] = None,
 ) -> str:
     """Construct the Data Analyst Agent prompt."""
     return (
@@ -32,17 +40,21 @@ def make_prompt(
         "Your job: Synthesize all this data into a concise, practical, and actionable summary for a sales team. "
         "Focus on insights that would help a sales rep decide how, why, and to whom to reach out. "
         "Highlight decision-makers, sales opportunities, recent developments, and anything that could impact a sales pitch. "
-        "Include information on production technology, machinery used, services offered, and R&D activities whenever available.\n"
+        "Include the foundation year, production capacity, production technology, machinery used, services offered, "
+        "R&D activities, customer references and growth signals (investments, new facilities, hiring) whenever available.\n"
         "\n"
         "Output only valid JSON using this format:\n"
         "{\n"
         '  "company_summary": "",\n'
         '  "sector": "",\n'
+        '  "foundation": "",\n'
         '  "products_services": "",\n'
+        '  "production_capacity": "",\n'
         '  "production_technology": "",\n'
         '  "machinery": "",\n'
         '  "services": "",\n'
         '  "r_and_d": "",\n'
+        '  "references": ["", ""],\n'
         '  "decision_makers": [\n'
         '    {"full_name": "", "title": "", "summary": ""}\n'
         "  ],\n"
@@ -50,6 +62,7 @@ def make_prompt(
         '  "company_size": "",\n'
         '  "location": "",\n'
         '  "sales_signals": ["", ""],\n'
+        '  "growth_signals": ["", ""],\n'
         '  "recent_news": ["", ""],\n'
         '  "risks": "",\n'
         '  "actionable_insights": ["", ""]\n'
@@ -61,41 +74,78 @@ def make_prompt(
         f"LinkedIn Output (JSON): {json.dumps(linkedin_data)[:1000]}\n"
         f"News (JSON): {json.dumps(news_data)[:1000]}\n"
         f"Extra Search Results (JSON): {json.dumps(extra_search or [])[:1000]}"
+        + (
+            "\nWebsite Passages by Field (JSON, excerpts from the crawled pages): "
+            f"{json.dumps(site_passages, ensure_ascii=False)[:SITE_PASSAGES_CHARS]}"
+            if site_passages
+            else ""
+        )
     )
 
 
+def analysis_result(
+    data: Dict[str, object],
+    linkedin_data: Dict[str, object],
+    news_data: Dict[str, object],
+    duration_ms: int,
+) -> Dict[str, object]:
+    """Build the analysis step output from the analyst's answer ``data``."""
+    # Only use decision makers provided by the LinkedIn agent
+    data["decision_makers"] = linkedin_data.get("contacts", [])
+    summary = json.dumps(data, ensure_ascii=False)
+    return {"summary": summary, "news": news_data.get("news", []), "duration_ms": duration_ms}
+
+
 def analyze_data(
     scrape_data: Dict[str, str],
     linkedin_data: Dict[str, object],
     query: str,
     extra_search: Optional[List[Dict[str, str]]] = None,
+    news_data: Optional[Dict[str, object]] = None,
+    site_passages: Optional[Dict[str, List[str]]] = None,
 ) -> Dict[str, str]:
-    """Run the Data Analyst agent and return final summary."""
+    """Run the Data Analyst agent and return final summary.
+
+    News is fetched with :func:`brave_news` unless ``news_data`` is given.
+    ``site_passages`` maps missing fields to passages of the crawled pages.
+    The answer is constrained to the :class:`Analysis` schema and the
+    ``analysis`` model cascade escalates to the large model when the summary
+    or sector is empty.
+    """
     step = "LLM3-DataAnalystAgent"
     start = time.perf_counter()
-    try:
-        news_data = brave_news(query)
-    except Exception:
-        news_data = {"news": []}
+    if news_data is None:
+        try:
+            news_data = brave_news(query)
+        except Exception:
+            news_data = {"news": []}
 
-    prompt = make_prompt(scrape_data, linkedin_data, news_data, extra_search)
+    prompt = make_prompt(scrape_data, linkedin_data, news_data, extra_search, site_passages)
     logger.info("%s INPUT: %s", step, prompt)
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
+    def ask(model: str) -> Dict[str, object]:
+        analysis = complete_json(
+            get_client(),
+            "analysis",
+            model,
+            [{"role": "user", "content": prompt}],
+            Analysis,
         )
-        summary = response.choices[0].message.content
-        duration_ms = int((time.perf_counter() - start) * 1000)
-        logger.info("%s OUTPUT (%d ms): %s", step, duration_ms, summary)
+        logger.info("%s OUTPUT (%s): %s", step, model, analysis.model_dump_json())
+        return analysis.model_dump()
+
+    try:
         try:
-            data = json.loads(summary)
-        except json.JSONDecodeError:
-            data = {}
-        # Only use decision makers provided by the LinkedIn agent
-        data["decision_makers"] = linkedin_data.get("contacts", [])
-        summary = json.dumps(data, ensure_ascii=False)
-        return {"summary": summary, "news": news_data.get("news", []), "duration_ms": duration_ms}
+            data = run_cascade(
+                "analysis",
+                ask,
+                lambda data: has_fields(data, ANALYSIS_KEYS, required=ANALYSIS_REQUIRED),
+            )
+        except StructuredOutputError as exc:
+            logger.warning("%s no valid answer: %s", step, exc)
+            data = Analysis().model_dump()
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        logger.info("%s OUTPUT (%d ms)", step, duration_ms)
+        return analysis_result(data, linkedin_data, news_data, duration_ms)
     except Exception as exc:
         logger.exception("%s ERROR: %s", step, exc)
         raise
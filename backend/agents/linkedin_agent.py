@@ -3,20 +3,26 @@
 Ajan asla içerik uydurmaz, sadece harici API araması sonucu veri döndürür.
 """
 
+import os
 from typing import Dict, List
 import time
 
 from ..utils.logger import logger
+from ..utils.provider_health import CircuitOpenError, call_with_health
+from ..utils.singleflight import SingleFlight
+from ..tools.contact_resolution import parse_title, resolve_contacts
+from ..tools.result_merge import merge_results
 from ..tools.search_tools import serpapi_search, brave_search, google_cse_search
 
+# Merged search results kept per company
+LINKEDIN_MAX_RESULTS = int(os.getenv("LINKEDIN_MAX_RESULTS", "30"))
+# Contacts kept after duplicates are merged, most senior first
+LINKEDIN_MAX_CONTACTS = int(os.getenv("LINKEDIN_MAX_CONTACTS", "10"))
+
 
 def _parse_contact(result: Dict[str, str]) -> Dict[str, str]:
     """Return contact dict from a search result."""
-    title = result.get("title", "")
-    name = title.split("-")[0].split("|")[0].strip()
-    role = ""
-    if "-" in title:
-        role = title.split("-")[1].split("|")[0].strip()
+    name, role = parse_title(result.get("title", ""))
     return {
         "full_name": name,
         "title": role,
@@ -25,16 +31,30 @@ def _parse_contact(result: Dict[str, str]) -> Dict[str, str]:
     }
 
 
+_searches = SingleFlight("linkedin_search")
+
+
 def _search_all(query: str) -> Dict[str, List[Dict[str, str]]]:
-    """Run SerpAPI, Brave and Google searches."""
+    """Run SerpAPI, Brave and Google searches.
+
+    Engines whose circuit is open are skipped and return no results.
+    Concurrent identical queries share one set of searches.
+    """
+    return _searches.do(" ".join(query.lower().split()), _run_engines, query)
+
+
+def _run_engines(query: str) -> Dict[str, List[Dict[str, str]]]:
     results = {"serpapi": [], "brave": [], "google": []}
     for name, func in [
         ("serpapi", serpapi_search),
         ("brave", brave_search),
         ("google", google_cse_search),
     ]:
+        label = "google_cse" if name == "google" else name
         try:
-            results[name] = func(query)
+            results[name] = call_with_health(label, func, query)
+        except CircuitOpenError:
+            logger.info("%s search skipped: circuit open", name)
         except Exception as exc:
             logger.exception("%s search failed: %s", name, exc)
 
@@ -42,24 +62,29 @@ def _search_all(query: str) -> Dict[str, List[Dict[str, str]]]:
 
 
 def orchestrate_linkedin(company: str, contacts: bool = False) -> Dict[str, object]:
-    """Find LinkedIn info using external search engines only."""
+    """Find LinkedIn info using external search engines only.
+
+    Results of all engines are merged, so a profile found by several
+    engines yields one contact. Contacts that are the same person under
+    slightly different names are merged too and ranked by seniority.
+    """
     step = "LinkedInAgent"
     logger.info("%s INPUT: %s", step, company)
     start = time.perf_counter()
 
     query = f"site:linkedin.com/in OR site:linkedin.com/company {company}"
-    search_results = _search_all(query)
+    search_results = merge_results(_search_all(query), limit=LINKEDIN_MAX_RESULTS)
 
     linkedin_url = ""
     contact_list: List[Dict[str, str]] = []
 
-    for source_results in search_results.values():
-        for res in source_results:
-            url = res.get("url", "")
-            if not linkedin_url and "linkedin.com/company" in url:
-                linkedin_url = url
-            if contacts and "linkedin.com/in" in url:
-                contact_list.append(_parse_contact(res))
+    for res in search_results:
+        url = res.get("url", "")
+        if not linkedin_url and "linkedin.com/company" in url:
+            linkedin_url = url
+        if contacts and "linkedin.com/in" in url:
+            contact_list.append(_parse_contact(res))
+    contact_list = resolve_contacts(contact_list, limit=LINKEDIN_MAX_CONTACTS)
 
     note = ""
     if not linkedin_url and not contact_list:
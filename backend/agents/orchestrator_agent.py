@@ -1,6 +1,6 @@
 """Orchestrator agent that runs the full company analysis pipeline."""
 
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 import json
 import time
 
@@ -9,62 +9,156 @@ from .linkedin_agent import orchestrate_linkedin
 from .data_analyst_agent import analyze_data
 from .enhanced_search_agent import targeted_search
 from .reporter_agent import generate_report
+from ..tools.passage_index import PassageIndex, field_passages
+from ..utils import canonical_url
 from ..utils.logger import logger
+from ..utils.checkpoint_store import get_checkpoints
+from ..utils.singleflight import SingleFlight
+
+_pipelines = SingleFlight("pipeline")
+
+
+class _Stages:
+    """Run pipeline stages, reusing outputs checkpointed by an earlier attempt."""
+
+    def __init__(self, run_id: Optional[str]) -> None:
+        self.run_id = run_id
+        self.done: Dict[str, Any] = {}
+        self.store = get_checkpoints() if run_id else None
+        if self.store:
+            try:
+                self.done = self.store.load(run_id)
+            except Exception as exc:
+                logger.warning("Pipeline checkpoints unavailable for %s: %s", run_id, exc)
+                self.store = None
+
+    def run(self, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if name in self.done:
+            logger.info("Pipeline RESUME %s: %s from checkpoint", self.run_id, name)
+            return self.done[name]
+        output = func(*args, **kwargs)
+        if self.store:
+            try:
+                self.store.save(self.run_id, name, output)
+            except Exception as exc:
+                logger.warning("Pipeline checkpoint %s failed: %s", name, exc)
+        return output
+
+    def clear(self) -> None:
+        if self.store:
+            try:
+                self.store.clear(self.run_id)
+            except Exception as exc:
+                logger.warning("Pipeline checkpoint cleanup failed for %s: %s", self.run_id, exc)
+
+
+# Fields of the ``Analysis`` schema whose absence triggers another lookup round
+ANALYSIS_FIELDS = [
+    "foundation",
+    "production_capacity",
+    "production_technology",
+    "machinery",
+    "services",
+    "r_and_d",
+    "references",
+    "decision_makers",
+    "growth_signals",
+]
+
+
+def _missing_fields(analysis_result: Dict[str, Any]) -> List[str]:
+    try:
+        summary_data = json.loads(analysis_result.get("summary", "{}"))
+    except json.JSONDecodeError:
+        summary_data = {}
+    return [field for field in ANALYSIS_FIELDS if not summary_data.get(field)]
+
+
+def _site_passages(scrape_result: Dict[str, Any], missing: List[str]) -> Dict[str, List[str]]:
+    """Return passages of the crawled pages for the ``missing`` fields."""
+    try:
+        index = PassageIndex.from_html(scrape_result.get("html", ""))
+    except Exception as exc:
+        logger.warning("Pipeline passage index failed: %s", exc)
+        return {}
+    passages = field_passages(index, missing)
+    logger.info("Pipeline site passages for %s of %s (%d passages)", sorted(passages), missing, len(index))
+    return passages
 
 
 def run_pipeline(
     company_url: str,
     company_name: Optional[str] = None,
     depth: int = 1,
+    run_id: Optional[str] = None,
 ) -> Dict[str, object]:
     """Run scraping, LinkedIn enrichment and final analysis.
 
     ``depth`` is forwarded to :func:`orchestrate_scraping`. Passing ``0``
     disables internal crawling and only the main page is scraped.
+    Concurrent calls for the same website and parameters share one run.
+
+    With a ``run_id`` every completed stage is checkpointed; calling again
+    with the same id after a failure resumes at the first incomplete stage.
+    Checkpoints are removed once the run succeeds. Runs with a ``run_id``
+    only share a flight with calls for the same id, so their checkpoints are
+    always written.
     """
+    key = (canonical_url(company_url), (company_name or "").strip().lower(), max(0, depth), run_id)
+    return _pipelines.do(key, _run_pipeline, company_url, company_name, depth, run_id)
+
+
+def _run_pipeline(
+    company_url: str,
+    company_name: Optional[str],
+    depth: int,
+    run_id: Optional[str] = None,
+) -> Dict[str, object]:
     step = "Pipeline"
     logger.info("%s START: %s %s", step, company_url, company_name)
     start = time.perf_counter()
     depth = max(0, depth)
+    stages = _Stages(run_id)
     try:
-        scrape_result = orchestrate_scraping(company_url, depth)
+        scrape_result = stages.run("scrape", orchestrate_scraping, company_url, depth)
         if not company_name:
             company_name = scrape_result.get("company_name", company_url)
-        linkedin_result = orchestrate_linkedin(company_name, contacts=True)
-        analysis_result = analyze_data(scrape_result, linkedin_result, company_name)
+        linkedin_result = stages.run("linkedin", orchestrate_linkedin, company_name, contacts=True)
+        analysis_result = stages.run("analysis", analyze_data, scrape_result, linkedin_result, company_name)
 
-        # Check for missing fields and retry with enhanced search if needed
+        # Check for missing fields: first look them up in the crawled pages,
+        # then retry with enhanced search for whatever is still missing
         max_retries = 3
         retries = 0
+        site_passages: Optional[Dict[str, Any]] = None
         while True:
-            try:
-                summary_data = json.loads(analysis_result.get("summary", "{}"))
-            except json.JSONDecodeError:
-                summary_data = {}
-            missing = [
-                field
-                for field in [
-                    "foundation",
-                    "production_capacity",
-                    "production_technology",
-                    "machinery",
-                    "services",
-                    "r_and_d",
-                    "references",
-                    "decision_makers",
-                    "growth_signals",
-                ]
-                if not summary_data.get(field)
-            ]
-            if not missing or retries >= max_retries:
+            missing = _missing_fields(analysis_result)
+            if not missing:
+                break
+            if site_passages is None:
+                site_passages = _site_passages(scrape_result, missing)
+                if site_passages:
+                    analysis_result = stages.run(
+                        "analysis:site",
+                        analyze_data,
+                        scrape_result,
+                        linkedin_result,
+                        company_name,
+                        site_passages=site_passages,
+                    )
+                    continue
+            if retries >= max_retries:
                 break
             iter_start = time.perf_counter()
-            search_results = targeted_search(company_name, missing)
-            analysis_result = analyze_data(
+            search_results = stages.run(f"search:{retries + 1}", targeted_search, company_name, missing)
+            analysis_result = stages.run(
+                f"analysis:{retries + 1}",
+                analyze_data,
                 scrape_result,
                 linkedin_result,
                 company_name,
                 search_results,
+                site_passages=site_passages or None,
             )
             duration = time.perf_counter() - iter_start
             logger.info(
@@ -72,7 +166,14 @@ def run_pipeline(
             )
             retries += 1
 
-        report_result = generate_report(analysis_result.get("summary", "{}"), tool_mode=True)
+        report_result = stages.run(
+            "report",
+            generate_report,
+            analysis_result.get("summary", "{}"),
+            prefetch=True,
+            company=company_name,
+            news=analysis_result.get("news"),
+        )
         duration_ms = int((time.perf_counter() - start) * 1000)
         result = {
             "scrape": scrape_result,
@@ -88,6 +189,7 @@ def run_pipeline(
             },
         }
         logger.info("%s OUTPUT (%d ms): %s", step, duration_ms, result)
+        stages.clear()
         return result
     except Exception as exc:
         logger.exception("%s ERROR: %s", step, exc)
@@ -2,13 +2,21 @@
 
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import json
-from typing import Any, Dict
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 import time
 
-import openai
+from pydantic import ValidationError
 
+from ..utils import metrics
 from ..utils.logger import logger
+from ..utils.llm import get_client
+from ..utils.model_router import models_for
+from ..utils.report_renderer import SECTION_KEYS, STYLE_SNIPPET, render_report
+from ..utils.structured_output import response_format
 from ..tools import (
     linkedin_search,
     newsfinder,
@@ -18,6 +26,7 @@ from ..tools import (
     serpapi_web_search,
     google_custom_search,
 )
+from .schemas import ReportSections
 
 # Map tool names to callables for easier dispatching
 TOOL_DISPATCH = {
@@ -36,29 +45,121 @@ def dispatch_tool_call(name: str, params: Dict[str, Any]) -> Any:
     func = TOOL_DISPATCH.get(name)
     return func(params) if func else {}
 
-client = openai.OpenAI()
-
-# Basic CSS snippet for Delta Proje sales reports
-STYLE_SNIPPET = """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@700&family=Open+Sans:wght@400&display=swap');
-body{font-family:'Open Sans',sans-serif;background:#F5F6FA;color:#003366;margin:0;padding:40px 0;}
-.container{max-width:850px;margin:auto;background:#fff;padding:40px 60px;border-radius:12px;box-shadow:0 2px 10px rgba(0,0,0,0.06);}
-h1,h2,h3{font-family:'Montserrat',sans-serif;font-weight:700;margin-top:0;color:#003366;}
-h1{font-size:32px;margin-bottom:20px;}
-h2{font-size:26px;margin-bottom:12px;}
-section{margin-bottom:40px;}
-section+section{border-top:1px solid #E5E8EC;padding-top:30px;}
-p,li{font-size:17px;line-height:1.7;}
-.subtitle{color:#2C85C8;font-weight:700;}
-.alert{background:#FFE6E6;border-left:6px solid #ff0000;padding:15px;}
-.actions li{font-weight:bold;margin-bottom:8px;}
-.actions li::before{content:'💡 ';}
-/* Box styling so the action and value section matches other boxes */
-.actions-box{background:#F5F6FA;padding:20px;border-radius:12px;box-shadow:0 2px 10px rgba(0,0,0,0.06);}
-footer{text-align:center;font-size:14px;color:#003366;position:fixed;bottom:0;left:0;width:100%;background:#fff;padding:8px 0;box-shadow:0 -1px 3px rgba(0,0,0,0.1);}
-</style>
-"""
+
+# Seconds to wait for the tool calls of a single model turn
+TOOL_TIMEOUT = float(os.getenv("REPORTER_TOOL_TIMEOUT", "20"))
+
+# Per-report budgets for the tool calling loop
+MAX_TOOL_TURNS = int(os.getenv("REPORTER_MAX_TOOL_TURNS", "3"))
+MAX_REPORT_TOKENS = int(os.getenv("REPORTER_MAX_TOKENS", "40000"))
+MAX_REPORT_SECONDS = float(os.getenv("REPORTER_MAX_SECONDS", "90"))
+# Sampling temperature of the report writer
+REPORT_TEMPERATURE = 1.2
+
+# Characters kept from tool results of earlier turns when history is compacted
+COMPACT_TOOL_CHARS = 600
+
+# Reports that may run tool calls at the same time (API requests and bulk refresh)
+CONCURRENT_REPORTS = int(os.getenv("REPORTER_CONCURRENT_REPORTS", "8"))
+# Calls of one tool that may run at once, including calls a timed-out turn
+# abandoned; further calls get an error until a slow provider catches up
+MAX_TOOL_INFLIGHT = int(os.getenv("REPORTER_MAX_TOOL_INFLIGHT", str(CONCURRENT_REPORTS)))
+
+# Shared pool so a timed-out call never blocks the report on executor shutdown.
+# With the default limits every tool can hold MAX_TOOL_INFLIGHT threads at once,
+# so calls stuck on one slow provider never queue the other tools' calls.
+_tool_executor = ThreadPoolExecutor(
+    max_workers=max(1, CONCURRENT_REPORTS * len(TOOL_DISPATCH)), thread_name_prefix="reporter-tool"
+)
+_inflight: Dict[str, int] = {}
+_inflight_lock = threading.Lock()
+
+
+def _release_tool(name: str) -> None:
+    with _inflight_lock:
+        _inflight[name] -= 1
+
+
+def _submit_tool_call(name: str, args: Dict[str, Any]) -> Optional[Future]:
+    """Dispatch a call on the shared pool, or return None if ``name`` is at its limit."""
+    with _inflight_lock:
+        if _inflight.get(name, 0) >= MAX_TOOL_INFLIGHT:
+            return None
+        _inflight[name] = _inflight.get(name, 0) + 1
+    future = _tool_executor.submit(dispatch_tool_call, name, args)
+    future.add_done_callback(lambda _: _release_tool(name))
+    return future
+
+
+def _tool_key(name: str, args: Dict[str, Any]) -> str:
+    return f"{name}:{json.dumps(args, sort_keys=True, ensure_ascii=False)}"
+
+
+def run_tool_calls(
+    calls: List[Tuple[str, Dict[str, Any]]],
+    memo: Dict[str, Any],
+    timeout: float = TOOL_TIMEOUT,
+) -> List[Any]:
+    """Run ``calls`` concurrently and return their results in call order.
+
+    Results are cached in ``memo`` so identical calls (same tool and args)
+    are dispatched only once per report. Calls that fail return ``{}``;
+    calls that do not finish within ``timeout`` seconds, or of a tool already
+    running :data:`MAX_TOOL_INFLIGHT` calls, return an error dict and are not
+    memoized.
+    """
+    keys = [_tool_key(name, args) for name, args in calls]
+    futures = {}
+    results: Dict[str, Any] = {}
+    for key, (name, args) in zip(keys, calls):
+        if key in memo or key in futures or key in results:
+            logger.info("ReporterAgent MEMO tool=%s args=%s", name, args)
+            continue
+        future = _submit_tool_call(name, args)
+        if future is None:
+            logger.warning("ReporterAgent BUSY tool=%s args=%s", name, args)
+            metrics.incr("reporter_tool_busy")
+            results[key] = {"error": f"{name} is busy"}
+            continue
+        logger.info("ReporterAgent CALL tool=%s args=%s", name, args)
+        futures[key] = future
+
+    wait(futures.values(), timeout=timeout)
+    for key, (name, args) in zip(keys, calls):
+        future = futures.get(key)
+        if future is None or key in results:
+            continue
+        if not future.done():
+            # drops the call if it has not started yet
+            future.cancel()
+            logger.warning("ReporterAgent TIMEOUT tool=%s args=%s", name, args)
+            metrics.incr("reporter_tool_timeout")
+            results[key] = {"error": f"{name} timed out"}
+            continue
+        try:
+            result = future.result()
+        except Exception as exc:
+            logger.exception(
+                "ReporterAgent ERROR tool=%s args=%s: %s", name, args, exc
+            )
+            result = {}
+        else:
+            logger.info(
+                "ReporterAgent RESULT tool=%s query=%s count=%d",
+                name,
+                args,
+                len(result) if hasattr(result, "__len__") else 1,
+            )
+        memo[key] = results[key] = result
+    return [results.get(key, memo.get(key)) for key in keys]
+
+
+def compact_tool_history(messages: List[Dict[str, Any]]) -> None:
+    """Truncate tool results already seen by the model to save prompt tokens."""
+    for message in messages:
+        content = message.get("content") or ""
+        if message.get("role") == "tool" and len(content) > COMPACT_TOOL_CHARS:
+            message["content"] = content[:COMPACT_TOOL_CHARS] + "…(kısaltıldı)"
 
 
 REPORT_PROMPT = """
@@ -81,21 +182,126 @@ Görsel tasarım profesyonel bir iş dokümanını andırmalı. Montserrat başl
 Son 6 ayda kayda değer gelişme yoksa bunu açıkça belirt. Yalnızca CSS gömülü tam HTML dökümanı döndür; ek yorum yapma."""
 
 
-def make_prompt(analysis: Dict[str, Any]) -> str:
-    """Create Reporter prompt given analysis JSON."""
-    return (
-        f"{REPORT_PROMPT}\n"
-        f"Use this CSS for styling:\n{STYLE_SNIPPET}\n"
-        f"Input JSON:\n{json.dumps(analysis, ensure_ascii=False)}"
+SECTIONS_PROMPT = """
+Delta Proje adına çalışan deneyimli bir satış analistisin. Verilen JSON verilerini kullanarak bir danışmanlık raporunun metinlerini yaz.
+Tüm yanıtları yalnızca Türkçe olarak ver.
+Her başlıkta sektör odaklı, uygulanabilir ve özgün açıklamalar yap. Veri eksikse alanı boş bırak; kesinlikle uydurma.
+Karar vericiler rapora doğrudan Input JSON'daki `decision_makers` listesinden eklenir; yeni isim uydurma.
+Gerekli durumlarda serpapi, BraveAPI veya Google Custom Search ile güncel haber, yeni atama ve büyüme sinyallerini topla ve kaynağını belirt.
+
+* executive_summary: 2-3 cümlelik güçlü bir özet.
+* company_overview: şirket özeti.
+* growth_signals: yatırım, yeni tesis veya işe alım gibi somut göstergeler.
+* sales_opportunities: hidrolik, pnömatik, proses otomasyonu ve yapay zekâ çözümlerinin müşterinin hangi süreçlerinde katma değer yaratacağını anlatan kısa senaryolar.
+* actions: zamanlama ve teklif yaklaşımını içeren aksiyon ve değer önerileri.
+* recent_news: son 6 aydaki kayda değer gelişmeler; yoksa bunu açıkça belirt.
+* risks: satış açısından riskler.
+
+HTML veya CSS üretme. Yalnızca şu anahtarlara sahip JSON döndür:
+""" + json.dumps(SECTION_KEYS, ensure_ascii=False)
+
+
+CONTEXT_PROMPT = (
+    "Güncel haber, LinkedIn ve web araması sonuçları aşağıdaki Ek Bağlam JSON'unda "
+    "hazır olarak verilmiştir; ek araç çağrısı yapma ve kaynak belirtirken bu verileri kullan."
+)
+
+
+def prefetch_context(
+    analysis: Dict[str, Any],
+    company: str,
+    news: Optional[List[Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """Run the enrichment lookups the reporter usually asks for, concurrently.
+
+    Data the pipeline already has (``news`` from the analyst step, the
+    ``linkedin_url`` in ``analysis``) is reused instead of fetched again.
+    """
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    if not news:
+        calls.append(("newsfinder", {"query": company}))
+    if not analysis.get("linkedin_url"):
+        calls.append(("linkedin_search", {"company": company}))
+    calls.append(
+        ("serpapi_web_search", {"query": f"{company} yatırım yeni tesis atama"})
     )
+    calls.append(
+        ("product_catalogue", {"query": analysis.get("sector") or company})
+    )
+    context: Dict[str, Any] = {"news": news or []}
+    for (name, _), result in zip(calls, run_tool_calls(calls, {})):
+        if name == "newsfinder":
+            context["news"] = result.get("news", []) if isinstance(result, dict) else []
+        else:
+            context[name] = result
+    return context
+
+
+def make_prompt(
+    analysis: Dict[str, Any],
+    context: Optional[Dict[str, Any]] = None,
+    template: bool = False,
+) -> str:
+    """Create Reporter prompt given analysis JSON and optional prefetched context.
+
+    With ``template`` the model is asked for section texts as JSON instead of
+    a full HTML document.
+    """
+    if template:
+        prompt = f"{SECTIONS_PROMPT}\n"
+    else:
+        prompt = f"{REPORT_PROMPT}\nUse this CSS for styling:\n{STYLE_SNIPPET}\n"
+    prompt += f"Input JSON:\n{json.dumps(analysis, ensure_ascii=False)}"
+    if context is not None:
+        prompt += (
+            f"\n{CONTEXT_PROMPT}\n"
+            f"Ek Bağlam JSON:\n{json.dumps(context, ensure_ascii=False)[:4000]}"
+        )
+    return prompt
 
 
-def generate_report(analysis_json: str, tool_mode: bool = False) -> str:
+def render_sections(content: str, analysis: Dict[str, Any], company: Optional[str]) -> str:
+    """Render model section JSON; fall back to the raw content if it is not valid."""
+    metrics.incr("llm_report_structured")
+    try:
+        sections = ReportSections.model_validate_json(content).model_dump()
+    except ValidationError:
+        metrics.incr("llm_report_parse_failed")
+        if content.lstrip().startswith("<"):
+            return content
+        sections = {"executive_summary": content}
+    return render_report(
+        sections,
+        analysis.get("decision_makers", []),
+        company or analysis.get("company_name", ""),
+    )
+
+
+def generate_report(
+    analysis_json: str,
+    tool_mode: bool = False,
+    max_tool_turns: int = MAX_TOOL_TURNS,
+    max_tokens: int = MAX_REPORT_TOKENS,
+    max_seconds: float = MAX_REPORT_SECONDS,
+    prefetch: bool = False,
+    company: Optional[str] = None,
+    news: Optional[List[Dict[str, str]]] = None,
+    template: bool = True,
+) -> str:
     """Generate final HTML report from analysis JSON string.
 
     If ``tool_mode`` is True, the LLM can call additional tools to enrich the
     report. The function handles the tool calling loop until the model returns
-    final HTML content.
+    final HTML content. The loop is bounded by ``max_tool_turns``,
+    ``max_tokens`` (total tokens across all turns) and ``max_seconds``; once a
+    budget is spent the model is forced to answer with ``tool_choice="none"``.
+
+    If ``prefetch`` is True, the usual enrichment lookups for ``company`` are
+    run concurrently up front (see :func:`prefetch_context`) and injected into
+    the prompt, tools are disabled and a single LLM call produces the report.
+
+    With ``template`` (the default) the model only writes the section texts
+    as JSON and :func:`render_report` produces the HTML layout and CSS.
     """
     step = "LLM4-Reporter"
     start = time.perf_counter()
@@ -105,7 +311,15 @@ def generate_report(analysis_json: str, tool_mode: bool = False) -> str:
         logger.exception("%s JSON parse error", step)
         analysis = {}
 
-    prompt = make_prompt(analysis)
+    context = None
+    if prefetch:
+        context = prefetch_context(analysis, company or "", news)
+        tool_mode = False
+        logger.info(
+            "%s PREFETCH (%d ms)", step, int((time.perf_counter() - start) * 1000)
+        )
+
+    prompt = make_prompt(analysis, context, template)
     logger.info("%s INPUT: %s", step, prompt)
 
     messages = [{"role": "user", "content": prompt}]
@@ -168,45 +382,76 @@ def generate_report(analysis_json: str, tool_mode: bool = False) -> str:
         },
     ]
 
+    # tool results already fetched for this report, keyed by tool and args
+    memo: Dict[str, Any] = {}
+    # report writing is generative, so it uses one model without a cascade
+    model = models_for("report")[0]
+    tool_turns = 0
+    total_tokens = 0
+    force_final = False
     try:
         while True:
-            response = client.chat.completions.create(
-                model="gpt-4o",
+            exhausted = force_final or (
+                tool_turns >= max_tool_turns
+                or total_tokens >= max_tokens
+                or time.perf_counter() - start >= max_seconds
+            )
+            options: Dict[str, Any] = {"tools": tools if tool_mode else None}
+            fmt = response_format(ReportSections, model) if template else None
+            if fmt is not None:
+                options["response_format"] = fmt
+            if tool_mode and exhausted:
+                logger.info(
+                    "%s BUDGET exhausted turns=%d tokens=%d, forcing final answer",
+                    step,
+                    tool_turns,
+                    total_tokens,
+                )
+                options["tool_choice"] = "none"
+            response = get_client().chat.completions.create(
+                model=model,
                 messages=messages,
-                temperature=1.2,
-                tools=tools if tool_mode else None,
+                temperature=REPORT_TEMPERATURE,
+                **options,
             )
+            usage = getattr(response, "usage", None)
+            total_tokens += getattr(usage, "total_tokens", 0) or 0
             msg = response.choices[0].message
             # always append assistant message so tool replies have context
             messages.append(msg.model_dump())
-            if msg.content:
-                report = msg.content
+            calls = msg.tool_calls or []
+            if msg.content or (exhausted and (force_final or not calls)):
+                report = msg.content or ""
+                if template:
+                    report = render_sections(report, analysis, company)
                 duration_ms = int((time.perf_counter() - start) * 1000)
                 logger.info("%s OUTPUT (%d ms): %s", step, duration_ms, report)
-                return {"html": report, "duration_ms": duration_ms}
-            for call in msg.tool_calls or []:
+                return {
+                    "html": report,
+                    "duration_ms": duration_ms,
+                    "tool_turns": tool_turns,
+                    "total_tokens": total_tokens,
+                }
+            if not calls:
+                # neither content nor tool calls: ask once more without tools
+                force_final = True
+                continue
+            parsed: List[Tuple[str, Dict[str, Any]]] = []
+            for call in calls:
                 try:
                     args = json.loads(call.function.arguments or "{}")
                 except json.JSONDecodeError:
                     args = {}
-                name = call.function.name
-                logger.info(
-                    "ReporterAgent CALL tool=%s args=%s", name, args
-                )
-                try:
-                    result = dispatch_tool_call(name, args)
-                except Exception as exc:
-                    logger.exception(
-                        "ReporterAgent ERROR tool=%s args=%s: %s", name, args, exc
-                    )
-                    result = {}
-                else:
-                    logger.info(
-                        "ReporterAgent RESULT tool=%s query=%s count=%d",
-                        name,
-                        args,
-                        len(result) if hasattr(result, "__len__") else 1,
-                    )
+                parsed.append((call.function.name, args))
+            if exhausted:
+                # every tool call still needs a reply before the next turn
+                results = [{"error": "tool budget exhausted"} for _ in parsed]
+                force_final = True
+            else:
+                compact_tool_history(messages)
+                results = run_tool_calls(parsed, memo)
+            tool_turns += 1
+            for call, result in zip(calls, results):
                 messages.append(
                     {
                         "role": "tool",
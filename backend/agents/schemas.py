@@ -0,0 +1,61 @@
+"""Pydantic schemas of the structured LLM answers.
+
+Every field has a default so a partial answer still validates; the agents
+decide separately whether the answer is complete enough to keep.
+"""
+
+from typing import List
+
+from pydantic import BaseModel
+
+
+class CompanyInfo(BaseModel):
+    """Company facts extracted from the website HTML."""
+
+    company_name: str = ""
+    summary: str = ""
+    sector: str = ""
+    notable_products_or_services: str = ""
+    sales_signals: str = ""
+
+
+class DecisionMaker(BaseModel):
+    full_name: str = ""
+    title: str = ""
+    summary: str = ""
+
+
+class Analysis(BaseModel):
+    """Sales-oriented company summary written by the data analyst."""
+
+    company_summary: str = ""
+    sector: str = ""
+    foundation: str = ""
+    products_services: str = ""
+    production_capacity: str = ""
+    production_technology: str = ""
+    machinery: str = ""
+    services: str = ""
+    r_and_d: str = ""
+    references: List[str] = []
+    decision_makers: List[DecisionMaker] = []
+    linkedin_url: str = ""
+    company_size: str = ""
+    location: str = ""
+    sales_signals: List[str] = []
+    growth_signals: List[str] = []
+    recent_news: List[str] = []
+    risks: str = ""
+    actionable_insights: List[str] = []
+
+
+class ReportSections(BaseModel):
+    """Section texts of the report template, see ``SECTION_KEYS``."""
+
+    executive_summary: str = ""
+    company_overview: str = ""
+    growth_signals: List[str] = []
+    sales_opportunities: List[str] = []
+    actions: List[str] = []
+    recent_news: List[str] = []
+    risks: str = ""
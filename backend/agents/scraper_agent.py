@@ -1,27 +1,64 @@
 """Scraper agent that sequentially tries multiple tools and extracts company info."""
 
-import json
-from typing import Dict, List, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Dict, List, Optional
 import time
-
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, urljoin
-from urllib.robotparser import RobotFileParser
-
-import openai
+from urllib.parse import urlparse
 
 from ..utils.logger import logger
-from ..utils import normalize_url
-from ..tools import scraping_tools
-
-client = openai.OpenAI()
-
-
-def crawl_site(start_url: str, depth: int = 1) -> str:
+from ..utils.llm import get_client
+from ..utils.model_router import has_fields, run_cascade
+from ..utils.structured_output import complete_json
+from ..utils import canonical_url, normalize_url
+from ..utils.provider_health import CircuitOpenError, call_with_health, order_providers
+from ..utils.singleflight import SingleFlight
+from ..tools import host_scheduler, html_processing, scraping_tools
+from ..tools.crawl_frontier import CrawlFrontier
+from ..tools.sitemap import discover_sitemap_urls
+from .schemas import CompanyInfo
+
+# Default fallback order of scraping tools, cheapest first
+SCRAPING_SEQUENCE = [
+    "staticscraper",
+    "jsrender",
+    "formbot",
+    "masscrawler",
+    "llmscraper",
+]
+
+# Page budget of one crawl_site call
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "10"))
+# Pages fetched in parallel per crawl wave
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+# Priority bonus of sitemap pages modified after the ``since`` timestamp
+SITEMAP_FRESH_BONUS = 0.5
+SITEMAP_FRESH_SECONDS = 365 * 24 * 3600
+
+COMPANY_INFO_KEYS = tuple(CompanyInfo.model_fields)
+# Fields that must be non-empty for an extraction to be kept
+COMPANY_INFO_REQUIRED = ("company_name", "summary")
+
+_scrapes = SingleFlight("scrape")
+
+
+def crawl_site(
+    start_url: str,
+    depth: int = 1,
+    max_pages: int = CRAWL_MAX_PAGES,
+    since: Optional[float] = None,
+) -> str:
     """Crawl internal links under the same domain up to ``depth``.
 
-    The crawler respects robots.txt. Network errors are logged and skipped.
+    Links are fetched best-first from a :class:`CrawlFrontier`, so pages
+    about the company, its products, machinery, R&D or careers come before
+    legal or archive pages, and at most ``max_pages`` pages are fetched.
+    Pages listed in the site's sitemaps are queued up front, those modified
+    after ``since`` (default: within a year) first, so the whole page set
+    can be fetched in concurrent waves of :data:`CRAWL_CONCURRENCY` pages.
+    The crawler respects robots.txt, and requests are spaced per host by the
+    shared :mod:`~backend.tools.host_scheduler`. Network errors are logged
+    and skipped.
     Returns the concatenated HTML of all fetched pages.
     """
 
@@ -30,58 +67,58 @@ def crawl_site(start_url: str, depth: int = 1) -> str:
     parsed = urlparse(start_url)
     base = f"{parsed.scheme}://{parsed.netloc}"
 
-    rp = RobotFileParser()
-    rp.set_url(urljoin(base, "/robots.txt"))
-    try:
-        rp.read()
-    except Exception as exc:  # robots.txt may not exist or not be reachable
-        logger.warning("%s robots.txt unavailable: %s", step, exc)
-        rp = None
+    rp = host_scheduler.get_scheduler().robots(base)
+
+    frontier = CrawlFrontier(start_url)
+    frontier.add(start_url, level=0)
+    if depth >= 1:
+        if since is None:
+            since = time.time() - SITEMAP_FRESH_SECONDS
+        for entry in discover_sitemap_urls(base, rp.site_maps() or []):
+            fresh = entry.lastmod is not None and entry.lastmod > since
+            frontier.add(entry.url, level=1, bonus=SITEMAP_FRESH_BONUS if fresh else 0.0)
 
-    visited: Set[str] = set()
-    queue: List[Tuple[str, int]] = [(start_url, 0)]
     html_parts: List[str] = []
+    fetched = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, CRAWL_CONCURRENCY)) as pool:
+        while fetched < max_pages:
+            wave = []
+            while len(wave) < min(CRAWL_CONCURRENCY, max_pages - fetched):
+                item = frontier.pop()
+                if item is None:
+                    break
+                if not rp.can_fetch(host_scheduler.USER_AGENT, item[0]):
+                    logger.info("%s blocked by robots.txt: %s", step, item[0])
+                    continue
+                wave.append(item)
+            if not wave:
+                break
+            fetched += len(wave)
+            futures = [pool.submit(scraping_tools.fetch_page, url) for url, _ in wave]
 
-    while queue:
-        url, level = queue.pop(0)
-        if url in visited or level > depth:
-            continue
-        visited.add(url)
-        path = urlparse(url).path or "/"
-        if rp and not rp.can_fetch("*", path):
-            logger.info("%s blocked by robots.txt: %s", step, url)
-            continue
-        try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-        except Exception as exc:
-            logger.warning("%s failed to fetch %s: %s", step, url, exc)
-            continue
+            for (url, level), future in zip(wave, futures):
+                try:
+                    resp = future.result()
+                except Exception as exc:
+                    logger.warning("%s failed to fetch %s: %s", step, url, exc)
+                    continue
 
-        html_parts.append(resp.text)
+                html_parts.append(resp.text)
 
-        if level == depth:
-            continue
+                if level >= depth:
+                    continue
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        for link in soup.find_all("a", href=True):
-            joined = urljoin(url, link["href"])
-            link_parsed = urlparse(joined)
-            if link_parsed.scheme in {"http", "https"} and link_parsed.netloc == parsed.netloc:
-                if joined not in visited:
-                    queue.append((joined, level + 1))
+                for joined, anchor in html_processing.extract_links(resp.text, url):
+                    frontier.add(joined, anchor, level + 1)
 
+    logger.info("%s fetched %d pages, %d left in frontier", step, fetched, len(frontier))
     return "\n".join(html_parts)
 
 
-def extract_company_info(html: str) -> Dict[str, str]:
-    """Use GPT-4 to extract company info for sales preparation.
-
-    Returns a dict with keys 'company_name', 'summary', 'sector',
-    'notable_products_or_services' and 'sales_signals'.
-    """
-    step = "LLM1-ExtractCompany"
-    prompt = (
+def company_info_prompt(html: str) -> str:
+    """Return the prompt asking for the company info of a website's HTML."""
+    return (
         "You are a sales intelligence assistant for the InsightChain platform. "
         "Given the HTML of a company's website, your job is to extract key information "
         "that will help sales teams quickly understand the company and prepare for outreach.\n\n"
@@ -105,65 +142,77 @@ def extract_company_info(html: str) -> Dict[str, str]:
         '  "sales_signals": ""\n'
         "}"
     )
+
+
+def extract_company_info(html: str) -> Dict[str, str]:
+    """Use an LLM to extract company info for sales preparation.
+
+    The answer is constrained to the :class:`CompanyInfo` schema. Runs the
+    ``extract`` model cascade: the small model's answer is kept if it has a
+    company name and summary, otherwise the large model is asked. Returns a
+    dict with keys 'company_name', 'summary', 'sector',
+    'notable_products_or_services' and 'sales_signals'.
+    """
+    step = "LLM1-ExtractCompany"
+    prompt = company_info_prompt(html)
     logger.info("%s INPUT: %s", step, prompt)
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
+
+    def ask(model: str) -> Dict[str, str]:
+        info = complete_json(
+            get_client(),
+            "extract",
+            model,
+            [{"role": "user", "content": prompt}],
+            CompanyInfo,
             temperature=0,
         )
-        content = response.choices[0].message.content or ""
-        logger.info("%s OUTPUT: %s", step, content)
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            import re
+        logger.info("%s OUTPUT (%s): %s", step, model, info.model_dump_json())
+        return info.model_dump()
 
-            match = re.search(r"{.*}", content, re.DOTALL)
-            if match:
-                try:
-                    return json.loads(match.group(0))
-                except json.JSONDecodeError:
-                    pass
-            raise ValueError(f"Invalid JSON from GPT-4: {content}")
+    try:
+        return run_cascade(
+            "extract",
+            ask,
+            lambda data: has_fields(data, COMPANY_INFO_KEYS, required=COMPANY_INFO_REQUIRED),
+        )
     except Exception as exc:
         logger.exception("%s ERROR: %s", step, exc)
-        return {
-            "company_name": "",
-            "summary": "",
-            "sector": "",
-            "notable_products_or_services": "",
-            "sales_signals": "",
-        }
+        return dict.fromkeys(COMPANY_INFO_KEYS, "")
 
 
-def orchestrate_scraping(company_url: str, depth_limit: int = 0) -> Dict[str, str]:
+def orchestrate_scraping(company_url: str, depth_limit: int = 0, extract: bool = True) -> Dict[str, str]:
     """Attempt multiple scraping tools sequentially and crawl internal pages.
 
     ``depth_limit`` controls how deep the internal crawler should go. ``0``
-    disables crawling and only fetches the main page.
+    disables crawling and only fetches the main page. Tools are tried in order
+    of observed health and tools with an open circuit are skipped. Concurrent
+    calls for the same website and depth share one run.
+
+    With ``extract=False`` the LLM company info extraction is skipped and only
+    the HTML is returned, e.g. for bulk runs that batch the extraction.
     """
+    key = (canonical_url(company_url), depth_limit, extract)
+    return _scrapes.do(key, _orchestrate_scraping, company_url, depth_limit, extract)
+
+
+def _orchestrate_scraping(company_url: str, depth_limit: int, extract: bool = True) -> Dict[str, str]:
     step = "ScraperAgent"
     company_url = normalize_url(company_url)
     logger.info("%s INPUT: %s", step, company_url)
     start = time.perf_counter()
 
-    tools = [
-        scraping_tools.staticscraper,
-        scraping_tools.jsrender,
-        scraping_tools.formbot,
-        scraping_tools.masscrawler,
-        scraping_tools.llmscraper,
-    ]
     html = ""
-    for tool in tools:
+    for name in order_providers(SCRAPING_SEQUENCE):
+        tool = getattr(scraping_tools, name)
         try:
-            result = tool(target_url=company_url)
+            result = call_with_health(name, tool, target_url=company_url, ignore_error=scraping_tools.is_target_error)
             html = result.get("html", "")
             if html:
                 break
+        except CircuitOpenError:
+            logger.info("%s %s skipped: circuit open", step, name)
         except Exception as exc:
-            logger.exception("%s %s failed: %s", step, tool.__name__, exc)
+            logger.exception("%s %s failed: %s", step, name, exc)
     if not html:
         raise RuntimeError("All scraping tools failed")
 
@@ -175,7 +224,7 @@ def orchestrate_scraping(company_url: str, depth_limit: int = 0) -> Dict[str, st
         except Exception as exc:
             logger.warning("%s crawl_site failed: %s", step, exc)
 
-    info = extract_company_info(html)
+    info = extract_company_info(html) if extract else {}
     duration_ms = int((time.perf_counter() - start) * 1000)
     final = {"html": html, **info, "duration_ms": duration_ms}
     logger.info("%s OUTPUT (%d ms): %s", step, duration_ms, final)
@@ -1,6 +1,7 @@
 """Temel Search Agent.
 Bu ajan verilen anahtar kelimeler için örnek veri döner."""
 
+import os
 from typing import List, Dict
 
 from ..tools.search_tools import (
@@ -8,7 +9,10 @@ from ..tools.search_tools import (
     brave_search,
     google_cse_search,
 )
+from ..tools.result_merge import merge_results
 from ..utils.logger import logger
+from ..utils.provider_health import CircuitOpenError, call_with_health, order_providers
+from ..utils.singleflight import SingleFlight
 
 TOOL_SEQUENCE = [
     "google_cse_search",
@@ -22,37 +26,55 @@ TOOL_LABELS = {
     "brave_search": "brave",
 }
 
+# Results returned by one run_search call after merging
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "20"))
+
+_queries = SingleFlight("search")
+
 
 def run_search(keywords: List[str]) -> List[Dict[str, str]]:
     """Search each keyword using the tool sequence until results are found.
 
-    Duplicate keyword queries are ignored within a single call.
+    Duplicate keyword queries are ignored within a single call. Tools are
+    tried in order of observed health; tools with an open circuit are skipped.
+    Concurrent identical queries from other requests share one search.
+    Results of all keywords are deduplicated by canonical URL and fused by
+    reciprocal rank, keeping at most :data:`SEARCH_MAX_RESULTS`.
     """
-    results: List[Dict[str, str]] = []
+    rankings: List[List[Dict[str, str]]] = []
     seen = set()
     for kw in keywords:
         if kw in seen:
             logger.info("SearchAgent skip duplicate query=%s", kw)
             continue
         seen.add(kw)
-        for name in TOOL_SEQUENCE:
-            func = globals()[name]
-            label = TOOL_LABELS[name]
-            try:
-                logger.info("SearchAgent CALL tool=%s query=%s", label, kw)
-                res = func(kw)
-                logger.info(
-                    "SearchAgent RESULT tool=%s query=%s count=%d",
-                    label,
-                    kw,
-                    len(res),
-                )
-                if res:
-                    results.extend(res)
-                    break
-            except Exception as exc:
-                logger.exception(
-                    "SearchAgent ERROR tool=%s query=%s: %s", label, kw, exc
-                )
-                continue
-    return results
+        key = " ".join(kw.lower().split())
+        rankings.append(_queries.do(key, _search_query, kw))
+    return merge_results(rankings, limit=SEARCH_MAX_RESULTS)
+
+
+def _search_query(kw: str) -> List[Dict[str, str]]:
+    """Return the results of the first healthy tool that finds anything."""
+    for name in order_providers(TOOL_SEQUENCE, TOOL_LABELS):
+        func = globals()[name]
+        label = TOOL_LABELS[name]
+        try:
+            logger.info("SearchAgent CALL tool=%s query=%s", label, kw)
+            res = call_with_health(label, func, kw)
+            logger.info(
+                "SearchAgent RESULT tool=%s query=%s count=%d",
+                label,
+                kw,
+                len(res),
+            )
+            if res:
+                return res
+        except CircuitOpenError:
+            logger.info("SearchAgent SKIP tool=%s query=%s circuit open", label, kw)
+            continue
+        except Exception as exc:
+            logger.exception(
+                "SearchAgent ERROR tool=%s query=%s: %s", label, kw, exc
+            )
+            continue
+    return []
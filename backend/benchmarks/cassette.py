@@ -0,0 +1,235 @@
+"""Record/replay of HTTP and OpenAI traffic for offline benchmarks and tests.
+
+A :class:`Cassette` patches ``requests`` (every ``requests.get``/``post`` goes
+through ``Session.request``) and the shared OpenAI client from
+:mod:`backend.utils.llm`. In ``record`` mode real responses are stored in a
+JSON cassette file; in ``replay`` mode they are served from it, optionally
+with latency injected from a :class:`LatencyProfile`.
+"""
+
+from __future__ import annotations
+
+import base64
+from collections import Counter, defaultdict
+import hashlib
+import json
+from pathlib import Path
+import random
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit, urlunsplit
+
+import requests
+
+from ..utils import llm
+from ..utils.logger import logger
+
+# Query/body fields that carry credentials and must not be part of the key
+SECRET_FIELDS = {"api_key", "key", "cx", "token"}
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class LatencyProfile:
+    """Injected latency: log-normal around a median per kind or host.
+
+    ``medians`` maps ``"http"``, ``"openai"`` or a host name (for example
+    ``"serpapi.com"``) to a median latency in milliseconds.
+    """
+
+    def __init__(self, medians: Optional[Dict[str, float]] = None, sigma: float = 0.3, seed: Optional[int] = None):
+        self.medians = medians or {}
+        self.sigma = sigma
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, sigma: float = 0.3) -> "LatencyProfile":
+        """Build a profile from ``"http=150,openai=1500,serpapi.com=800"``."""
+        medians = {}
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            name, _, value = part.partition("=")
+            medians[name.strip()] = float(value)
+        return cls(medians, sigma)
+
+    def delay(self, kind: str, host: str = "") -> float:
+        """Return the delay in seconds for one call."""
+        median = self.medians.get(host, self.medians.get(kind, 0.0))
+        if median <= 0:
+            return 0.0
+        with self._lock:
+            factor = self._random.lognormvariate(0.0, self.sigma)
+        return median * factor / 1000
+
+
+def _digest(data: Any) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def http_key(method: str, url: str, params: Any = None, json_body: Any = None, data: Any = None) -> str:
+    """Return the cassette key for an HTTP request, ignoring credentials."""
+    clean = {k: v for k, v in dict(params or {}).items() if k not in SECRET_FIELDS}
+    body = json_body if json_body is not None else data
+    if isinstance(body, dict):
+        body = {k: v for k, v in body.items() if k not in SECRET_FIELDS}
+    return f"{method.upper()} {url.split('?')[0]} {_digest([clean, body])}"
+
+
+def redact_url(url: str) -> str:
+    """Return ``url`` without credential query parameters."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_FIELDS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def openai_key(kwargs: Dict[str, Any]) -> str:
+    """Return the cassette key for a chat completion request."""
+    relevant = {k: kwargs.get(k) for k in ("model", "messages", "tools", "tool_choice", "response_format")}
+    return f"{kwargs.get('model')} {_digest(relevant)}"
+
+
+def _to_response(entry: Dict[str, Any], url: str) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = entry["status"]
+    resp.headers.update(entry.get("headers", {}))
+    resp._content = base64.b64decode(entry["body"])
+    resp._content_consumed = True
+    resp.encoding = entry.get("encoding")
+    resp.url = entry.get("url", url)
+    resp.reason = entry.get("reason", "")
+    return resp
+
+
+def _from_response(resp: requests.Response) -> Dict[str, Any]:
+    # the body is stored decoded, so Content-Encoding is dropped and the
+    # length recomputed
+    keep = {"content-type", "retry-after", "last-modified"}
+    headers = {k: v for k, v in resp.headers.items() if k.lower() in keep}
+    headers["Content-Length"] = str(len(resp.content))
+    return {
+        "status": resp.status_code,
+        "headers": headers,
+        "body": base64.b64encode(resp.content).decode("ascii"),
+        "encoding": resp.encoding,
+        "url": redact_url(resp.url or ""),
+        "reason": resp.reason,
+    }
+
+
+class Cassette:
+    """Context manager that records or replays external calls."""
+
+    def __init__(
+        self,
+        path: Path,
+        mode: str = "replay",
+        latency: Optional[LatencyProfile] = None,
+        http_transport: Optional[Callable[..., requests.Response]] = None,
+        openai_client: Any = None,
+    ) -> None:
+        if mode not in {"record", "replay"}:
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency or LatencyProfile()
+        self._transport = http_transport
+        self._openai_client = openai_client
+        self.entries: Dict[str, Dict[str, List[Dict[str, Any]]]] = {"http": {}, "openai": {}}
+        self.calls: Counter = Counter()
+        self.tokens = 0
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._saved_request = None
+        self._saved_client = None
+        if mode == "replay":
+            self.entries.update(json.loads(self.path.read_text(encoding="utf-8")))
+
+    # -- bookkeeping -----------------------------------------------------
+    def _store(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.entries[kind].setdefault(key, []).append(entry)
+
+    def _next(self, kind: str, key: str) -> Dict[str, Any]:
+        with self._lock:
+            recorded = self.entries[kind].get(key)
+            if not recorded:
+                raise CassetteMiss(f"no recorded {kind} response for {key}")
+            index = self._cursor[f"{kind} {key}"]
+            self._cursor[f"{kind} {key}"] += 1
+            # repeat the last response once a key has been replayed fully
+            return recorded[min(index, len(recorded) - 1)]
+
+    def rewind(self) -> None:
+        """Start replaying every key from its first recorded response again."""
+        with self._lock:
+            self._cursor.clear()
+            self.calls.clear()
+            self.tokens = 0
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    # -- HTTP ------------------------------------------------------------
+    def _request(self, session: requests.Session, method: str, url: str, **kwargs: Any) -> requests.Response:
+        key = http_key(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        with self._lock:
+            self.calls["http"] += 1
+        if self.mode == "record":
+            transport = self._transport or self._saved_request
+            resp = transport(session, method, url, **kwargs)
+            self._store("http", key, _from_response(resp))
+            return resp
+        time.sleep(self.latency.delay("http", urlparse(url).netloc))
+        return _to_response(self._next("http", key), url)
+
+    # -- OpenAI ----------------------------------------------------------
+    def _create(self, **kwargs: Any) -> Any:
+        from openai.types.chat import ChatCompletion
+
+        key = openai_key(kwargs)
+        with self._lock:
+            self.calls["openai"] += 1
+        if self.mode == "record":
+            client = self._openai_client or self._saved_client
+            response = client.chat.completions.create(**kwargs)
+            data = response.model_dump()
+            self._store("openai", key, data)
+        else:
+            time.sleep(self.latency.delay("openai"))
+            data = self._next("openai", key)
+            response = ChatCompletion.model_validate(data)
+        usage = data.get("usage") or {}
+        with self._lock:
+            self.tokens += usage.get("total_tokens") or 0
+        return response
+
+    # -- context manager -------------------------------------------------
+    def __enter__(self) -> "Cassette":
+        self._saved_request = requests.sessions.Session.request
+        cassette = self
+
+        def request(session, method, url, **kwargs):
+            return cassette._request(session, method, url, **kwargs)
+
+        requests.sessions.Session.request = request
+        if self.mode == "record" and self._openai_client is None:
+            # build the real client before the cassette takes its place
+            llm.get_client()
+        self._saved_client = llm._client
+        llm._client = types.SimpleNamespace(
+            chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+        )
+        logger.info("Cassette %s %s", self.mode.upper(), self.path)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        requests.sessions.Session.request = self._saved_request
+        llm._client = self._saved_client
+        if self.mode == "record":
+            self.save()
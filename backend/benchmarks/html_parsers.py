@@ -0,0 +1,80 @@
+"""Compare HTML parser backends on a saved corpus of pages.
+
+Usage (from the repository root)::
+
+    python -m backend.benchmarks.html_parsers --save https://example.com
+    python -m backend.benchmarks.html_parsers --repeat 20
+
+``--save`` downloads pages into the corpus directory so the benchmark runs
+offline on real sites afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+from pathlib import Path
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from ..tools.html_processing import available_parsers, process_page
+from .stats import percentile
+
+CORPUS_DIR = Path(__file__).with_name("corpus")
+
+
+def save_pages(urls: List[str], corpus: Path = CORPUS_DIR) -> None:
+    """Download ``urls`` into ``corpus`` as ``<host>-<hash>.html`` files."""
+    import requests
+
+    corpus.mkdir(parents=True, exist_ok=True)
+    for url in urls:
+        resp = requests.get(url, timeout=10)
+        resp.raise_for_status()
+        digest = hashlib.sha1(url.encode()).hexdigest()[:8]
+        path = corpus / f"{urlparse(url).netloc}-{digest}.html"
+        path.write_text(resp.text, encoding="utf-8")
+        print(f"saved {url} -> {path.name}")
+
+
+def run(corpus: Path = CORPUS_DIR, repeat: int = 10) -> Dict[str, Dict[str, float]]:
+    """Return per-parser timings (ms per page) over every page in ``corpus``."""
+    pages = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(corpus.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"no .html pages in {corpus}")
+    report: Dict[str, Dict[str, float]] = {}
+    for parser in available_parsers():
+        timings: List[float] = []
+        for _ in range(repeat):
+            for html in pages:
+                start = time.perf_counter()
+                process_page(html, "https://example.com/", parser=parser)
+                timings.append((time.perf_counter() - start) * 1000)
+        report[parser] = {
+            "pages": len(pages),
+            "p50_ms": percentile(timings, 50),
+            "p95_ms": percentile(timings, 95),
+            "total_ms": sum(timings),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save", nargs="+", metavar="URL", help="download pages into the corpus and exit")
+    args = parser.parse_args()
+    if args.save:
+        save_pages(args.save, args.corpus)
+        return
+    for name, stats in run(args.corpus, args.repeat).items():
+        print(
+            f"{name:12s} pages={stats['pages']:d} p50={stats['p50_ms']:.2f}ms "
+            f"p95={stats['p95_ms']:.2f}ms total={stats['total_ms']:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Load generator and capacity report for the FastAPI service.
+
+Drives ``/analyze``, ``/scrape`` and ``/find_linkedin`` at one or more
+concurrency levels with a weighted request mix, while sampling ``/metrics``
+once per interval. Point the backend at the mock providers first (see
+:mod:`backend.benchmarks.mock_providers`)::
+
+    uvicorn backend.benchmarks.mock_providers:app --port 9000
+    uvicorn backend.main:app --port 8000        # with the *_URL overrides set
+    python -m backend.benchmarks.loadgen --concurrency 1,4,16 --duration 30 \\
+        --mix analyze=1,scrape=2,find_linkedin=3 --output capacity.json
+    python -m backend.benchmarks.loadgen ... --compare capacity-old.json
+
+Each level reports throughput, p50/p95/p99 latency and error rate per
+endpoint, peak threadpool saturation and RSS; ``timeline`` keeps the
+sampled ``/metrics`` values over time.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+import json
+from pathlib import Path
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from .stats import percentile, summarize
+
+DEFAULT_SITE = "http://127.0.0.1:9000/site/"
+DEFAULT_MIX = "analyze=1,scrape=2,find_linkedin=3"
+ENDPOINTS = ["analyze", "scrape", "find_linkedin"]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse ``"analyze=1,scrape=2"`` into endpoint weights."""
+    mix: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint in mix: {name}")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"empty request mix: {spec!r}")
+    return mix
+
+
+def build_request(endpoint: str, site: str, company: str, depth: int) -> Dict[str, Any]:
+    """Return ``requests.request`` arguments for one call to ``endpoint``."""
+    if endpoint == "analyze":
+        body = {"website": site, "company": company or None, "depth": depth}
+        return {"method": "POST", "path": "/analyze", "json": body}
+    if endpoint == "scrape":
+        return {"method": "GET", "path": "/scrape", "params": {"url": site}}
+    return {"method": "GET", "path": "/find_linkedin", "params": {"company": company or site}}
+
+
+class LoadGenerator:
+    """Run a fixed concurrency level against ``base_url`` for ``duration`` seconds."""
+
+    def __init__(
+        self,
+        base_url: str,
+        mix: Dict[str, float],
+        site: str = DEFAULT_SITE,
+        company: str = "",
+        depth: int = 0,
+        timeout: float = 120.0,
+        sample_interval: float = 1.0,
+        seed: Optional[int] = None,
+        session_factory: Callable[[], requests.Session] = requests.Session,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix
+        self.site = site
+        self.company = company
+        self.depth = depth
+        self.timeout = timeout
+        self.sample_interval = sample_interval
+        self._random = random.Random(seed)
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+
+    def _pick(self) -> str:
+        with self._lock:
+            return self._random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+
+    def _worker(self, deadline: float, results: List[Dict[str, Any]]) -> None:
+        session = self._session_factory()
+        while time.monotonic() < deadline:
+            endpoint = self._pick()
+            spec = build_request(endpoint, self.site, self.company, self.depth)
+            start = time.monotonic()
+            status, error = 0, ""
+            try:
+                resp = session.request(
+                    spec["method"],
+                    self.base_url + spec["path"],
+                    params=spec.get("params"),
+                    json=spec.get("json"),
+                    timeout=self.timeout,
+                )
+                status = resp.status_code
+                if status >= 400:
+                    error = f"HTTP {status}"
+            except requests.RequestException as exc:
+                error = type(exc).__name__
+            end = time.monotonic()
+            with self._lock:
+                results.append(
+                    {"endpoint": endpoint, "start": start, "end": end, "ms": (end - start) * 1000, "status": status, "error": error}
+                )
+
+    def _sampler(self, stop: threading.Event, started: float, timeline: List[Dict[str, Any]]) -> None:
+        session = self._session_factory()
+        while not stop.wait(self.sample_interval):
+            try:
+                data = session.get(self.base_url + "/metrics", timeout=5).json()
+            except (requests.RequestException, ValueError):
+                continue
+            data["t"] = round(time.monotonic() - started, 2)
+            timeline.append(data)
+
+    def run(self, concurrency: int, duration: float) -> Dict[str, Any]:
+        """Run one level and return its summary."""
+        results: List[Dict[str, Any]] = []
+        timeline: List[Dict[str, Any]] = []
+        stop = threading.Event()
+        started = time.monotonic()
+        deadline = started + duration
+        sampler = threading.Thread(target=self._sampler, args=(stop, started, timeline), daemon=True)
+        sampler.start()
+        workers = [
+            threading.Thread(target=self._worker, args=(deadline, results), daemon=True)
+            for _ in range(concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stop.set()
+        sampler.join()
+        elapsed = time.monotonic() - started
+        return summarize_level(concurrency, elapsed, results, timeline)
+
+
+def summarize_level(
+    concurrency: int,
+    elapsed: float,
+    results: List[Dict[str, Any]],
+    timeline: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Aggregate raw request results and ``/metrics`` samples of one level."""
+    by_endpoint: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in results:
+        by_endpoint[row["endpoint"]].append(row)
+
+    def describe(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        ok = [r["ms"] for r in rows if not r["error"]]
+        stats = summarize(ok)
+        stats["p99"] = percentile(ok, 99)
+        stats["requests"] = len(rows)
+        stats["errors"] = len(rows) - len(ok)
+        stats["error_rate"] = stats["errors"] / len(rows) if rows else 0.0
+        stats["throughput_rps"] = len(ok) / elapsed if elapsed else 0.0
+        return stats
+
+    busy = [s.get("threadpool_busy", 0) / s["threadpool_size"] for s in timeline if s.get("threadpool_size")]
+    rss = [s.get("rss_bytes", 0) / 1_000_000 for s in timeline]
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "total": describe(results),
+        "endpoints": {name: describe(rows) for name, rows in sorted(by_endpoint.items())},
+        "threadpool_saturation": {
+            "mean": sum(busy) / len(busy) if busy else 0.0,
+            "max": max(busy) if busy else 0.0,
+        },
+        "rss_mb": {"start": rss[0] if rss else 0.0, "max": max(rss) if rss else 0.0},
+        "max_in_flight": max((s.get("in_flight", 0) for s in timeline), default=0),
+        "timeline": timeline,
+    }
+
+
+def find_knee(levels: List[Dict[str, Any]], max_error_rate: float = 0.01, latency_factor: float = 3.0) -> Optional[int]:
+    """Return the highest concurrency before errors or p95 latency blow up.
+
+    A level is considered overloaded when its error rate exceeds
+    ``max_error_rate`` or its p95 is ``latency_factor`` times that of the
+    first level.
+    """
+    if not levels:
+        return None
+    baseline = levels[0]["total"]["p95"] or 0.0
+    best = None
+    for level in levels:
+        total = level["total"]
+        if total["error_rate"] > max_error_rate:
+            break
+        if baseline and total["p95"] > baseline * latency_factor:
+            break
+        best = level["concurrency"]
+    return best
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Return a human readable table of :func:`run_levels` output."""
+    lines = [f"base_url={report['base_url']} mix={report['mix']}"]
+    for level in report["levels"]:
+        total = level["total"]
+        lines.append(
+            f"c={level['concurrency']:<4d} rps={total['throughput_rps']:7.2f} "
+            f"p50={total['p50']:8.0f}ms p95={total['p95']:8.0f}ms p99={total['p99']:8.0f}ms "
+            f"err={total['error_rate']:6.1%} pool={level['threadpool_saturation']['max']:5.0%} "
+            f"rss={level['rss_mb']['max']:6.1f}MB"
+        )
+        for name, stats in level["endpoints"].items():
+            lines.append(
+                f"    {name:14s} n={stats['requests']:<5d} p95={stats['p95']:8.0f}ms err={stats['error_rate']:6.1%}"
+            )
+    lines.append(f"sustainable concurrency: {report['knee']}")
+    return "\n".join(lines)
+
+
+def compare_reports(old: Dict[str, Any], new: Dict[str, Any]) -> str:
+    """Return throughput and p95 deltas for concurrency levels present in both reports."""
+    previous = {level["concurrency"]: level for level in old.get("levels", [])}
+    lines = [f"compare: {old.get('label') or 'old'} -> {new.get('label') or 'new'}"]
+    for level in new["levels"]:
+        before = previous.get(level["concurrency"])
+        if not before:
+            continue
+        a, b = before["total"], level["total"]
+        rps = (b["throughput_rps"] / a["throughput_rps"] - 1) if a["throughput_rps"] else 0.0
+        p95 = (b["p95"] / a["p95"] - 1) if a["p95"] else 0.0
+        lines.append(
+            f"c={level['concurrency']:<4d} rps {a['throughput_rps']:.2f}->{b['throughput_rps']:.2f} ({rps:+.0%}) "
+            f"p95 {a['p95']:.0f}->{b['p95']:.0f}ms ({p95:+.0%}) "
+            f"err {a['error_rate']:.1%}->{b['error_rate']:.1%}"
+        )
+    lines.append(f"sustainable concurrency: {old.get('knee')} -> {new.get('knee')}")
+    return "\n".join(lines)
+
+
+def run_levels(
+    generator: LoadGenerator,
+    levels: List[int],
+    duration: float,
+    label: str = "",
+) -> Dict[str, Any]:
+    """Run every concurrency level in turn and build the capacity report."""
+    results = [generator.run(concurrency, duration) for concurrency in levels]
+    return {
+        "label": label,
+        "base_url": generator.base_url,
+        "mix": generator.mix,
+        "site": generator.site,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "levels": results,
+        "knee": find_knee(results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive the API with concurrent requests")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated levels")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per level")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--site", default=DEFAULT_SITE, help="website sent to /analyze and /scrape")
+    parser.add_argument("--company", default="")
+    parser.add_argument("--depth", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--label", default="", help="name of this run, e.g. a git revision")
+    parser.add_argument("--output", type=Path, help="write the JSON capacity report here")
+    parser.add_argument("--compare", type=Path, help="previous capacity report to compare with")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(
+        args.base_url,
+        parse_mix(args.mix),
+        site=args.site,
+        company=args.company,
+        depth=args.depth,
+        timeout=args.timeout,
+        sample_interval=args.sample_interval,
+    )
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    report = run_levels(generator, levels, args.duration, args.label)
+    print(format_report(report))
+    if args.compare:
+        print(compare_reports(json.loads(args.compare.read_text(encoding="utf-8")), report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
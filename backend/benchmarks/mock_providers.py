@@ -0,0 +1,293 @@
+"""Local stand-in for the search, LinkedIn and LLM providers used by the backend.
+
+Serves the response shapes that ``search_tools``, ``news_search``,
+``linkedin_finder`` and the OpenAI chat completions API return, plus a small
+synthetic company website for the scrapers. Every provider has configurable
+latency (log-normal around a median), error rate and 429 behaviour.
+
+Run it and point the backend at it::
+
+    uvicorn backend.benchmarks.mock_providers:app --port 9000
+
+    SERPAPI_URL=http://127.0.0.1:9000/serpapi/search
+    BRAVE_SEARCH_URL=http://127.0.0.1:9000/brave/web/search
+    BRAVE_NEWS_URL=http://127.0.0.1:9000/brave/news/search
+    GOOGLE_CSE_URL=http://127.0.0.1:9000/cse/v1
+    EXA_API_URL=http://127.0.0.1:9000/exa/search
+    OPENAI_BASE_URL=http://127.0.0.1:9000/openai/v1
+
+Settings can be changed at runtime with ``PUT /_config/{provider}``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import json
+import os
+import random
+import time
+from typing import Any, Deque, Dict, List, Optional
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+
+PROVIDERS = ["serpapi", "brave", "cse", "exa", "openai", "site"]
+
+
+def _default_config(provider: str) -> Dict[str, float]:
+    prefix = f"MOCK_{provider.upper()}_"
+
+    def value(name: str, default: str) -> float:
+        return float(os.getenv(prefix + name, os.getenv("MOCK_" + name, default)))
+
+    return {
+        "latency_ms": value("LATENCY_MS", "1500" if provider == "openai" else "150"),
+        "sigma": value("SIGMA", "0.4"),
+        "error_rate": value("ERROR_RATE", "0"),
+        "rate_limit_rate": value("429_RATE", "0"),
+        "max_rps": value("MAX_RPS", "0"),
+        "retry_after": value("RETRY_AFTER", "1"),
+        "tool_call_rate": value("TOOL_CALL_RATE", "0.5"),
+    }
+
+
+CONFIG: Dict[str, Dict[str, float]] = {name: _default_config(name) for name in PROVIDERS}
+_recent: Dict[str, Deque[float]] = {name: deque() for name in PROVIDERS}
+_stats: Dict[str, Dict[str, int]] = {name: {"requests": 0, "errors": 0, "rate_limited": 0} for name in PROVIDERS}
+
+app = FastAPI(title="InsightChain mock providers")
+
+
+async def _simulate(provider: str) -> Optional[JSONResponse]:
+    """Sleep for the configured latency; return an error response if one is drawn."""
+    cfg = CONFIG[provider]
+    stats = _stats[provider]
+    stats["requests"] += 1
+    if cfg["max_rps"] > 0:
+        now = time.monotonic()
+        window = _recent[provider]
+        while window and now - window[0] > 1.0:
+            window.popleft()
+        if len(window) >= cfg["max_rps"]:
+            stats["rate_limited"] += 1
+            return _rate_limited(cfg)
+        window.append(now)
+    if cfg["latency_ms"] > 0:
+        await asyncio.sleep(cfg["latency_ms"] * random.lognormvariate(0.0, cfg["sigma"]) / 1000)
+    if random.random() < cfg["rate_limit_rate"]:
+        stats["rate_limited"] += 1
+        return _rate_limited(cfg)
+    if random.random() < cfg["error_rate"]:
+        stats["errors"] += 1
+        return JSONResponse(status_code=500, content={"error": {"message": f"mock {provider} error"}})
+    return None
+
+
+def _rate_limited(cfg: Dict[str, float]) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"error": {"message": "Rate limit exceeded"}},
+        headers={"Retry-After": str(int(cfg["retry_after"]))},
+    )
+
+
+def _hits(query: str, count: int = 10) -> List[Dict[str, str]]:
+    slug = "-".join(query.lower().split())[:40] or "acme"
+    hits = []
+    for i in range(count):
+        if i % 3 == 0:
+            url = f"https://www.linkedin.com/in/{slug}-person-{i}"
+            title = f"Ayşe Yılmaz {i} - Genel Müdür - {query} | LinkedIn"
+        elif i % 3 == 1:
+            url = f"https://www.linkedin.com/company/{slug}"
+            title = f"{query} | LinkedIn"
+        else:
+            url = f"https://news.example.com/{slug}/{i}"
+            title = f"{query} yeni yatırım haberi {i}"
+        hits.append({"title": title, "url": url, "snippet": f"{query} hakkında örnek sonuç {i}."})
+    return hits
+
+
+# -- search providers -------------------------------------------------------
+@app.get("/serpapi/search")
+async def serpapi(q: str = "", num: int = 10):
+    error = await _simulate("serpapi")
+    if error:
+        return error
+    return {"organic_results": [{"title": h["title"], "link": h["url"], "snippet": h["snippet"]} for h in _hits(q, num)]}
+
+
+@app.get("/brave/web/search")
+async def brave_web(q: str = "", count: int = 10):
+    error = await _simulate("brave")
+    if error:
+        return error
+    return {"web": {"results": [{"title": h["title"], "url": h["url"], "description": h["snippet"]} for h in _hits(q, count)]}}
+
+
+@app.get("/brave/news/search")
+async def brave_news(q: str = "", count: int = 3):
+    error = await _simulate("brave")
+    if error:
+        return error
+    return {"results": [{"title": f"{q} haber {i}", "url": f"https://news.example.com/{i}"} for i in range(count)]}
+
+
+@app.get("/cse/v1")
+async def google_cse(q: str = "", num: int = 10):
+    error = await _simulate("cse")
+    if error:
+        return error
+    return {"items": [{"title": h["title"], "link": h["url"], "snippet": h["snippet"]} for h in _hits(q, num)]}
+
+
+@app.post("/exa/search")
+async def exa(request: Request):
+    error = await _simulate("exa")
+    if error:
+        return error
+    payload = await request.json()
+    query = payload.get("query", "").replace("site:linkedin.com/company", "").strip()
+    return {"results": [{"url": h["url"], "title": h["title"]} for h in _hits(query, payload.get("numResults", 3))]}
+
+
+# -- OpenAI chat completions ------------------------------------------------
+# Union of the JSON keys every structured step asks for
+MOCK_JSON: Dict[str, Any] = {
+    "company_name": "Örnek Makine",
+    "summary": "Hidrolik ve pnömatik sistem üreticisi.",
+    "sector": "Makine",
+    "notable_products_or_services": "Hidrolik silindirler",
+    "sales_signals": ["Yeni tesis yatırımı"],
+    "company_summary": "Örnek Makine hidrolik sistemler üretir.",
+    "products_services": "Hidrolik silindir, pnömatik valf",
+    "production_technology": "CNC işleme",
+    "machinery": "CNC torna",
+    "services": "Bakım",
+    "r_and_d": "Ar-Ge merkezi",
+    "decision_makers": [],
+    "linkedin_url": "",
+    "company_size": "201-500",
+    "location": "Bursa",
+    "recent_news": ["Yeni hat devreye alındı"],
+    "risks": "Bilgi yok",
+    "actionable_insights": ["Bakım hizmeti öner"],
+    "executive_summary": "Örnek Makine güçlü bir aday.",
+    "company_overview": "Bursa merkezli üretici.",
+    "growth_signals": ["Kapasite artışı"],
+    "sales_opportunities": ["Pnömatik hat otomasyonu"],
+    "actions": ["Ziyaret planla"],
+}
+
+
+_JSON_TYPES = {"object": dict, "array": list, "string": str}
+
+
+def _sample_from_schema(schema: Dict[str, Any]) -> Any:
+    kind = schema.get("type")
+    if kind == "object":
+        sample = {}
+        for key, sub in schema.get("properties", {}).items():
+            value = MOCK_JSON.get(key)
+            # strict schemas never return a list where a string is declared
+            if not isinstance(value, _JSON_TYPES.get(sub.get("type"), ())):
+                value = _sample_from_schema(sub)
+            sample[key] = value
+        return sample
+    if kind == "array":
+        return []
+    return "mock"
+
+
+def _tool_call(tool: Dict[str, Any]) -> Dict[str, Any]:
+    function = tool.get("function", {})
+    params = function.get("parameters", {})
+    required = params.get("required") or list(params.get("properties", {}))
+    args = {name: "mock" for name in required}
+    return {
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": function.get("name", ""), "arguments": json.dumps(args)},
+    }
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    error = await _simulate("openai")
+    if error:
+        return error
+    body = await request.json()
+    messages = body.get("messages", [])
+    tools = body.get("tools") or []
+    already_called = any(m.get("role") == "tool" for m in messages)
+    message: Dict[str, Any] = {"role": "assistant", "content": None}
+    finish = "stop"
+    if (
+        tools
+        and body.get("tool_choice") != "none"
+        and not already_called
+        and random.random() < CONFIG["openai"]["tool_call_rate"]
+    ):
+        message["tool_calls"] = [_tool_call(random.choice(tools))]
+        finish = "tool_calls"
+    else:
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content = _sample_from_schema(response_format["json_schema"].get("schema", {}))
+        else:
+            content = MOCK_JSON
+        message["content"] = json.dumps(content, ensure_ascii=False)
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    completion_tokens = len(message["content"] or "") // 4 + 10
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+# -- synthetic company website ----------------------------------------------
+SITE_PAGES = ["hakkimizda", "urunler", "makine-parki", "ar-ge", "kariyer", "iletisim", "kvkk"]
+
+
+@app.get("/site/robots.txt")
+async def site_robots():
+    return HTMLResponse("User-agent: *\nAllow: /\n", media_type="text/plain")
+
+
+@app.get("/site/{path:path}")
+async def site(path: str = ""):
+    error = await _simulate("site")
+    if error:
+        return error
+    links = "".join(f'<li><a href="/site/{p}">{p.replace("-", " ").title()}</a></li>' for p in SITE_PAGES)
+    title = path.replace("-", " ").title() or "Ana Sayfa"
+    body = " ".join(["Örnek Makine hidrolik ve pnömatik sistemler üretir."] * 40)
+    return HTMLResponse(
+        f"<html><head><title>Örnek Makine - {title}</title></head>"
+        f"<body><nav><ul>{links}</ul></nav><h1>{title}</h1><p>{body}</p></body></html>"
+    )
+
+
+# -- control ----------------------------------------------------------------
+@app.get("/_config")
+async def get_config():
+    return {"config": CONFIG, "stats": _stats}
+
+
+@app.put("/_config/{provider}")
+async def set_config(provider: str, request: Request):
+    if provider not in CONFIG:
+        return JSONResponse(status_code=404, content={"error": f"unknown provider {provider}"})
+    updates = await request.json()
+    CONFIG[provider].update({k: float(v) for k, v in updates.items() if k in CONFIG[provider]})
+    return CONFIG[provider]
@@ -0,0 +1,184 @@
+"""Offline benchmark runner for the analysis pipeline.
+
+Record a cassette once with real API keys, then replay it any number of
+times without network access or keys::
+
+    python -m backend.benchmarks.pipeline_bench --record --url https://ornek.com.tr \\
+        --cassette cassettes/ornek.json
+    python -m backend.benchmarks.pipeline_bench --url https://ornek.com.tr \\
+        --cassette cassettes/ornek.json --iterations 5 --latency http=150,openai=1500
+
+The report lists per-stage p50/p95 latency, HTTP and OpenAI call counts,
+tokens and peak Python memory per iteration.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from contextlib import ExitStack
+import json
+import os
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+from .cassette import Cassette, LatencyProfile
+from .stats import summarize
+
+TARGETS = ["run_pipeline", "orchestrate_scraping", "generate_report"]
+
+# (module, attribute) pairs timed as pipeline stages
+STAGES = [
+    ("backend.agents.orchestrator_agent", "orchestrate_scraping"),
+    ("backend.agents.orchestrator_agent", "orchestrate_linkedin"),
+    ("backend.agents.orchestrator_agent", "analyze_data"),
+    ("backend.agents.orchestrator_agent", "targeted_search"),
+    ("backend.agents.orchestrator_agent", "generate_report"),
+    ("backend.agents.scraper_agent", "crawl_site"),
+    ("backend.agents.scraper_agent", "extract_company_info"),
+]
+
+DUMMY_KEYS = [
+    "OPENAI_API_KEY",
+    "SERPAPI_API_KEY",
+    "BRAVE_API_KEY",
+    "GOOGLE_API_KEY",
+    "GOOGLE_CSE_ID",
+    "EXA_API_KEY",
+]
+
+SAMPLE_ANALYSIS = {"company_summary": "", "decision_makers": []}
+
+
+def _timed(name: str, func: Callable[..., Any], timings: Dict[str, List[float]]) -> Callable[..., Any]:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[name].append((time.perf_counter() - start) * 1000)
+
+    return wrapper
+
+
+def run_benchmark(
+    target: str,
+    cassette: Cassette,
+    iterations: int = 1,
+    url: str = "",
+    depth: int = 1,
+    analysis: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Run ``target`` ``iterations`` times inside ``cassette`` and report."""
+    import importlib
+
+    from ..agents import orchestrator_agent, reporter_agent, scraper_agent
+
+    calls: Dict[str, Callable[[], Any]] = {
+        "run_pipeline": lambda: orchestrator_agent.run_pipeline(url, depth=depth),
+        "orchestrate_scraping": lambda: scraper_agent.orchestrate_scraping(url, depth),
+        "generate_report": lambda: reporter_agent.generate_report(
+            json.dumps(analysis or SAMPLE_ANALYSIS, ensure_ascii=False)
+        ),
+    }
+    timings: Dict[str, List[float]] = defaultdict(list)
+    per_iteration: List[Dict[str, Any]] = []
+    with ExitStack() as stack:
+        stack.enter_context(cassette)
+        for module_name, attr in STAGES:
+            module = importlib.import_module(module_name)
+            original = getattr(module, attr)
+            stack.enter_context(mock.patch.object(module, attr, _timed(attr, original, timings)))
+        for _ in range(iterations):
+            cassette.rewind()
+            tracemalloc.start()
+            start = time.perf_counter()
+            error = ""
+            try:
+                calls[target]()
+            except Exception as exc:  # keep measuring the remaining iterations
+                error = repr(exc)
+            elapsed = (time.perf_counter() - start) * 1000
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            timings[target].append(elapsed)
+            per_iteration.append(
+                {
+                    "ms": elapsed,
+                    "http_calls": cassette.calls["http"],
+                    "openai_calls": cassette.calls["openai"],
+                    "tokens": cassette.tokens,
+                    "peak_mb": peak / 1_000_000,
+                    "error": error,
+                }
+            )
+    return {
+        "target": target,
+        "iterations": iterations,
+        "stages": {name: summarize(values) for name, values in timings.items()},
+        "runs": per_iteration,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Return a human readable summary of :func:`run_benchmark` output."""
+    lines = [f"target={report['target']} iterations={report['iterations']}"]
+    for name, stats in sorted(report["stages"].items()):
+        lines.append(
+            f"  {name:22s} n={stats['count']:<3d} p50={stats['p50']:9.1f}ms p95={stats['p95']:9.1f}ms"
+        )
+    runs = report["runs"]
+    if runs:
+        last = runs[-1]
+        lines.append(
+            f"  calls/iter: http={last['http_calls']} openai={last['openai_calls']} "
+            f"tokens={last['tokens']} peak_mem={max(r['peak_mb'] for r in runs):.1f}MB"
+        )
+        errors = [r["error"] for r in runs if r["error"]]
+        if errors:
+            lines.append(f"  errors: {len(errors)} (first: {errors[0]})")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay the pipeline against a cassette")
+    parser.add_argument("--cassette", type=Path, required=True)
+    parser.add_argument("--target", choices=TARGETS, default="run_pipeline")
+    parser.add_argument("--url", default="")
+    parser.add_argument("--depth", type=int, default=1)
+    parser.add_argument("--analysis", type=Path, help="analysis JSON for --target generate_report")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--latency", default="", help="e.g. http=150,openai=1500,serpapi.com=800")
+    parser.add_argument("--sigma", type=float, default=0.3)
+    parser.add_argument("--record", action="store_true", help="record real responses instead of replaying")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+
+    if not args.record:
+        # tools refuse to run without keys; replay never sends them anywhere
+        for key in DUMMY_KEYS:
+            os.environ.setdefault(key, "replay")
+    analysis = json.loads(args.analysis.read_text(encoding="utf-8")) if args.analysis else None
+    cassette = Cassette(
+        args.cassette,
+        mode="record" if args.record else "replay",
+        latency=LatencyProfile.parse(args.latency, args.sigma),
+    )
+    report = run_benchmark(
+        args.target,
+        cassette,
+        iterations=1 if args.record else args.iterations,
+        url=args.url,
+        depth=args.depth,
+        analysis=analysis,
+    )
+    print(format_report(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
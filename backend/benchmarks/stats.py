@@ -0,0 +1,24 @@
+"""Small statistics helpers shared by the benchmark tools."""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Return the ``q`` (0-100) percentile using nearest-rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Return count, p50, p95 and max of ``values``."""
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values) if values else 0.0,
+    }
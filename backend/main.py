@@ -1,16 +1,53 @@
-from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi import BackgroundTasks, FastAPI, Query, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from anyio import to_thread
+from contextlib import asynccontextmanager
+import os
 import socket
 import requests
 
 from .agents import (
     orchestrate_scraping,
     orchestrate_linkedin,
-    run_pipeline,
 )
+from .utils import metrics, normalize_domain
+from .utils.job_queue import DONE, FAILED, get_queue
+from .utils.provider_health import health_snapshot
+from .workflows import company_analysis_workflow, run_company_analysis
 
-app = FastAPI(title="InsightChain API")
+# "inline" runs the pipeline in the request; "queue" hands it to backend.worker
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "inline")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the profile refresh scheduler when ``REFRESH_SCHEDULER=1``."""
+    scheduler = None
+    if os.getenv("REFRESH_SCHEDULER") == "1":
+        from .workflows.refresh_scheduler import RefreshScheduler
+
+        scheduler = RefreshScheduler()
+        scheduler.start()
+    yield
+    if scheduler:
+        scheduler.stop(timeout=5)
+
+
+app = FastAPI(title="InsightChain API", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    """Count in-flight requests and server errors for ``/metrics``."""
+    metrics.request_started()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.request_finished(status)
 
 
 @app.exception_handler(Exception)
@@ -55,6 +92,26 @@ def read_root():
     return {"message": "InsightChain backend is running"}
 
 
+@app.get("/provider_health")
+def provider_health():
+    """Return rolling health statistics and circuit state per provider."""
+    return health_snapshot()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Return in-flight requests, threadpool usage and memory of this worker.
+
+    Async so it is served from the event loop even when every threadpool
+    token is taken by a sync endpoint.
+    """
+    limiter = to_thread.current_default_thread_limiter()
+    data = metrics.snapshot()
+    data["threadpool_busy"] = limiter.borrowed_tokens
+    data["threadpool_size"] = int(limiter.total_tokens)
+    return data
+
+
 @app.get("/scrape")
 def scrape(url: str = Query(..., description="Company website URL")):
     """Endpoint that triggers the scraping workflow."""
@@ -76,13 +133,68 @@ class AnalyzeRequest(BaseModel):
     website: str
     company: str | None = None
     depth: int = 1
+    max_age: int | None = None
 
 
 @app.post("/analyze")
-def analyze(req: AnalyzeRequest):
-    """Run the full analysis pipeline for a company website."""
-    result = run_pipeline(req.website, req.company, req.depth)
+def analyze(req: AnalyzeRequest, background_tasks: BackgroundTasks):
+    """Run the full analysis pipeline for a company website.
+
+    Stored profiles are served when fresh enough; stale ones are refreshed
+    after the response is sent. ``max_age`` (seconds) forces a rerun for
+    anything older. In queue mode a missing profile is enqueued and the
+    response is ``202`` with a ``job_id`` to poll.
+    """
+    if EXECUTION_MODE == "queue":
+        return _enqueue_analysis(req)
+    result = run_company_analysis(
+        req.website,
+        req.company,
+        req.depth,
+        max_age=req.max_age,
+        schedule=background_tasks.add_task,
+    )
     return result
 
 
+def _enqueue_analysis(req: AnalyzeRequest):
+    stored, status = company_analysis_workflow.lookup(
+        req.website, req.max_age, company=req.company, depth=req.depth
+    )
+    if status == company_analysis_workflow.FRESH:
+        return stored
+    payload = {"website": req.website, "company": req.company, "depth": req.depth}
+    job_id = get_queue().enqueue("analyze", payload, dedupe_key=normalize_domain(req.website))
+    if status == company_analysis_workflow.STALE:
+        return stored
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"},
+    )
+
+
+def _get_job(job_id: str, with_result: bool = False):
+    job = get_queue().get(job_id, with_result)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    """Return the status, attempt count and last error of a queued job."""
+    return _get_job(job_id)
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    """Return the result of a finished job, ``202`` while it is still pending."""
+    job = _get_job(job_id, with_result=True)
+    if job["status"] == DONE:
+        return job["result"]
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=job["error"] or "Job failed")
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": job["status"]})
+
+
 # Future endpoints for agent orchestration will live here.
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# keep test runs from writing pipeline.log into the working tree
+os.environ.setdefault("PIPELINE_LOGFILE", os.path.join(tempfile.gettempdir(), "insightchain-test-pipeline.log"))
@@ -0,0 +1,109 @@
+import json
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.utils import metrics
+from backend.utils.batch_client import (
+    BatchError,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    batch_line,
+    run_batch,
+)
+
+
+def _completion(content):
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+class FakeBackend:
+    def __init__(self, states, results):
+        self.states = list(states)
+        self._results = results
+        self.cancelled = False
+
+    def submit(self, lines):
+        self.lines = lines
+        return "batch_1"
+
+    def status(self, batch_id):
+        return self.states.pop(0) if len(self.states) > 1 else self.states[0]
+
+    def results(self, batch_id):
+        return self._results
+
+    def cancel(self, batch_id):
+        self.cancelled = True
+
+
+class RunBatchTest(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_local_backend_answers_by_custom_id(self):
+        def create(**body):
+            content = body["messages"][0]["content"]
+            if content == "bozuk":
+                raise RuntimeError("500")
+            return _completion(content.upper())
+
+        client = MagicMock()
+        client.chat.completions.create.side_effect = create
+        lines = [batch_line("a", {"model": "m", "messages": [{"role": "user", "content": "acme"}]}),
+                 batch_line("b", {"model": "m", "messages": [{"role": "user", "content": "bozuk"}]})]
+
+        answers = run_batch(lines, LocalBatchBackend(client), poll_seconds=0)
+
+        self.assertEqual(answers, {"a": "ACME", "b": None})
+        self.assertEqual(metrics.snapshot()["batch_failed"], 1)
+        self.assertEqual(lines[0]["url"], "/v1/chat/completions")
+
+    def test_polls_until_done_and_skips_failed_lines(self):
+        ok = {"custom_id": "a", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "{}"}}]}}}
+        throttled = {"custom_id": "b", "response": {"status_code": 429, "body": {}}, "error": None}
+        backend = FakeBackend(["validating", "in_progress", "completed"], [ok, throttled])
+
+        answers = run_batch([batch_line("a", {}), batch_line("b", {})], backend, poll_seconds=0)
+
+        self.assertEqual(answers, {"a": "{}", "b": None})
+        self.assertEqual(backend.states, ["completed"])
+
+    def test_timeout_cancels_batch(self):
+        backend = FakeBackend(["in_progress"], [])
+        with self.assertRaises(BatchError):
+            run_batch([batch_line("a", {})], backend, poll_seconds=0, timeout=0)
+        self.assertTrue(backend.cancelled)
+
+
+class OpenAIBatchBackendTest(unittest.TestCase):
+    def test_uploads_jsonl_and_reads_output_and_error_files(self):
+        client = MagicMock()
+        client.files.create.return_value = types.SimpleNamespace(id="file_in")
+        client.batches.create.return_value = types.SimpleNamespace(id="batch_1")
+        client.batches.retrieve.return_value = types.SimpleNamespace(
+            status="completed", output_file_id="file_out", error_file_id="file_err"
+        )
+        files = {
+            "file_out": '{"custom_id": "a", "response": {"status_code": 200, "body": {}}}\n',
+            "file_err": '{"custom_id": "b", "error": {"message": "x"}}\n',
+        }
+        client.files.content.side_effect = lambda file_id: types.SimpleNamespace(text=files[file_id])
+        backend = OpenAIBatchBackend(client)
+
+        batch_id = backend.submit([batch_line("a", {"model": "m"}), batch_line("b", {"model": "m"})])
+
+        self.assertEqual(batch_id, "batch_1")
+        name, data = client.files.create.call_args.kwargs["file"]
+        self.assertEqual([json.loads(line)["custom_id"] for line in data.decode().splitlines()], ["a", "b"])
+        self.assertEqual(client.batches.create.call_args.kwargs["completion_window"], "24h")
+        self.assertEqual([line["custom_id"] for line in backend.results(batch_id)], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.utils import batch_client, metrics
+from backend.utils.batch_client import LocalBatchBackend
+from backend.utils.profile_store import ProfileStore
+from backend.workflows.bulk_refresh import bulk_refresh
+
+RESULT = {
+    "scrape": {"company_name": "Örnek"},
+    "linkedin": {"contacts": []},
+    "analysis": {"summary": "{}", "news": []},
+    "report": "<html>eski</html>",
+}
+
+ANSWERS = {
+    "CompanyInfo": {"company_name": "Örnek A.Ş.", "summary": "Hidrolik sistemler üretir."},
+    "Analysis": {"company_summary": "Hidrolik üretici", "sector": "Makine"},
+    "ReportSections": {"executive_summary": "Güçlü aday", "actions": ["Ziyaret planla"]},
+}
+
+
+def _create(**body):
+    name = body["response_format"]["json_schema"]["name"]
+    content = json.dumps(ANSWERS[name], ensure_ascii=False)
+    if "bozuk.com.tr" in body["messages"][0]["content"] and name == "Analysis":
+        content = '{"sector": ['
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@patch("backend.agents.reporter_agent.prefetch_context", return_value={"news": []})
+@patch("backend.workflows.refresh_scheduler.brave_news", return_value={"news": [{"title": "yeni"}]})
+@patch("backend.workflows.refresh_scheduler.orchestrate_linkedin", return_value={"contacts": [{"full_name": "Ayşe"}]})
+@patch("backend.workflows.refresh_scheduler.site_unchanged", return_value=False)
+@patch("backend.workflows.refresh_scheduler.orchestrate_scraping")
+class BulkRefreshTest(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProfileStore(str(Path(self.tmp.name) / "profiles.db"))
+        for site in ("ornek.com.tr", "bozuk.com.tr"):
+            self.store.save(site, RESULT)
+        self.client = MagicMock()
+        self.client.chat.completions.create.side_effect = _create
+        self.backend = LocalBatchBackend(self.client)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stages_run_as_batches_and_results_are_saved(self, scraping, unchanged, linkedin, news, prefetch):
+        scraping.side_effect = lambda url, depth, extract: {"html": f"<html>{url}</html>", "duration_ms": 1}
+
+        with patch("backend.workflows.bulk_refresh.run_batch", wraps=batch_client.run_batch) as run_batch, patch(
+            "backend.agents.data_analyst_agent.analyze_data",
+            return_value={"summary": '{"company_summary": "tekrar"}', "news": []},
+        ) as analyze:
+            refreshed = bulk_refresh(self.store, websites=["ornek.com.tr", "bozuk.com.tr"], backend=self.backend)
+
+        self.assertEqual(sorted(r["domain"] for r in refreshed), ["bozuk.com.tr", "ornek.com.tr"])
+        self.assertFalse(any(c.kwargs.get("extract", True) for c in scraping.call_args_list))
+        # one batch per LLM stage, each holding both companies
+        self.assertEqual([len(c.args[0]) for c in run_batch.call_args_list], [2, 2, 2])
+
+        profile = self.store.get("ornek.com.tr")
+        self.assertEqual(profile["scrape"]["company_name"], "Örnek A.Ş.")
+        summary = json.loads(profile["analysis"]["summary"])
+        self.assertEqual(summary["sector"], "Makine")
+        self.assertEqual(summary["decision_makers"], [{"full_name": "Ayşe"}])
+        self.assertIn("Güçlü aday", profile["report"])
+        self.assertEqual(profile["news"]["news"][0]["title"], "yeni")
+
+        # the invalid batch answer was redone with the interactive analyst
+        analyze.assert_called_once()
+        self.assertEqual(json.loads(self.store.get("bozuk.com.tr")["analysis"]["summary"])["company_summary"], "tekrar")
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["llm_analysis_parse_failed"], 1)
+        self.assertEqual(snapshot["bulk_analysis_interactive"], 1)
+
+    def test_failed_gather_skips_company(self, scraping, unchanged, linkedin, news, prefetch):
+        def scrape(url, depth, extract):
+            if "bozuk" in url:
+                raise RuntimeError("All scraping tools failed")
+            return {"html": "<html>ok</html>", "duration_ms": 1}
+
+        scraping.side_effect = scrape
+        refreshed = bulk_refresh(self.store, websites=["ornek.com.tr", "bozuk.com.tr"], backend=self.backend)
+
+        self.assertEqual([r["domain"] for r in refreshed], ["ornek.com.tr"])
+        self.assertEqual(self.store.get("bozuk.com.tr")["report"], "<html>eski</html>")
+
+    def test_failed_batch_job_is_redone_interactively(self, scraping, unchanged, linkedin, news, prefetch):
+        scraping.side_effect = lambda url, depth, extract: {"html": "<html>ok</html>", "duration_ms": 1}
+        backend = MagicMock()
+        backend.submit.side_effect = RuntimeError("upload failed")
+
+        with patch(
+            "backend.agents.scraper_agent.extract_company_info", return_value=ANSWERS["CompanyInfo"]
+        ), patch(
+            "backend.agents.data_analyst_agent.analyze_data", return_value={"summary": "{}", "news": []}
+        ) as analyze, patch(
+            "backend.agents.reporter_agent.generate_report", return_value={"html": "<html>tekil</html>"}
+        ):
+            refreshed = bulk_refresh(self.store, websites=["ornek.com.tr"], backend=backend)
+
+        self.assertEqual([r["domain"] for r in refreshed], ["ornek.com.tr"])
+        analyze.assert_called_once()
+        profile = self.store.get("ornek.com.tr")
+        self.assertEqual(profile["report"], "<html>tekil</html>")
+        self.assertEqual(profile["news"]["news"][0]["title"], "yeni")
+        self.assertEqual(metrics.snapshot()["bulk_analysis_batch_failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.benchmarks.cassette import Cassette, CassetteMiss
+from backend.utils import llm
+
+
+def _fake_transport(session, method, url, **kwargs):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.headers["Content-Type"] = "application/json"
+    resp._content = b'{"organic_results": [{"title": "Acme"}]}'
+    # like a real response, the final URL carries the query string
+    resp.url = requests.Request(method, url, params=kwargs.get("params")).prepare().url
+    return resp
+
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [
+        {
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "{\"ok\": true}"},
+        }
+    ],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+}
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        from openai.types.chat import ChatCompletion
+
+        self.calls += 1
+        return ChatCompletion.model_validate(COMPLETION)
+
+
+class CassetteTest(unittest.TestCase):
+    def test_record_then_replay_without_network(self):
+        completions = _FakeCompletions()
+        fake_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        messages = [{"role": "user", "content": "hi"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cassette.json"
+            with Cassette(path, mode="record", http_transport=_fake_transport, openai_client=fake_client):
+                requests.get("https://serpapi.com/search", params={"q": "acme", "api_key": "secret"})
+                llm.get_client().chat.completions.create(model="gpt-4o", messages=messages)
+            self.assertNotIn("secret", path.read_text())
+            self.assertIn("q=acme", path.read_text())
+
+            with Cassette(path) as cassette:
+                resp = requests.get("https://serpapi.com/search", params={"q": "acme", "api_key": "other"})
+                completion = llm.get_client().chat.completions.create(model="gpt-4o", messages=messages)
+                with self.assertRaises(CassetteMiss):
+                    requests.get("https://serpapi.com/search", params={"q": "unknown"})
+
+        self.assertEqual(resp.json()["organic_results"][0]["title"], "Acme")
+        self.assertEqual(completion.choices[0].message.content, '{"ok": true}')
+        self.assertEqual(completions.calls, 1)
+        self.assertEqual(cassette.calls["http"], 2)
+        self.assertEqual(cassette.tokens, 15)
+
+    def test_record_builds_real_client_in_fresh_process(self):
+        completions = _FakeCompletions()
+        fake_client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        with tempfile.TemporaryDirectory() as tmp, patch.object(llm, "_client", None), patch(
+            "openai.OpenAI", return_value=fake_client
+        ):
+            with Cassette(Path(tmp) / "cassette.json", mode="record", http_transport=_fake_transport):
+                completion = llm.get_client().chat.completions.create(model="gpt-4o", messages=[])
+            self.assertIs(llm._client, fake_client)
+
+        self.assertEqual(completion.choices[0].message.content, '{"ok": true}')
+        self.assertEqual(completions.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.tools.contact_resolution import name_tokens, parse_title, resolve_contacts, seniority
+
+
+def _contact(name, title="", url="", summary=""):
+    return {"full_name": name, "title": title, "summary": summary, "source_url": url}
+
+
+class ParsingTest(unittest.TestCase):
+    def test_parse_title_separators(self):
+        self.assertEqual(parse_title("Ayşe Yılmaz – Genel Müdür – Acme | LinkedIn"), ("Ayşe Yılmaz", "Genel Müdür"))
+        self.assertEqual(parse_title("Ali Kaya-Demir - CTO | Acme"), ("Ali Kaya-Demir", "CTO"))
+        self.assertEqual(parse_title("Can Öz | LinkedIn"), ("Can Öz", ""))
+
+    def test_name_tokens_fold_diacritics_and_drop_honorifics(self):
+        self.assertEqual(name_tokens("Prof. Dr. İsmail Çağrı Şahin, MBA"), ["ismail", "cagri", "sahin"])
+
+    def test_seniority(self):
+        self.assertGreater(seniority("Genel Müdür"), seniority("Satış Müdürü"))
+        self.assertGreater(seniority("Satış Müdürü"), seniority("Makine Mühendisi"))
+        self.assertEqual(seniority("Chief Executive Officer"), 100)
+        self.assertEqual(seniority(""), -1)
+
+    def test_qualified_titles_rank_below_the_top(self):
+        self.assertEqual(seniority("Genel Müdür Yardımcısı"), 80)
+        self.assertEqual(seniority("Vice President Sales"), 80)
+        self.assertEqual(seniority("Yönetim Kurulu Başkan Yardımcısı"), 90)
+        self.assertEqual(seniority("Assistant to the CEO"), 20)
+        self.assertEqual(seniority("Genel Müdür"), 100)
+        self.assertEqual(seniority("President"), 100)
+        self.assertEqual(seniority("CEO & Executive Chairman"), 100)
+        self.assertEqual(seniority("Executive Director"), 80)
+
+    def test_deputy_qualifiers_lower_c_level_titles(self):
+        self.assertEqual(seniority("Deputy CEO"), 80)
+        self.assertEqual(seniority("Assistant CEO"), 80)
+        self.assertEqual(seniority("CEO Yardımcısı"), 80)
+        self.assertEqual(seniority("Deputy Chairman"), 90)
+        self.assertEqual(seniority("Deputy CFO"), 60)
+        self.assertEqual(seniority("Executive Vice President"), 80)
+
+
+class ResolveContactsTest(unittest.TestCase):
+    def test_merges_same_person_and_ranks_by_seniority(self):
+        contacts = [
+            _contact("Mehmet Demir", "Satış Uzmanı", "https://www.linkedin.com/in/mdemir"),
+            _contact("Ayse Yilmaz", "CEO", "https://tr.linkedin.com/in/ayse"),
+            _contact("Dr. Ayşe Nur Yılmaz", "CEO at Acme", "", "Uzun özet"),
+            _contact("Ahmet Demir", "Üretim Müdürü", "https://www.linkedin.com/in/ahmet"),
+            _contact("Ayşe Yılmaz", "Satış Müdürü", "https://www.linkedin.com/in/ayse/"),
+        ]
+        resolved = resolve_contacts(contacts)
+        self.assertEqual([c["full_name"] for c in resolved], ["Ayşe Yılmaz", "Ahmet Demir", "Mehmet Demir"])
+        self.assertEqual(resolved[0]["source_url"], "https://www.linkedin.com/in/ayse/")
+        self.assertEqual(resolved[0]["title"], "CEO at Acme")
+        self.assertEqual(resolved[0]["summary"], "Uzun özet")
+        self.assertEqual(resolve_contacts(contacts, limit=1)[0]["full_name"], "Ayşe Yılmaz")
+
+    def test_similar_names_with_different_profiles_stay_apart(self):
+        contacts = [
+            _contact("Ahmet Kara", "Satış Müdürü", "https://www.linkedin.com/in/ahmetkara"),
+            _contact("Ahmet Kaya", "CEO", "https://www.linkedin.com/in/ahmetkaya"),
+            _contact("Ayşe Demir", "CFO", "https://www.linkedin.com/in/a1"),
+            _contact("Ayşe Demirci", "Engineer", "https://www.linkedin.com/in/a2"),
+        ]
+        resolved = resolve_contacts(contacts)
+        self.assertEqual(
+            [(c["full_name"], c["title"]) for c in resolved],
+            [("Ahmet Kaya", "CEO"), ("Ayşe Demir", "CFO"), ("Ahmet Kara", "Satış Müdürü"), ("Ayşe Demirci", "Engineer")],
+        )
+
+    def test_contact_without_profile_keeps_the_senior_title_and_profile_name(self):
+        contacts = [
+            _contact("Ayşe Demir", "CFO", "https://www.linkedin.com/in/a1"),
+            _contact("Ayşe Demirci", "Engineer", ""),
+        ]
+        (merged,) = resolve_contacts(contacts)
+        self.assertEqual(merged["full_name"], "Ayşe Demir")
+        self.assertEqual(merged["title"], "CFO")
+        self.assertEqual(merged["source_url"], "https://www.linkedin.com/in/a1")
+
+    def test_hundreds_of_hits_stay_fast(self):
+        first = ["Ali", "Veli", "Ayşe", "Fatma", "Mehmet", "Zeynep", "Emre", "Elif", "Burak", "Deniz"]
+        last = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Aydın", "Öztürk", "Arslan", "Doğan"]
+        contacts = [
+            _contact(f"{f} {l}", "Mühendis", f"https://www.linkedin.com/in/{i}" if r == 0 else "")
+            for r in range(5)
+            for i, (f, l) in enumerate((f, l) for f in first for l in last)
+        ]
+        start = time.perf_counter()
+        resolved = resolve_contacts(contacts)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(len(resolved), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.tools.crawl_frontier import CrawlFrontier, language_variant, score_url
+
+SITE = "https://www.ornek.com.tr"
+
+
+class ScoreUrlTest(unittest.TestCase):
+    def test_field_pages_rank_above_plain_pages(self):
+        self.assertGreater(score_url(SITE + "/makine-parki", "Makine Parkı"), score_url(SITE + "/iletisim", "İletişim"))
+        self.assertGreater(score_url(SITE + "/page-x", "Ar-Ge Merkezi"), score_url(SITE + "/page-y", "Galeri"))
+
+    def test_low_value_pages_are_skipped(self):
+        for path in ["/kvkk", "/cerez-politikasi", "/privacy-policy", "/blog/tag/yeni", "/haberler/page/3", "/2021/05/etkinlik", "/katalog.pdf"]:
+            self.assertIsNone(score_url(SITE + path), path)
+
+    def test_product_category_pages_are_kept(self):
+        for path in ["/urun-kategori/hidrolik-silindir", "/product-category/valves"]:
+            self.assertGreater(score_url(SITE + path), score_url(SITE + "/iletisim"), path)
+        for path in ["/blog/category/duyurular", "/kategori/genel", "/author/admin"]:
+            self.assertIsNone(score_url(SITE + path), path)
+
+
+class CrawlFrontierTest(unittest.TestCase):
+    def test_pops_best_first_and_ignores_other_sites(self):
+        frontier = CrawlFrontier(SITE + "/")
+        frontier.add(SITE + "/iletisim", "İletişim", level=1)
+        frontier.add(SITE + "/urunler", "Ürünler", level=1)
+        self.assertFalse(frontier.add("https://facebook.com/ornek", "Facebook", level=1))
+        self.assertFalse(frontier.add(SITE + "/urunler#top", "Ürünler", level=1))
+        self.assertEqual(frontier.pop()[0], SITE + "/urunler")
+        self.assertEqual(frontier.pop()[0], SITE + "/iletisim")
+        self.assertIsNone(frontier.pop())
+
+    def test_one_language_variant_preferring_start_language(self):
+        self.assertEqual(language_variant(SITE + "/en/about")[0], language_variant(SITE + "/tr/about")[0])
+        frontier = CrawlFrontier(SITE + "/tr/")
+        frontier.add(SITE + "/en/about", "About", level=1)
+        self.assertTrue(frontier.add(SITE + "/tr/about", "Hakkımızda", level=1))
+        self.assertFalse(frontier.add(SITE + "/de/about", "Über uns", level=1))
+        self.assertEqual(len(frontier), 1)
+        self.assertEqual(frontier.pop()[0], SITE + "/tr/about")
+
+
+if __name__ == "__main__":
+    unittest.main()
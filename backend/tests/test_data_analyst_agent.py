@@ -0,0 +1,72 @@
+import os
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+# Provide dummy modules for heavy scraping dependencies
+sys.modules.setdefault("playwright", types.ModuleType("playwright"))
+playwright_sync = types.ModuleType("playwright.sync_api")
+playwright_sync.sync_playwright = lambda: None
+sys.modules.setdefault("playwright.sync_api", playwright_sync)
+
+selenium_module = types.ModuleType("selenium")
+webdriver_module = types.ModuleType("selenium.webdriver")
+chrome_module = types.ModuleType("selenium.webdriver.chrome")
+chrome_options_module = types.ModuleType("selenium.webdriver.chrome.options")
+webdriver_module.Chrome = lambda options=None: types.SimpleNamespace(get=lambda x: None, page_source="", quit=lambda: None)
+chrome_options_module.Options = object
+selenium_module.webdriver = webdriver_module
+webdriver_module.chrome = chrome_module
+chrome_module.options = chrome_options_module
+sys.modules.setdefault("selenium", selenium_module)
+sys.modules.setdefault("selenium.webdriver", webdriver_module)
+sys.modules.setdefault("selenium.webdriver.chrome", chrome_module)
+sys.modules.setdefault("selenium.webdriver.chrome.options", chrome_options_module)
+
+scrapy_module = types.ModuleType("scrapy")
+crawler_module = types.ModuleType("scrapy.crawler")
+crawler_module.CrawlerProcess = object
+scrapy_module.Spider = object
+sys.modules.setdefault("scrapy", scrapy_module)
+sys.modules.setdefault("scrapy.crawler", crawler_module)
+import json
+
+from backend.agents.data_analyst_agent import analyze_data
+from backend.utils import metrics
+
+
+class AnalyzeDataCascadeTest(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    @patch("backend.agents.data_analyst_agent.get_client")
+    def test_escalates_to_last_default_model_with_schema(self, mock_client):
+        answers = {
+            "gpt-4o-mini": '{"company_summary": "Makine üreticisi", "sector": ""}',
+            "gpt-4o": '{"company_summary": "Makine üreticisi", "sector": "Makine"}',
+        }
+
+        def create(model, **kwargs):
+            message = types.SimpleNamespace(content=answers[model])
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+        mock_client.return_value.chat.completions.create.side_effect = create
+        env = {k: v for k, v in os.environ.items() if k != "LLM_MODELS_ANALYSIS"}
+        with patch.dict(os.environ, env, clear=True):
+            result = analyze_data({}, {"contacts": []}, "Acme", news_data={"news": []})
+
+        calls = mock_client.return_value.chat.completions.create.call_args_list
+        self.assertEqual([c.kwargs["model"] for c in calls], ["gpt-4o-mini", "gpt-4o"])
+        # the escalation target must accept strict structured outputs
+        self.assertEqual(calls[-1].kwargs["response_format"]["type"], "json_schema")
+        self.assertEqual(json.loads(result["summary"])["sector"], "Makine")
+        self.assertEqual(metrics.snapshot()["llm_analysis_accepted_gpt-4o"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
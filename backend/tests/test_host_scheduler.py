@@ -0,0 +1,111 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.tools.host_scheduler import ROBOTS_ERROR_TTL_SECONDS, HostScheduler, HostThrottledError, parse_retry_after
+
+ROBOTS = "User-agent: *\nDisallow: /gizli\nCrawl-delay: 1\n"
+
+
+def _response(status=200, text="", headers=None):
+    resp = Mock()
+    resp.status_code = status
+    resp.text = text
+    resp.headers = headers or {}
+    return resp
+
+
+@patch("backend.tools.host_scheduler.requests.get")
+class HostSchedulerTest(unittest.TestCase):
+    def test_robots_rules_are_cached_and_crawl_delay_spaces_requests(self, mock_get):
+        mock_get.side_effect = lambda url, **kwargs: _response(text=ROBOTS if url.endswith("robots.txt") else "ok")
+        scheduler = HostScheduler(min_delay=0)
+
+        self.assertFalse(scheduler.can_fetch("https://ornek.com.tr/gizli/rapor"))
+        self.assertTrue(scheduler.can_fetch("https://ornek.com.tr/hakkimizda"))
+        start = time.monotonic()
+        scheduler.fetch("https://ornek.com.tr/hakkimizda")
+        scheduler.fetch("https://ornek.com.tr/urunler")
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+        robots_calls = [c for c in mock_get.call_args_list if c.args[0].endswith("robots.txt")]
+        self.assertEqual(len(robots_calls), 1)
+
+    def test_forbidden_robots_disallows_everything(self, mock_get):
+        mock_get.return_value = _response(status=403)
+        self.assertFalse(HostScheduler(min_delay=0).can_fetch("https://ornek.com.tr/"))
+
+    def test_throttled_request_waits_for_retry_after_once(self, mock_get):
+        mock_get.side_effect = [
+            _response(status=429, headers={"Retry-After": "0"}),
+            _response(status=503, headers={"Retry-After": "0"}),
+        ]
+        resp = HostScheduler(min_delay=0).fetch("https://ornek.com.tr/")
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_long_backoff_is_not_retried_but_delays_the_host(self, mock_get):
+        mock_get.return_value = _response(status=429, headers={"Retry-After": "3600"})
+        scheduler = HostScheduler(min_delay=0)
+        self.assertEqual(scheduler.fetch("https://ornek.com.tr/").status_code, 429)
+        self.assertEqual(mock_get.call_count, 1)
+        host = scheduler._host("https://ornek.com.tr")
+        self.assertGreater(host.backoff_until - time.monotonic(), 250)
+
+        start = time.monotonic()
+        with self.assertRaises(HostThrottledError):
+            scheduler.fetch("https://ornek.com.tr/urunler")
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_robots_server_error_is_cached_briefly(self, mock_get):
+        mock_get.return_value = _response(status=500)
+        scheduler = HostScheduler(min_delay=0, robots_ttl=3600)
+        self.assertTrue(scheduler.can_fetch("https://ornek.com.tr/"))
+        expires = scheduler._robots["https://ornek.com.tr"][0] - time.monotonic()
+        self.assertLessEqual(expires, ROBOTS_ERROR_TTL_SECONDS)
+
+    def test_host_caches_are_bounded(self, mock_get):
+        mock_get.return_value = _response(text=ROBOTS)
+        scheduler = HostScheduler(min_delay=0, cache_size=2)
+        for host in ("a.com", "b.com", "a.com", "c.com"):
+            scheduler.can_fetch(f"https://{host}/")
+        self.assertEqual(len(scheduler._hosts), 2)
+        self.assertEqual(list(scheduler._robots), ["https://a.com", "https://c.com"])
+
+    def test_concurrency_is_capped_per_host(self, mock_get):
+        active = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def slow(url, **kwargs):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            return _response()
+
+        mock_get.side_effect = slow
+        scheduler = HostScheduler(max_concurrency=2, min_delay=0)
+        threads = [threading.Thread(target=scheduler.fetch, args=(f"https://ornek.com.tr/{i}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(active["max"], 2)
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_seconds_and_http_date(self):
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470.0), 10.0)
+        self.assertIsNone(parse_retry_after("yarın"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.tools import html_processing
+
+HTML = """
+<html><head><title> Acme Makine </title><style>.x{}</style></head>
+<body><script>var hidden = 1;</script>
+<a href="/hakkimizda">Hakkımızda</a>
+<a href="https://other.com/x">Dış</a>
+<p>Hidrolik   sistemler</p></body></html>
+"""
+
+
+class HtmlProcessingTest(unittest.TestCase):
+    def test_extracts_title_links_and_text(self):
+        result = html_processing.process_page(HTML, "https://acme.com/tr/")
+        self.assertEqual(result["title"], "Acme Makine")
+        self.assertEqual(
+            result["links"],
+            [("https://acme.com/hakkimizda", "Hakkımızda"), ("https://other.com/x", "Dış")],
+        )
+        self.assertIn("Hidrolik sistemler", result["text"])
+        self.assertNotIn("hidden", result["text"])
+
+    def test_process_pool_matches_inline(self):
+        pages = [(HTML, "https://acme.com/")] * 2
+        inline = html_processing.parse_pages(pages)
+        with patch.object(html_processing, "HTML_PARSE_WORKERS", 1):
+            pooled = html_processing.parse_pages(pages)
+        self.assertEqual(pooled, inline)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from fastapi.testclient import TestClient
+
+from backend import main, worker
+from backend.utils.checkpoint_store import CheckpointStore
+from backend.utils.job_queue import DONE, FAILED, QUEUED, JobQueue
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(str(Path(self.tmp.name) / "jobs.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_claim_is_exclusive_and_complete_stores_result(self):
+        job_id = self.queue.enqueue("analyze", {"website": "ornek.com.tr"})
+        job = self.queue.claim("w1")
+        self.assertEqual(job["id"], job_id)
+        self.assertEqual(job["attempts"], 1)
+        self.assertIsNone(self.queue.claim("w2"))
+
+        self.queue.complete(job_id, {"report": "<html></html>"}, "w1")
+        done = self.queue.get(job_id, with_result=True)
+        self.assertEqual(done["status"], DONE)
+        self.assertEqual(done["result"]["report"], "<html></html>")
+
+    def test_dedupe_key_returns_active_job(self):
+        first = self.queue.enqueue("analyze", {}, dedupe_key="ornek.com.tr")
+        self.assertEqual(self.queue.enqueue("analyze", {}, dedupe_key="ornek.com.tr"), first)
+
+    @patch("backend.utils.job_queue.JOB_RETRY_BASE_SECONDS", 0)
+    def test_failed_job_is_retried_until_max_attempts(self):
+        job_id = self.queue.enqueue("analyze", {}, max_attempts=2)
+        self.queue.claim("w1")
+        self.assertEqual(self.queue.fail(job_id, "timeout", "w1"), QUEUED)
+        self.assertEqual(self.queue.claim("w1")["attempts"], 2)
+        self.assertEqual(self.queue.fail(job_id, "timeout", "w1"), FAILED)
+        self.assertIsNone(self.queue.claim("w1"))
+
+    def test_expired_lease_is_reclaimed(self):
+        job_id = self.queue.enqueue("analyze", {})
+        with patch("backend.utils.job_queue.JOB_LEASE_SECONDS", -1):
+            self.queue.claim("crashed")
+        self.assertEqual(self.queue.claim("w2")["id"], job_id)
+
+    def test_job_abandoned_on_every_attempt_fails(self):
+        job_id = self.queue.enqueue("analyze", {}, max_attempts=2)
+        with patch("backend.utils.job_queue.JOB_LEASE_SECONDS", -1):
+            self.queue.claim("crashed-1")
+            self.assertEqual(self.queue.claim("crashed-2")["attempts"], 2)
+            self.assertIsNone(self.queue.claim("w3"))
+        job = self.queue.get(job_id)
+        self.assertEqual(job["status"], FAILED)
+        self.assertEqual(job["attempts"], 2)
+        self.assertIn("abandoned", job["error"])
+
+    @patch("backend.utils.job_queue.JOB_RETRY_BASE_SECONDS", 0)
+    def test_stale_worker_cannot_settle_reclaimed_job(self):
+        job_id = self.queue.enqueue("analyze", {})
+        with patch("backend.utils.job_queue.JOB_LEASE_SECONDS", -1):
+            self.queue.claim("slow")
+        self.queue.claim("w2")
+
+        self.assertFalse(self.queue.renew(job_id, "slow"))
+        self.assertFalse(self.queue.complete(job_id, {"report": "stale"}, "slow"))
+        self.assertIsNone(self.queue.fail(job_id, "timeout", "slow"))
+        self.assertEqual(self.queue.get(job_id)["status"], "running")
+
+        self.assertTrue(self.queue.complete(job_id, {"report": "fresh"}, "w2"))
+        self.assertEqual(self.queue.get(job_id, with_result=True)["result"]["report"], "fresh")
+
+    def test_renewed_lease_is_not_reclaimed(self):
+        job_id = self.queue.enqueue("analyze", {})
+        with patch("backend.utils.job_queue.JOB_LEASE_SECONDS", -1):
+            self.queue.claim("w1")
+        self.assertTrue(self.queue.renew(job_id, "w1"))
+        self.assertIsNone(self.queue.claim("w2"))
+
+    def test_worker_renews_lease_while_handler_runs(self):
+        job_id = self.queue.enqueue("analyze", {})
+        renewed = threading.Event()
+        renew = self.queue.renew
+
+        def spy(*args):
+            renewed.set()
+            return renew(*args)
+
+        def handler(job):
+            self.assertTrue(renewed.wait(5))
+            return {"report": "ok"}
+
+        w = worker.Worker(self.queue, name="test", heartbeat_interval=0.01)
+        with patch.dict(worker.JOB_HANDLERS, {"analyze": handler}), patch.object(self.queue, "renew", side_effect=spy):
+            self.assertTrue(w.run_one())
+        self.assertEqual(self.queue.get(job_id)["status"], DONE)
+
+    def test_worker_runs_handler_and_records_failure(self):
+        ok = self.queue.enqueue("analyze", {"website": "a.com"})
+        bad = self.queue.enqueue("analyze", {"website": "b.com"}, max_attempts=1)
+
+        def handler(job):
+            if job["payload"]["website"] == "b.com":
+                raise RuntimeError("openai down")
+            return {"report": "ok"}
+
+        w = worker.Worker(self.queue, name="test")
+        with patch.dict(worker.JOB_HANDLERS, {"analyze": handler}), patch(
+            "backend.worker.get_checkpoints"
+        ) as mock_checkpoints:
+            self.assertTrue(w.run_one())
+            self.assertTrue(w.run_one())
+            self.assertFalse(w.run_one())
+        self.assertEqual(self.queue.get(ok)["status"], DONE)
+        self.assertIn("openai down", self.queue.get(bad)["error"])
+        mock_checkpoints.return_value.clear.assert_called_once_with(bad)
+
+    def test_worker_prunes_old_checkpoints(self):
+        store = CheckpointStore(str(Path(self.tmp.name) / "checkpoints.db"))
+        store.save("abandoned", "scrape", {"html": ""})
+        store.db.connect().execute("UPDATE checkpoints SET created_at = 0")
+        store.save("running", "scrape", {"html": ""})
+
+        w = worker.Worker(self.queue, name="test")
+        with patch("backend.worker.get_checkpoints", return_value=store):
+            w.prune_checkpoints()
+            self.assertEqual(store.load("abandoned"), {})
+            self.assertIn("scrape", store.load("running"))
+            store.save("abandoned", "scrape", {"html": ""})
+            store.db.connect().execute("UPDATE checkpoints SET created_at = 0 WHERE run_id = 'abandoned'")
+            # pruned at most once per interval
+            w.prune_checkpoints()
+        self.assertIn("scrape", store.load("abandoned"))
+
+
+class QueueModeApiTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(str(Path(self.tmp.name) / "jobs.db"))
+        patchers = [
+            patch.object(main, "EXECUTION_MODE", "queue"),
+            patch.object(main, "get_queue", return_value=self.queue),
+            patch.object(main.company_analysis_workflow, "lookup", return_value=(None, "missing")),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+        self.client = TestClient(main.app)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_analyze_enqueues_and_result_is_polled(self):
+        resp = self.client.post("/analyze", json={"website": "ornek.com.tr"})
+        self.assertEqual(resp.status_code, 202)
+        job_id = resp.json()["job_id"]
+        self.assertEqual(self.client.get(f"/jobs/{job_id}/result").status_code, 202)
+
+        self.queue.claim("w1")
+        self.queue.complete(job_id, {"report": "<html>rapor</html>"}, "w1")
+        self.assertEqual(self.client.get(f"/jobs/{job_id}").json()["status"], DONE)
+        self.assertEqual(self.client.get(f"/jobs/{job_id}/result").json()["report"], "<html>rapor</html>")
+        self.assertEqual(self.client.get("/jobs/unknown").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
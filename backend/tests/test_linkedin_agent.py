@@ -35,7 +35,7 @@ scrapy_module.Spider = object
 sys.modules.setdefault("scrapy", scrapy_module)
 sys.modules.setdefault("scrapy.crawler", crawler_module)
 
-from backend.agents.linkedin_agent import _search_all
+from backend.agents.linkedin_agent import _search_all, orchestrate_linkedin
 
 
 class SearchAllResultsTest(unittest.TestCase):
@@ -52,5 +52,24 @@ class SearchAllResultsTest(unittest.TestCase):
         self.assertGreaterEqual(total, 10)
 
 
+class OrchestrateLinkedinTest(unittest.TestCase):
+    @patch("backend.agents.linkedin_agent._search_all")
+    def test_profiles_found_by_several_engines_yield_one_contact(self, mock_search):
+        mock_search.return_value = {
+            "serpapi": [{"url": "https://tr.linkedin.com/in/ayse", "title": "Ayşe Yılmaz - CEO | Acme"}],
+            "brave": [
+                {"url": "https://www.linkedin.com/company/acme/", "title": "Acme"},
+                {"url": "https://www.linkedin.com/in/ayse?trk=x", "title": "Ayşe Yılmaz - CEO"},
+            ],
+            "google": [{"url": "https://linkedin.com/in/ayse/", "title": "Ayşe Yılmaz"}],
+        }
+
+        result = orchestrate_linkedin("Acme", contacts=True)
+
+        self.assertEqual(result["linkedin_url"], "https://www.linkedin.com/company/acme")
+        self.assertEqual([c["source_url"] for c in result["contacts"]], ["https://www.linkedin.com/in/ayse"])
+        self.assertEqual(len(result["search_results"]), 2)
+
+
 if __name__ == "__main__":
     unittest.main()
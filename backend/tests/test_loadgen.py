@@ -0,0 +1,54 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks import loadgen
+from backend.main import app
+
+
+class MetricsEndpointTest(unittest.TestCase):
+    def test_reports_threadpool_and_memory(self):
+        data = TestClient(app).get("/metrics").json()
+        self.assertGreater(data["threadpool_size"], 0)
+        self.assertGreater(data["rss_bytes"], 0)
+        self.assertEqual(data["in_flight"], 1)
+
+
+class LoadGeneratorTest(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(loadgen.parse_mix("analyze=1,scrape=2"), {"analyze": 1.0, "scrape": 2.0})
+        with self.assertRaises(ValueError):
+            loadgen.parse_mix("unknown=1")
+
+    def test_run_collects_results_and_samples(self):
+        def session():
+            s = MagicMock()
+            s.request.return_value.status_code = 200
+            s.get.return_value.json.return_value = {"threadpool_busy": 20, "threadpool_size": 40, "rss_bytes": 5_000_000}
+            return s
+
+        gen = loadgen.LoadGenerator(
+            "http://api", {"scrape": 1}, sample_interval=0.05, seed=1, session_factory=session
+        )
+        level = gen.run(concurrency=2, duration=0.2)
+        self.assertGreater(level["total"]["requests"], 0)
+        self.assertEqual(level["total"]["error_rate"], 0)
+        self.assertEqual(list(level["endpoints"]), ["scrape"])
+        self.assertEqual(level["threadpool_saturation"]["max"], 0.5)
+        self.assertEqual(level["rss_mb"]["max"], 5.0)
+
+    def test_knee_stops_at_errors_or_latency(self):
+        def level(c, p95, err):
+            return {"concurrency": c, "total": {"p95": p95, "error_rate": err}}
+
+        levels = [level(1, 100, 0), level(4, 200, 0), level(16, 900, 0), level(32, 150, 0.2)]
+        self.assertEqual(loadgen.find_knee(levels), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
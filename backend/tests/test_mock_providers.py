@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+os.environ.setdefault("MOCK_LATENCY_MS", "0")
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks import mock_providers
+
+
+class MockProvidersTest(unittest.TestCase):
+    def setUp(self):
+        for name in mock_providers.PROVIDERS:
+            mock_providers.CONFIG[name] = mock_providers._default_config(name)
+            mock_providers.CONFIG[name]["latency_ms"] = 0
+        self.client = TestClient(mock_providers.app)
+
+    def test_search_shapes(self):
+        serp = self.client.get("/serpapi/search", params={"q": "acme"}).json()
+        self.assertIn("link", serp["organic_results"][0])
+        brave = self.client.get("/brave/web/search", params={"q": "acme"}).json()
+        self.assertIn("description", brave["web"]["results"][0])
+        cse = self.client.get("/cse/v1", params={"q": "acme"}).json()
+        self.assertEqual(len(cse["items"]), 10)
+
+    def test_rate_limit_returns_retry_after(self):
+        self.client.put("/_config/cse", json={"rate_limit_rate": 1, "retry_after": 5})
+        resp = self.client.get("/cse/v1", params={"q": "acme"})
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp.headers["Retry-After"], "5")
+
+    def test_chat_completion_tool_call_then_content(self):
+        self.client.put("/_config/openai", json={"tool_call_rate": 1})
+        tools = [{"type": "function", "function": {"name": "newsfinder", "parameters": {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}}}]
+        first = self.client.post(
+            "/openai/v1/chat/completions",
+            json={"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}], "tools": tools},
+        ).json()
+        call = first["choices"][0]["message"]["tool_calls"][0]
+        self.assertEqual(call["function"]["name"], "newsfinder")
+        final = self.client.post(
+            "/openai/v1/chat/completions",
+            json={"model": "gpt-4o", "messages": [{"role": "tool", "content": "{}"}], "tools": tools},
+        ).json()
+        self.assertIn("company_summary", final["choices"][0]["message"]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
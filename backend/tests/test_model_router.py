@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.utils import metrics
+from backend.utils.model_router import has_fields, models_for, run_cascade
+
+
+class ModelRouterTest(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_models_configurable_per_step(self):
+        with patch.dict(os.environ, {"LLM_MODELS_EXTRACT": " small , large "}):
+            self.assertEqual(models_for("extract"), ["small", "large"])
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("LLM_MODELS_REPORT", None)
+            self.assertEqual(models_for("report"), ["gpt-4o"])
+
+    @patch.dict(os.environ, {"LLM_MODELS_EXTRACT": "small,large"})
+    def test_small_model_answer_is_kept_when_valid(self):
+        calls = []
+        result = run_cascade("extract", lambda m: calls.append(m) or {"name": m}, lambda d: True)
+        self.assertEqual(result, {"name": "small"})
+        self.assertEqual(calls, ["small"])
+
+    @patch.dict(os.environ, {"LLM_MODELS_EXTRACT": "small,large"})
+    def test_escalates_on_rejected_output_or_error(self):
+        calls = []
+        result = run_cascade("extract", lambda m: calls.append(m) or {"name": m}, lambda d: d["name"] == "large")
+        self.assertEqual(result, {"name": "large"})
+
+        def flaky(model):
+            if model == "small":
+                raise ValueError("invalid JSON")
+            return "ok"
+
+        self.assertEqual(run_cascade("extract", flaky, lambda r: True), "ok")
+        self.assertEqual(metrics.snapshot()["llm_extract_escalated"], 2)
+
+    def test_has_fields(self):
+        self.assertTrue(has_fields({"a": "x", "b": ""}, ["a", "b"], required=["a"]))
+        self.assertFalse(has_fields({"a": "x"}, ["a", "b"]))
+        self.assertFalse(has_fields({"a": "", "b": "y"}, ["a", "b"], required=["a"]))
+        self.assertFalse(has_fields([], ["a"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
 import types
 import unittest
 from pathlib import Path
@@ -35,7 +39,9 @@ scrapy_module.Spider = object
 sys.modules.setdefault("scrapy", scrapy_module)
 sys.modules.setdefault("scrapy.crawler", crawler_module)
 
-from backend.agents.orchestrator_agent import run_pipeline
+from backend.agents.orchestrator_agent import ANALYSIS_FIELDS, run_pipeline
+from backend.agents.schemas import Analysis
+from backend.utils.checkpoint_store import CheckpointStore
 
 
 class PipelineDepthTest(unittest.TestCase):
@@ -71,5 +77,138 @@ class PipelineDepthTest(unittest.TestCase):
         mock_crawl.assert_not_called()
 
 
+class PipelineCoalescingTest(unittest.TestCase):
+    @patch("backend.agents.orchestrator_agent._run_pipeline")
+    def test_concurrent_requests_for_same_site_share_one_run(self, mock_run):
+        def slow(*args):
+            time.sleep(0.1)
+            return {"report": "<html></html>"}
+
+        mock_run.side_effect = slow
+        urls = ["example.com", "https://www.example.com/", "http://Example.com"]
+        results = []
+        threads = [
+            threading.Thread(target=lambda u=u: results.append(run_pipeline(u, depth=0)))
+            for u in urls
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertEqual(len(results), 3)
+
+    @patch("backend.agents.orchestrator_agent._run_pipeline")
+    def test_checkpointed_run_does_not_join_inline_request(self, mock_run):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(*args):
+            started.set()
+            release.wait(5)
+            return {"report": "<html></html>"}
+
+        mock_run.side_effect = slow
+        inline = threading.Thread(target=run_pipeline, args=("example.com",), kwargs={"depth": 0})
+        inline.start()
+        self.assertTrue(started.wait(5))
+        job = threading.Thread(target=run_pipeline, args=("example.com",), kwargs={"depth": 0, "run_id": "job-1"})
+        job.start()
+        deadline = time.monotonic() + 5
+        while mock_run.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        inline.join()
+        job.join()
+
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(mock_run.call_args_list[1].args[-1], "job-1")
+
+
+class PipelineCheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(str(Path(self.tmp.name) / "checkpoints.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch("backend.agents.orchestrator_agent.generate_report")
+    @patch("backend.agents.orchestrator_agent.targeted_search", return_value=[])
+    @patch("backend.agents.orchestrator_agent.analyze_data", return_value={"summary": "{}", "duration_ms": 0})
+    @patch("backend.agents.orchestrator_agent.orchestrate_linkedin", return_value={"duration_ms": 0})
+    @patch("backend.agents.orchestrator_agent.orchestrate_scraping", return_value={"company_name": "Acme", "duration_ms": 0})
+    def test_retry_resumes_at_failed_stage(self, mock_scrape, mock_linkedin, mock_analyze, mock_search, mock_report):
+        mock_report.side_effect = [RuntimeError("openai 503"), {"html": "<html>ok</html>", "duration_ms": 0}]
+        with patch("backend.agents.orchestrator_agent.get_checkpoints", return_value=self.store):
+            with self.assertRaises(RuntimeError):
+                run_pipeline("http://example.com", run_id="job-1")
+            self.assertIn("analysis:3", self.store.load("job-1"))
+
+            result = run_pipeline("http://example.com", run_id="job-1")
+
+        self.assertEqual(result["report"], "<html>ok</html>")
+        mock_scrape.assert_called_once()
+        mock_linkedin.assert_called_once()
+        self.assertEqual(mock_analyze.call_count, 4)
+        self.assertEqual(mock_report.call_count, 2)
+        self.assertEqual(self.store.load("job-1"), {})
+
+
+class PipelineSitePassagesTest(unittest.TestCase):
+    @patch("backend.agents.orchestrator_agent.generate_report", return_value={"html": "", "duration_ms": 0})
+    @patch("backend.agents.orchestrator_agent.targeted_search", return_value=[])
+    @patch("backend.agents.orchestrator_agent.analyze_data")
+    @patch("backend.agents.orchestrator_agent.orchestrate_linkedin", return_value={"duration_ms": 0})
+    @patch("backend.agents.orchestrator_agent.orchestrate_scraping")
+    def test_crawled_passages_are_tried_before_web_search(
+        self, mock_scrape, mock_linkedin, mock_analyze, mock_search, mock_report
+    ):
+        filler = " ".join(["lorem"] * 300)
+        mock_scrape.return_value = {
+            "company_name": "Acme",
+            "html": f"<html><p>{filler}</p><p>Makine parkımızda 12 CNC torna tezgahı bulunur.</p></html>",
+            "duration_ms": 0,
+        }
+        found = {field: "x" for field in ANALYSIS_FIELDS if field != "references"}
+        mock_analyze.side_effect = [
+            {"summary": "{}", "duration_ms": 0},
+            {"summary": json.dumps(found), "duration_ms": 0},
+            {"summary": json.dumps({**found, "references": "x"}), "duration_ms": 0},
+        ]
+
+        run_pipeline("http://acme.example", depth=0)
+
+        site_call = mock_analyze.call_args_list[1]
+        self.assertIn("CNC torna", " ".join(site_call.kwargs["site_passages"]["machinery"]))
+        mock_search.assert_called_once_with("Acme", ["references"])
+        self.assertEqual(mock_analyze.call_count, 3)
+
+
+class PipelineSchemaFieldsTest(unittest.TestCase):
+    def test_checked_fields_are_part_of_the_analysis_schema(self):
+        self.assertLessEqual(set(ANALYSIS_FIELDS), set(Analysis.model_fields))
+
+    @patch("backend.agents.orchestrator_agent.generate_report", return_value={"html": "", "duration_ms": 0})
+    @patch("backend.agents.orchestrator_agent.targeted_search", return_value=[])
+    @patch("backend.agents.orchestrator_agent.analyze_data")
+    @patch("backend.agents.orchestrator_agent.orchestrate_linkedin", return_value={"duration_ms": 0})
+    @patch("backend.agents.orchestrator_agent.orchestrate_scraping", return_value={"company_name": "Acme", "duration_ms": 0})
+    def test_complete_schema_answer_needs_no_extra_rounds(
+        self, mock_scrape, mock_linkedin, mock_analyze, mock_search, mock_report
+    ):
+        answer = Analysis(**{field: ["x"] if field in {"references", "growth_signals"} else "x"
+                             for field in ANALYSIS_FIELDS if field != "decision_makers"})
+        summary = answer.model_dump()
+        summary["decision_makers"] = [{"full_name": "Ayşe Yılmaz"}]
+        mock_analyze.return_value = {"summary": json.dumps(summary), "duration_ms": 0}
+
+        run_pipeline("http://complete.example", depth=0)
+
+        mock_analyze.assert_called_once()
+        mock_search.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,36 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.tools.passage_index import PassageIndex, field_passages, split_passages, tokenize
+
+
+class PassageIndexTest(unittest.TestCase):
+    def test_split_passages_overlap(self):
+        words = " ".join(str(i) for i in range(10))
+        self.assertEqual(split_passages(words, size=4, overlap=1), ["0 1 2 3", "3 4 5 6", "6 7 8 9"])
+        self.assertEqual(split_passages(""), [])
+
+    def test_tokenize_folds_turkish(self):
+        self.assertEqual(tokenize("Ar-Ge Merkezi, Üretim"), ["ar", "ge", "merkezi", "uretim"])
+
+    def test_bm25_prefers_rare_terms_and_short_passages(self):
+        index = PassageIndex([
+            "firmamız yeni ürünler sunar yeni pazarlar yeni bayiler " * 3,
+            "tübitak destekli ar-ge merkezi",
+            "yeni katalog",
+        ])
+        best = index.search(tokenize("ar-ge tübitak yeni"), k=1)
+        self.assertEqual(best[0][1], "tübitak destekli ar-ge merkezi")
+        self.assertEqual(index.search(["yok"]), [])
+
+    def test_field_passages_only_for_matching_fields(self):
+        index = PassageIndex.from_html("<html><p>Makine parkımızda CNC lazer kesim tezgahları var.</p></html>")
+        passages = field_passages(index, ["machinery", "references"])
+        self.assertEqual(list(passages), ["machinery"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.utils.profile_store import EXPIRED, FRESH, STALE, ProfileStore, freshness
+from backend.workflows import company_analysis_workflow
+
+RESULT = {
+    "scrape": {"company_name": "Örnek Makine", "summary": "Hidrolik"},
+    "linkedin": {"linkedin_url": "https://www.linkedin.com/company/ornek"},
+    "analysis": {"summary": "{}"},
+    "report": "<html>rapor</html>",
+    "timings": {"pipeline": 1200},
+}
+
+
+class ProfileStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProfileStore(str(Path(self.tmp.name) / "profiles.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_and_get_by_normalized_domain(self):
+        self.store.save("https://www.ornek.com.tr/", RESULT)
+        profile = self.store.get("ornek.com.tr/urunler")
+        self.assertEqual(profile["domain"], "ornek.com.tr")
+        self.assertEqual(profile["report"], "<html>rapor</html>")
+        self.assertEqual(profile["linkedin"]["linkedin_url"], RESULT["linkedin"]["linkedin_url"])
+        self.assertEqual(self.store.find_by_company("örnek makine")[0]["domain"], "ornek.com.tr")
+
+    def test_save_replaces_existing_row(self):
+        self.store.save("ornek.com.tr", RESULT)
+        self.store.save("ornek.com.tr", {**RESULT, "report": "<html>yeni</html>"})
+        self.assertEqual(self.store.get("ornek.com.tr")["report"], "<html>yeni</html>")
+        count = self.store.connect().execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_freshness(self):
+        now = time.time()
+        profile = {"updated_at": now - 100}
+        self.assertEqual(freshness(profile, 200, 1000, now), FRESH)
+        self.assertEqual(freshness(profile, 50, 1000, now), STALE)
+        self.assertEqual(freshness(profile, 50, 60, now), EXPIRED)
+
+
+class CompanyAnalysisWorkflowTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProfileStore(str(Path(self.tmp.name) / "profiles.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch("backend.workflows.company_analysis_workflow.run_pipeline", return_value=RESULT)
+    def test_fresh_profile_skips_pipeline(self, mock_pipeline):
+        first = company_analysis_workflow.run("ornek.com.tr", store=self.store)
+        second = company_analysis_workflow.run("https://www.ornek.com.tr", store=self.store)
+        self.assertEqual(mock_pipeline.call_count, 1)
+        self.assertEqual(first["profile"]["status"], "new")
+        self.assertEqual(second["profile"]["status"], FRESH)
+        self.assertEqual(second["report"], RESULT["report"])
+        # the pipeline's (shared) result object is left untouched
+        self.assertNotIn("profile", RESULT)
+
+    @patch("backend.workflows.company_analysis_workflow.run_pipeline", return_value=RESULT)
+    @patch("backend.utils.profile_store.PROFILE_FRESH_SECONDS", 0)
+    def test_stale_profile_is_served_and_refreshed_once(self, mock_pipeline):
+        self.store.save("ornek.com.tr", RESULT)
+        scheduled = []
+        schedule = lambda func, *args: scheduled.append((func, args))
+        result = company_analysis_workflow.run("ornek.com.tr", store=self.store, schedule=schedule)
+        company_analysis_workflow.run("ornek.com.tr", store=self.store, schedule=schedule)
+        self.assertEqual(result["profile"]["status"], STALE)
+        mock_pipeline.assert_not_called()
+        self.assertEqual(len(scheduled), 1)
+
+        func, args = scheduled[0]
+        func(*args)
+        mock_pipeline.assert_called_once()
+
+    @patch("backend.workflows.company_analysis_workflow.run_pipeline", return_value=RESULT)
+    def test_max_age_forces_rerun(self, mock_pipeline):
+        self.store.save("ornek.com.tr", RESULT)
+        result = company_analysis_workflow.run("ornek.com.tr", max_age=0, store=self.store)
+        mock_pipeline.assert_called_once()
+        self.assertEqual(result["profile"]["status"], "new")
+
+    @patch("backend.workflows.company_analysis_workflow.run_pipeline", return_value=RESULT)
+    def test_deeper_crawl_is_a_miss(self, mock_pipeline):
+        company_analysis_workflow.run("ornek.com.tr", depth=0, store=self.store)
+        deeper = company_analysis_workflow.run("ornek.com.tr", depth=2, store=self.store)
+        shallower = company_analysis_workflow.run("ornek.com.tr", depth=1, store=self.store)
+        self.assertEqual(mock_pipeline.call_count, 2)
+        self.assertEqual(deeper["profile"]["status"], "new")
+        self.assertEqual(shallower["profile"]["status"], FRESH)
+        self.assertEqual(shallower["profile"]["depth"], 2)
+
+    @patch("backend.workflows.company_analysis_workflow.run_pipeline", return_value=RESULT)
+    def test_other_company_override_is_a_miss(self, mock_pipeline):
+        self.store.save("ornek.com.tr", RESULT, "Örnek Makine")
+        same = company_analysis_workflow.run("ornek.com.tr", company="örnek  makine", store=self.store)
+        other = company_analysis_workflow.run("ornek.com.tr", company="Örnek Holding", store=self.store)
+        self.assertEqual(same["profile"]["status"], FRESH)
+        self.assertEqual(other["profile"]["status"], "new")
+        mock_pipeline.assert_called_once()
+        self.assertEqual(self.store.get("ornek.com.tr")["company_name"], "Örnek Holding")
+
+
+if __name__ == "__main__":
+    unittest.main()
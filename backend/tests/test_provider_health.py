@@ -0,0 +1,87 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.utils.provider_health import (
+    CircuitOpenError,
+    HALF_OPEN,
+    OPEN,
+    call_with_health,
+    get_health,
+    order_providers,
+    reset_health,
+)
+
+
+def _fail(query):
+    raise RuntimeError("quota exceeded")
+
+
+class ProviderHealthTest(unittest.TestCase):
+    def setUp(self):
+        reset_health()
+
+    def test_circuit_opens_after_repeated_failures(self):
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                call_with_health("cse", _fail, "acme")
+        self.assertEqual(get_health("cse").state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            call_with_health("cse", _fail, "acme")
+
+    def test_half_open_probe_closes_circuit(self):
+        health = get_health("cse")
+        health.cooldown = 0
+        for _ in range(3):
+            health.record(10, ok=False)
+        self.assertEqual(health.state, HALF_OPEN)
+        self.assertTrue(health.allow())
+        # only one probe at a time
+        self.assertFalse(health.allow())
+        health.record(10, ok=True)
+        self.assertTrue(health.allow())
+
+    def test_order_moves_failing_provider_last(self):
+        names = ["cse", "serpapi", "brave"]
+        self.assertEqual(order_providers(names), names)
+        for _ in range(3):
+            get_health("cse").record(50, ok=False)
+        get_health("serpapi").record(50, ok=True)
+        self.assertEqual(order_providers(names), ["serpapi", "brave", "cse"])
+
+    def test_single_failure_keeps_configured_order(self):
+        names = ["staticscraper", "jsrender", "formbot"]
+        get_health("staticscraper").record(50, ok=False)
+        self.assertEqual(order_providers(names), names)
+
+    def test_untried_provider_does_not_overtake_known_good_one(self):
+        names = ["staticscraper", "jsrender", "formbot"]
+        for _ in range(5):
+            get_health("jsrender").record(2500, ok=True)
+        self.assertEqual(order_providers(names), ["jsrender", "staticscraper", "formbot"])
+        for _ in range(5):
+            get_health("staticscraper").record(50, ok=False)
+        get_health("staticscraper").record(50, ok=True)
+        self.assertEqual(order_providers(names), ["jsrender", "formbot", "staticscraper"])
+
+    def test_old_calls_are_forgotten(self):
+        names = ["staticscraper", "jsrender"]
+        health = get_health("staticscraper")
+        for _ in range(5):
+            health.record(50, ok=True, empty=True)
+        self.assertEqual(order_providers(names), ["jsrender", "staticscraper"])
+        health.max_age = 0
+        self.assertEqual(order_providers(names), names)
+
+    def test_ignored_errors_are_not_recorded(self):
+        for _ in range(5):
+            with self.assertRaises(RuntimeError):
+                call_with_health("staticscraper", _fail, "acme", ignore_error=lambda exc: True)
+        health = get_health("staticscraper")
+        self.assertEqual(health.stats()["calls"], 0)
+        self.assertNotEqual(health.state, OPEN)
+
+if __name__ == "__main__":
+    unittest.main()
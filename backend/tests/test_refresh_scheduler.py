@@ -0,0 +1,106 @@
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.utils.profile_store import ProfileStore
+from backend.tools.sitemap import SitemapEntry
+from backend.workflows.refresh_scheduler import Budget, RefreshScheduler, in_window, refresh_profile
+
+RESULT = {
+    "scrape": {"company_name": "Örnek"},
+    "linkedin": {"contacts": []},
+    "analysis": {"summary": "{}", "news": []},
+    "report": "<html>eski</html>",
+}
+DAY = 24 * 3600
+
+
+@patch("backend.workflows.refresh_scheduler.generate_report", return_value={"html": "<html>yeni</html>"})
+@patch("backend.workflows.refresh_scheduler.analyze_data", return_value={"summary": "{}", "news": []})
+@patch("backend.workflows.refresh_scheduler.orchestrate_scraping")
+@patch("backend.workflows.refresh_scheduler.orchestrate_linkedin")
+@patch("backend.workflows.refresh_scheduler.brave_news", return_value={"news": [{"title": "yeni"}]})
+class RefreshSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ProfileStore(str(Path(self.tmp.name) / "profiles.db"))
+        for site in ("az.com.tr", "cok.com.tr"):
+            self.store.save(site, RESULT)
+        for _ in range(3):
+            self.store.record_access("cok.com.tr")
+        self.store.record_access("az.com.tr")
+        self.now = time.time() + 2 * DAY  # news is stale, LinkedIn and site are not
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_refreshes_only_stale_parts_most_requested_first(self, news, linkedin, scraping, analyze, report):
+        scheduler = RefreshScheduler(self.store, window=None, budget=Budget({}))
+        refreshed = scheduler.run_once(self.now)
+
+        self.assertEqual([r["domain"] for r in refreshed], ["cok.com.tr", "az.com.tr"])
+        self.assertEqual(refreshed[0]["parts"], ["news"])
+        linkedin.assert_not_called()
+        scraping.assert_not_called()
+        profile = self.store.get("cok.com.tr")
+        self.assertEqual(profile["news"]["news"][0]["title"], "yeni")
+        self.assertEqual(profile["report"], "<html>yeni</html>")
+        self.assertEqual(analyze.call_args.kwargs["news_data"], news.return_value)
+
+    def test_budget_and_window_limit_work(self, news, linkedin, scraping, analyze, report):
+        scheduler = RefreshScheduler(self.store, window=None, budget=Budget({"brave": 1}))
+        self.assertEqual(len(scheduler.run_once(self.now)), 1)
+
+        closed = RefreshScheduler(self.store, window=(25, 26), budget=Budget({}))
+        self.assertEqual(closed.run_once(self.now), [])
+
+    def test_unchanged_sitemap_skips_site_crawl(self, news, linkedin, scraping, analyze, report):
+        saved = self.store.get("cok.com.tr")["refreshed_at"]["site"]
+        entries = [SitemapEntry("https://cok.com.tr/hakkimizda", saved - DAY)]
+        robots = ["https://cok.com.tr/wp-sitemap.xml"]
+        with patch(
+            "backend.workflows.refresh_scheduler.host_scheduler.get_scheduler"
+        ) as mock_scheduler, patch(
+            "backend.workflows.refresh_scheduler.discover_sitemap_urls", return_value=entries
+        ) as mock_discover:
+            mock_scheduler.return_value.robots.return_value.site_maps.return_value = robots
+            self.assertEqual(refresh_profile(self.store, "cok.com.tr", ["site"]), {})
+        self.assertEqual(mock_discover.call_args.args, ("https://cok.com.tr", robots))
+        scraping.assert_not_called()
+        analyze.assert_not_called()
+        self.assertGreaterEqual(self.store.get("cok.com.tr")["refreshed_at"]["site"], saved)
+
+        scraping.return_value = {"company_name": "Örnek", "summary": "yeni"}
+        entries = [SitemapEntry("https://cok.com.tr/hakkimizda", time.time() + DAY)]
+        with patch("backend.workflows.refresh_scheduler.host_scheduler.get_scheduler"), patch(
+            "backend.workflows.refresh_scheduler.discover_sitemap_urls", return_value=entries
+        ):
+            refresh_profile(self.store, "cok.com.tr", ["site"])
+        scraping.assert_called_once()
+
+    def test_sitemap_cut_at_the_cap_counts_as_changed(self, news, linkedin, scraping, analyze, report):
+        saved = self.store.get("cok.com.tr")["refreshed_at"]["site"]
+        scraping.return_value = {"company_name": "Örnek", "summary": "yeni"}
+        entries = [SitemapEntry(f"https://cok.com.tr/{i}", saved - DAY) for i in range(3)]
+        with patch("backend.workflows.refresh_scheduler.host_scheduler.get_scheduler"), patch(
+            "backend.workflows.refresh_scheduler.discover_sitemap_urls", return_value=entries
+        ), patch("backend.workflows.refresh_scheduler.MAX_SITEMAP_URLS", 3):
+            refresh_profile(self.store, "cok.com.tr", ["site"])
+        scraping.assert_called_once()
+
+
+class WindowTest(unittest.TestCase):
+    def test_window_wraps_midnight(self):
+        self.assertTrue(in_window((22, 6), 23))
+        self.assertTrue(in_window((22, 6), 3))
+        self.assertFalse(in_window((22, 6), 12))
+        self.assertTrue(in_window(None, 12))
+
+
+if __name__ == "__main__":
+    unittest.main()
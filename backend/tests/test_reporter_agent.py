@@ -1,4 +1,6 @@
 import sys
+import threading
+import time
 import types
 import os
 import unittest
@@ -35,12 +37,14 @@ scrapy_module.Spider = object
 sys.modules.setdefault("scrapy", scrapy_module)
 sys.modules.setdefault("scrapy.crawler", crawler_module)
 
-from backend.agents.reporter_agent import generate_report
+from backend.agents import reporter_agent
+from backend.agents.reporter_agent import generate_report, run_tool_calls
 
 
 class ReporterLanguageTest(unittest.TestCase):
-    @patch("backend.agents.reporter_agent.client.chat.completions.create")
-    def test_generate_report_returns_turkish(self, mock_create):
+    @patch("backend.agents.reporter_agent.get_client")
+    def test_generate_report_returns_turkish(self, mock_client):
+        mock_create = mock_client.return_value.chat.completions.create
         msg = types.SimpleNamespace(
             content="Merhaba dünya",
             tool_calls=None,
@@ -52,5 +56,127 @@ class ReporterLanguageTest(unittest.TestCase):
         self.assertIn("Merhaba", result["html"])
 
 
+def _tool_call(call_id, name, arguments):
+    return types.SimpleNamespace(
+        id=call_id,
+        function=types.SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+class ReporterToolLoopTest(unittest.TestCase):
+    @patch("backend.agents.reporter_agent.dispatch_tool_call")
+    @patch("backend.agents.reporter_agent.get_client")
+    def test_tool_calls_deduplicated_and_ordered(self, mock_client, mock_dispatch):
+        mock_create = mock_client.return_value.chat.completions.create
+        calls = [
+            _tool_call("1", "newsfinder", '{"query": "acme"}'),
+            _tool_call("2", "web_search", '{"query": "acme"}'),
+            _tool_call("3", "newsfinder", '{"query": "acme"}'),
+        ]
+        first = types.SimpleNamespace(content=None, tool_calls=calls, model_dump=lambda: {"role": "assistant"})
+        final = types.SimpleNamespace(content="<html>rapor</html>", tool_calls=None, model_dump=lambda: {"role": "assistant"})
+        mock_create.side_effect = [
+            types.SimpleNamespace(choices=[types.SimpleNamespace(message=first)]),
+            types.SimpleNamespace(choices=[types.SimpleNamespace(message=final)]),
+        ]
+        mock_dispatch.side_effect = lambda name, args: {"tool": name}
+
+        generate_report('{"company_summary": "Test"}', tool_mode=True)
+
+        self.assertEqual(mock_dispatch.call_count, 2)
+        messages = mock_create.call_args.kwargs["messages"]
+        tool_msgs = [m for m in messages if m.get("role") == "tool"]
+        self.assertEqual([m["tool_call_id"] for m in tool_msgs], ["1", "2", "3"])
+        self.assertIn("web_search", tool_msgs[1]["content"])
+        self.assertIn("newsfinder", tool_msgs[2]["content"])
+
+    @patch("backend.agents.reporter_agent.dispatch_tool_call", return_value={"news": []})
+    @patch("backend.agents.reporter_agent.get_client")
+    def test_turn_budget_forces_final_answer(self, mock_client, mock_dispatch):
+        mock_create = mock_client.return_value.chat.completions.create
+        def respond(**kwargs):
+            if kwargs.get("tool_choice") == "none":
+                msg = types.SimpleNamespace(content="<html>son</html>", tool_calls=None, model_dump=lambda: {"role": "assistant"})
+            else:
+                call = _tool_call(str(mock_create.call_count), "newsfinder", '{"query": "q%d"}' % mock_create.call_count)
+                msg = types.SimpleNamespace(content=None, tool_calls=[call], model_dump=lambda: {"role": "assistant"})
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)])
+
+        mock_create.side_effect = respond
+
+        result = generate_report("{}", tool_mode=True, max_tool_turns=2)
+
+        self.assertEqual(result["html"], "<html>son</html>")
+        self.assertEqual(result["tool_turns"], 2)
+        self.assertEqual(mock_create.call_count, 3)
+        self.assertEqual(mock_dispatch.call_count, 2)
+
+
+class ReporterToolPoolTest(unittest.TestCase):
+    @patch("backend.agents.reporter_agent.MAX_TOOL_INFLIGHT", 1)
+    @patch("backend.agents.reporter_agent.dispatch_tool_call")
+    def test_abandoned_slow_calls_do_not_block_other_tools(self, mock_dispatch):
+        unblock = threading.Event()
+        mock_dispatch.side_effect = lambda name, args: unblock.wait(5) if name == "newsfinder" else {"tool": name}
+
+        first = run_tool_calls([("newsfinder", {"query": "a"})], {}, timeout=0.05)
+        self.assertEqual(first, [{"error": "newsfinder timed out"}])
+        # the abandoned call still runs: newsfinder is at its limit, web_search is not
+        second = run_tool_calls([("newsfinder", {"query": "b"}), ("web_search", {"query": "b"})], {}, timeout=1)
+        self.assertEqual(second, [{"error": "newsfinder is busy"}, {"tool": "web_search"}])
+
+        unblock.set()
+        deadline = time.monotonic() + 5
+        while reporter_agent._inflight["newsfinder"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(run_tool_calls([("newsfinder", {"query": "c"})], {}, timeout=1), [True])
+
+
+class ReporterPrefetchTest(unittest.TestCase):
+    @patch("backend.agents.reporter_agent.dispatch_tool_call", return_value={"results": []})
+    @patch("backend.agents.reporter_agent.get_client")
+    def test_prefetch_uses_single_llm_call(self, mock_client, mock_dispatch):
+        mock_create = mock_client.return_value.chat.completions.create
+        msg = types.SimpleNamespace(content="<html>rapor</html>", tool_calls=None, model_dump=lambda: {"role": "assistant"})
+        mock_create.return_value = types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)])
+
+        generate_report(
+            '{"linkedin_url": "https://linkedin.com/company/acme"}',
+            prefetch=True,
+            company="Acme",
+            news=[{"title": "Acme yeni tesis", "url": "https://news/1"}],
+        )
+
+        self.assertEqual(mock_create.call_count, 1)
+        self.assertIsNone(mock_create.call_args.kwargs["tools"])
+        called = {c.args[0] for c in mock_dispatch.call_args_list}
+        self.assertNotIn("newsfinder", called)
+        self.assertNotIn("linkedin_search", called)
+        prompt = mock_create.call_args.kwargs["messages"][0]["content"]
+        self.assertIn("Acme yeni tesis", prompt)
+
+
+class ReporterTemplateTest(unittest.TestCase):
+    @patch("backend.agents.reporter_agent.get_client")
+    def test_sections_json_rendered_into_template(self, mock_client):
+        mock_create = mock_client.return_value.chat.completions.create
+        sections = '{"executive_summary": "Güçlü <aday>", "actions": ["Ziyaret planla"], "risks": ""}'
+        msg = types.SimpleNamespace(content=sections, tool_calls=None, model_dump=lambda: {"role": "assistant"})
+        mock_create.return_value = types.SimpleNamespace(choices=[types.SimpleNamespace(message=msg)])
+
+        analysis = '{"decision_makers": [{"full_name": "Ayşe Yılmaz", "title": "CEO"}]}'
+        html = generate_report(analysis, company="Acme")["html"]
+
+        response_format = mock_create.call_args.kwargs["response_format"]
+        self.assertEqual(response_format["type"], "json_schema")
+        self.assertIn("actions", response_format["json_schema"]["schema"]["properties"])
+        self.assertIn("Acme Satış Raporu", html)
+        self.assertIn("Güçlü &lt;aday&gt;", html)
+        self.assertIn("<ul class='actions'><li>Ziyaret planla</li></ul>", html)
+        self.assertIn("Ayşe Yılmaz", html)
+        self.assertIn("Bilgi yok", html)
+        self.assertIn("Montserrat", html)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.tools.result_merge import canonicalize_url, merge_results
+
+
+class CanonicalizeUrlTest(unittest.TestCase):
+    def test_linkedin_locale_and_tracking(self):
+        self.assertEqual(
+            canonicalize_url("http://tr.linkedin.com/in/ayse-yilmaz/?trk=public_profile&originalSubdomain=tr#x"),
+            "https://www.linkedin.com/in/ayse-yilmaz",
+        )
+        self.assertEqual(canonicalize_url("linkedin.com/company/acme/"), "https://www.linkedin.com/company/acme")
+
+    def test_keeps_meaningful_query(self):
+        self.assertEqual(
+            canonicalize_url("https://Ornek.com.tr:443/haber?id=5&utm_source=x&gclid=1"),
+            "https://ornek.com.tr/haber?id=5",
+        )
+        self.assertEqual(canonicalize_url(""), "")
+
+
+class MergeResultsTest(unittest.TestCase):
+    def test_dedup_and_reciprocal_rank_fusion(self):
+        merged = merge_results(
+            {
+                "serpapi": [
+                    {"url": "https://tr.linkedin.com/in/a", "title": "A", "snippet": "kısa"},
+                    {"url": "https://www.linkedin.com/in/b", "title": "B"},
+                ],
+                "brave": [
+                    {"url": "https://www.linkedin.com/in/b/", "title": "B"},
+                    {"url": "https://linkedin.com/in/a?trk=x", "title": "A", "snippet": "daha uzun özet"},
+                ],
+                "google": [{"url": "https://www.linkedin.com/in/b", "title": "B"}],
+            }
+        )
+        self.assertEqual([r["url"] for r in merged], ["https://www.linkedin.com/in/b", "https://www.linkedin.com/in/a"])
+        self.assertEqual(merged[1]["snippet"], "daha uzun özet")
+
+    def test_limit_and_results_without_url(self):
+        merged = merge_results([[{"title": "Haber"}, {"title": " haber "}, {"url": "https://x.com/1"}]], limit=1)
+        self.assertEqual(merged, [{"title": "Haber"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import types
 import unittest
 from pathlib import Path
@@ -35,25 +36,42 @@ scrapy_module.Spider = object
 sys.modules.setdefault("scrapy", scrapy_module)
 sys.modules.setdefault("scrapy.crawler", crawler_module)
 
-from backend.agents.scraper_agent import crawl_site, orchestrate_scraping
+import requests
 
+from backend.agents.scraper_agent import crawl_site, extract_company_info, orchestrate_scraping
+from backend.tools.host_scheduler import HostScheduler
+from backend.tools.sitemap import SitemapEntry
 
+
+def _html_response(url, text, content_type="text/html; charset=utf-8"):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp.headers["Content-Type"] = content_type
+    resp._content = text.encode("utf-8")
+    resp._content_consumed = True
+    return resp
+
+
+@patch("backend.agents.scraper_agent.discover_sitemap_urls", return_value=[])
 class CrawlSiteTests(unittest.TestCase):
-    @patch("backend.agents.scraper_agent.requests.get")
-    @patch("backend.agents.scraper_agent.RobotFileParser")
-    def test_collects_internal_links(self, mock_rfp_cls, mock_get):
-        mock_rfp = mock_rfp_cls.return_value
-        mock_rfp.read.return_value = None
-        mock_rfp.can_fetch.return_value = True
-
-        html_index = '<html><a href="/about">About</a></html>'
+    def setUp(self):
+        self.robots = Mock()
+        self.robots.can_fetch.side_effect = lambda agent, url: not url.endswith("/gizli")
+        self.robots.site_maps.return_value = None
+        scheduler = HostScheduler(min_delay=0)
+        scheduler.robots = Mock(return_value=self.robots)
+        patcher = patch("backend.tools.host_scheduler._scheduler", scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("backend.tools.host_scheduler.requests.get")
+    def test_collects_internal_links(self, mock_get, mock_sitemap):
+        html_index = '<html><a href="/about">About</a><a href="/gizli">Gizli</a></html>'
         html_about = '<html>About us</html>'
 
-        def side_effect(url, timeout=10):
-            resp = Mock()
-            resp.raise_for_status.return_value = None
-            resp.text = html_about if url.endswith("/about") else html_index
-            return resp
+        def side_effect(url, **kwargs):
+            return _html_response(url, html_about if url.endswith("/about") else html_index)
 
         mock_get.side_effect = side_effect
 
@@ -62,27 +80,18 @@ class CrawlSiteTests(unittest.TestCase):
         self.assertIn(html_about, result)
         self.assertEqual(mock_get.call_count, 2)
 
-    @patch("backend.agents.scraper_agent.requests.get")
-    @patch("backend.agents.scraper_agent.RobotFileParser")
-    def test_depth_limit(self, mock_rfp_cls, mock_get):
-        mock_rfp = mock_rfp_cls.return_value
-        mock_rfp.read.return_value = None
-        mock_rfp.can_fetch.return_value = True
-
+    @patch("backend.tools.host_scheduler.requests.get")
+    def test_depth_limit(self, mock_get, mock_sitemap):
         html_index = '<html><a href="/a">A</a></html>'
         html_a = '<html><a href="/b">B</a></html>'
         html_b = '<html>Deep</html>'
 
-        def side_effect(url, timeout=10):
-            resp = Mock()
-            resp.raise_for_status.return_value = None
+        def side_effect(url, **kwargs):
             if url.endswith('/b'):
-                resp.text = html_b
-            elif url.endswith('/a'):
-                resp.text = html_a
-            else:
-                resp.text = html_index
-            return resp
+                return _html_response(url, html_b)
+            if url.endswith('/a'):
+                return _html_response(url, html_a)
+            return _html_response(url, html_index)
 
         mock_get.side_effect = side_effect
 
@@ -92,6 +101,50 @@ class CrawlSiteTests(unittest.TestCase):
         self.assertNotIn(html_b, result)
         self.assertEqual(mock_get.call_count, 2)
 
+    @patch("backend.tools.host_scheduler.requests.get")
+    def test_page_budget_prefers_relevant_pages(self, mock_get, mock_sitemap):
+        html_index = (
+            '<html><a href="/kvkk">KVKK</a><a href="/iletisim">İletişim</a>'
+            '<a href="/blog/tag/fuar">Fuar</a><a href="/makine-parki">Makine Parkı</a></html>'
+        )
+
+        def side_effect(url, **kwargs):
+            return _html_response(url, html_index if url.rstrip("/").endswith("example.com") else f"<html>{url}</html>")
+
+        mock_get.side_effect = side_effect
+
+        result = crawl_site("http://example.com", depth=1, max_pages=2)
+        fetched = [c.args[0] for c in mock_get.call_args_list]
+        self.assertEqual(fetched, ["http://example.com", "http://example.com/makine-parki"])
+        self.assertNotIn("<html>http://example.com/kvkk</html>", result)
+
+    @patch("backend.tools.host_scheduler.requests.get")
+    def test_sitemap_pages_are_fetched_in_one_wave(self, mock_get, mock_sitemap):
+        self.robots.site_maps.return_value = ["http://example.com/sitemap_index.xml"]
+        mock_sitemap.return_value = [
+            SitemapEntry("http://example.com/", None),
+            SitemapEntry("http://example.com/kvkk", None),
+            SitemapEntry("http://example.com/urunler", None),
+            SitemapEntry("http://example.com/hakkimizda", time.time()),
+        ]
+
+        def side_effect(url, **kwargs):
+            return _html_response(url, f"<html>{url}</html>")
+
+        mock_get.side_effect = side_effect
+
+        with patch("backend.agents.scraper_agent.CRAWL_CONCURRENCY", 3):
+            result = crawl_site("http://example.com", depth=1, max_pages=3)
+        mock_sitemap.assert_called_once_with("http://example.com", ["http://example.com/sitemap_index.xml"])
+        self.assertEqual(
+            result.split("\n"),
+            [
+                "<html>http://example.com/hakkimizda</html>",
+                "<html>http://example.com/urunler</html>",
+                "<html>http://example.com</html>",
+            ],
+        )
+
 
 class OrchestrateScrapingTests(unittest.TestCase):
     @patch("backend.agents.scraper_agent.extract_company_info", return_value={})
@@ -142,5 +195,28 @@ class OrchestrateScrapingTests(unittest.TestCase):
         mock_crawl.assert_not_called()
 
 
+class ExtractCompanyInfoTests(unittest.TestCase):
+    @patch.dict(os.environ, {"LLM_MODELS_EXTRACT": "small,large"})
+    @patch("backend.agents.scraper_agent.get_client")
+    def test_escalates_to_large_model_on_incomplete_answer(self, mock_client):
+        answers = {
+            "small": '{"company_name": "Acme"}',
+            "large": '{"company_name": "Acme", "summary": "Makine", "sector": "", '
+            '"notable_products_or_services": "", "sales_signals": ""}',
+        }
+
+        def create(model, **kwargs):
+            message = types.SimpleNamespace(content=answers[model])
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+        mock_client.return_value.chat.completions.create.side_effect = create
+
+        info = extract_company_info("<html>Acme</html>")
+
+        self.assertEqual(info["summary"], "Makine")
+        models = [c.kwargs["model"] for c in mock_client.return_value.chat.completions.create.call_args_list]
+        self.assertEqual(models, ["small", "large"])
+
+
 if __name__ == "__main__":
     unittest.main()
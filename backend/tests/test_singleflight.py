@@ -0,0 +1,66 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.utils.singleflight import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    def _run_concurrently(self, flight, key, func, n=4):
+        results, errors = [], []
+
+        def worker():
+            try:
+                results.append(flight.do(key, func))
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"html": "ok"}
+
+        results, errors = self._run_concurrently(flight, "a", slow)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_error_is_shared_and_not_cached(self):
+        flight = SingleFlight("test")
+        calls = []
+
+        def failing():
+            calls.append(1)
+            time.sleep(0.1)
+            raise RuntimeError("down")
+
+        results, errors = self._run_concurrently(flight, "a", failing)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(flight.do("a", lambda: "fresh"), "fresh")
+
+    def test_different_keys_run_separately(self):
+        flight = SingleFlight("test")
+        self.assertEqual(flight.do("a", lambda: 1), 1)
+        self.assertEqual(flight.do("b", lambda: 2), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
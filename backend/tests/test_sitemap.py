@@ -0,0 +1,81 @@
+import gzip
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+import requests
+
+from backend.tools import host_scheduler
+from backend.tools.host_scheduler import HostScheduler
+from backend.tools.sitemap import SitemapEntry, changed_since, discover_sitemap_urls, parse_lastmod
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+INDEX = f"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex {NS}>
+  <sitemap><loc>https://ornek.com.tr/sitemap-pages.xml.gz</loc></sitemap>
+</sitemapindex>"""
+PAGES = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://ornek.com.tr/hakkimizda</loc><lastmod>2024-05-01</lastmod></url>
+  <url><loc>https://www.ornek.com.tr/urunler</loc><lastmod>2024-06-01T10:00:00+03:00</lastmod></url>
+  <url><loc>https://baska.com/sayfa</loc></url>
+</urlset>"""
+
+
+def _response(body: bytes, content_type: str = "application/xml", status: int = 200):
+    # like a cassette replay: the body is loaded and ``raw`` is None
+    resp = requests.Response()
+    resp.status_code = status
+    resp.url = "https://ornek.com.tr/sitemap.xml"
+    resp.headers["Content-Type"] = content_type
+    resp._content = body
+    resp._content_consumed = True
+    return resp
+
+
+@patch("backend.tools.host_scheduler._scheduler", HostScheduler(min_delay=0))
+class SitemapTest(unittest.TestCase):
+    @patch("backend.tools.host_scheduler.requests.get")
+    def test_follows_index_and_gzip_keeping_same_site_urls(self, mock_get):
+        def side_effect(url, timeout=10, stream=False):
+            if url.endswith(".gz"):
+                return _response(gzip.compress(PAGES.encode()), "application/x-gzip")
+            return _response(INDEX.encode())
+
+        mock_get.side_effect = side_effect
+        entries = discover_sitemap_urls("https://ornek.com.tr", ["https://ornek.com.tr/sitemap_index.xml"])
+        self.assertEqual(
+            [e.url for e in entries],
+            ["https://ornek.com.tr/hakkimizda", "https://www.ornek.com.tr/urunler"],
+        )
+        self.assertEqual(entries[0].lastmod, parse_lastmod("2024-05-01T00:00:00Z"))
+
+    @patch("backend.tools.host_scheduler.requests.get")
+    def test_falls_back_to_sitemap_xml_and_tolerates_errors(self, mock_get):
+        mock_get.return_value = _response(b"<html>not xml")
+        self.assertEqual(discover_sitemap_urls("https://ornek.com.tr"), [])
+        self.assertEqual(mock_get.call_args.args[0], "https://ornek.com.tr/sitemap.xml")
+
+    @patch("backend.tools.host_scheduler.requests.get")
+    def test_throttled_sitemap_backs_off_the_host(self, mock_get):
+        mock_get.return_value = _response(b"", status=429)
+        scheduler = HostScheduler(min_delay=0)
+        with patch.object(host_scheduler, "_scheduler", scheduler), patch.object(host_scheduler, "HOST_MAX_RETRY_WAIT", 0):
+            self.assertEqual(discover_sitemap_urls("https://ornek.com.tr"), [])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(scheduler._host(host_scheduler.host_key("https://ornek.com.tr")).failures, 1)
+
+    def test_changed_since(self):
+        entries = [SitemapEntry("a", 100.0), SitemapEntry("b", None)]
+        self.assertTrue(changed_since(entries, 50.0))
+        self.assertFalse(changed_since(entries, 150.0))
+        self.assertIsNone(changed_since([SitemapEntry("b", None)], 150.0))
+        self.assertTrue(changed_since(entries, 50.0, complete=False))
+        self.assertIsNone(changed_since(entries, 150.0, complete=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
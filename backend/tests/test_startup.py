@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1].parent
+
+# Generous default so slow CI machines pass; lower it locally to catch regressions
+STARTUP_BUDGET_S = float(os.getenv("STARTUP_BUDGET_S", "3.0"))
+
+HEAVY_MODULES = ["openai", "playwright", "selenium", "scrapy", "twisted", "bs4"]
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - start
+heavy = [m for m in %r if m in sys.modules]
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+""" % (HEAVY_MODULES,)
+
+
+class StartupTest(unittest.TestCase):
+    def test_import_is_fast_and_lazy(self):
+        env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+        env["PIPELINE_LOGFILE"] = os.devnull
+        proc = subprocess.run(
+            [sys.executable, "-c", SCRIPT],
+            cwd=str(ROOT),
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        report = json.loads(proc.stdout.strip().splitlines()[-1])
+        self.assertEqual(report["heavy"], [])
+        self.assertLess(report["elapsed"], STARTUP_BUDGET_S)
+
+
+if __name__ == "__main__":
+    unittest.main()
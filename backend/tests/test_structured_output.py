@@ -0,0 +1,82 @@
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1].parent))
+
+from backend.agents.schemas import Analysis, CompanyInfo
+from backend.utils import metrics
+from backend.utils.structured_output import StructuredOutputError, complete_json, response_format, strict_schema
+
+
+def _client(*answers):
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=a))])
+        for a in answers
+    ]
+    return client
+
+
+class StrictSchemaTest(unittest.TestCase):
+    def test_every_property_required_and_no_extra_keys(self):
+        schema = strict_schema(Analysis)
+        self.assertEqual(schema["required"], list(Analysis.model_fields))
+        self.assertFalse(schema["additionalProperties"])
+        self.assertNotIn("default", schema["properties"]["sales_signals"])
+        person = schema["$defs"]["DecisionMaker"]
+        # a property called "title" is kept, only schema titles are dropped
+        self.assertEqual(person["required"], ["full_name", "title", "summary"])
+        self.assertNotIn("title", person)
+
+
+class ResponseFormatTest(unittest.TestCase):
+    def test_legacy_models_fall_back(self):
+        for model in ("gpt-4o", "gpt-4o-mini", "gpt-4.1", "ft:gpt-4o-mini:acme::x1"):
+            self.assertEqual(response_format(CompanyInfo, model)["type"], "json_schema")
+        self.assertEqual(response_format(CompanyInfo, "gpt-4-turbo"), {"type": "json_object"})
+        self.assertIsNone(response_format(CompanyInfo, "gpt-4"))
+
+    def test_plain_gpt4_gets_no_response_format(self):
+        client = _client('{"company_name": "Acme"}')
+        complete_json(client, "extract", "gpt-4", [{"role": "user", "content": "x"}], CompanyInfo)
+        self.assertNotIn("response_format", client.chat.completions.create.call_args.kwargs)
+
+
+class CompleteJsonTest(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_valid_answer_needs_one_call(self):
+        client = _client('{"company_name": "Acme", "summary": "Makine"}')
+        info = complete_json(client, "extract", "small", [{"role": "user", "content": "x"}], CompanyInfo)
+        self.assertEqual(info.company_name, "Acme")
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        fmt = client.chat.completions.create.call_args.kwargs["response_format"]
+        self.assertEqual(fmt["json_schema"]["name"], "CompanyInfo")
+        self.assertTrue(fmt["json_schema"]["strict"])
+        self.assertEqual(metrics.snapshot().get("llm_extract_parse_failed", 0), 0)
+
+    def test_invalid_answer_gets_one_repair_call(self):
+        client = _client('Şirket: Acme {"company_name": ', '{"company_name": "Acme"}')
+        info = complete_json(client, "extract", "small", [{"role": "user", "content": "x"}], CompanyInfo)
+        self.assertEqual(info.company_name, "Acme")
+        repair = client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertEqual(repair[1], {"role": "assistant", "content": 'Şirket: Acme {"company_name": '})
+        self.assertIn("did not match", repair[2]["content"])
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["llm_extract_parse_failed"], 1)
+        self.assertEqual(snapshot["llm_extract_repaired"], 1)
+
+    def test_failed_repair_raises(self):
+        client = _client('{"sales_signals": "tek"}', '{"sales_signals": 3}')
+        with self.assertRaises(StructuredOutputError):
+            complete_json(client, "analysis", "small", [{"role": "user", "content": "x"}], Analysis)
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+        self.assertEqual(metrics.snapshot()["llm_analysis_repair_failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
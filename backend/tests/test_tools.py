@@ -49,7 +49,15 @@ serpapi_search = search_tools.serpapi_search
 google_cse_search = search_tools.google_cse_search
 brave_search = search_tools.brave_search
 
+import requests
+
 from backend.agents.search_agent import run_search
+from backend.tools.scraping_tools import UnsupportedContentError, is_target_error, read_page
+from backend.utils.provider_health import reset_health
+
+
+def _fail(query):
+    raise RuntimeError("quota exceeded")
 
 
 class ToolEnvTest(unittest.TestCase):
@@ -85,6 +93,9 @@ class ToolEnvTest(unittest.TestCase):
 
 
 class SearchAgentTest(unittest.TestCase):
+    def setUp(self):
+        reset_health()
+
     @patch("backend.agents.search_agent.google_cse_search")
     @patch("backend.agents.search_agent.brave_search")
     @patch("backend.agents.search_agent.serpapi_search")
@@ -101,5 +112,66 @@ class SearchAgentTest(unittest.TestCase):
         mock_brave.assert_not_called()
 
 
+class SearchAgentHealthTest(unittest.TestCase):
+    def setUp(self):
+        reset_health()
+
+    @patch("backend.agents.search_agent.brave_search", return_value=[])
+    @patch("backend.agents.search_agent.serpapi_search", return_value=[{"title": "serp"}])
+    @patch("backend.agents.search_agent.google_cse_search", side_effect=_fail)
+    def test_failing_engine_is_demoted(self, mock_google, mock_serpapi, mock_brave):
+        for i in range(6):
+            self.assertEqual(run_search([f"q{i}"]), [{"title": "serp"}])
+        # one failure is not enough history; the open circuit stops the calls
+        self.assertEqual(mock_google.call_count, 3)
+
+
+def _streamed(body: bytes, content_type: str, length: str = ""):
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = "https://ornek.com.tr/sayfa"
+    resp.headers["Content-Type"] = content_type
+    if length:
+        resp.headers["Content-Length"] = length
+    resp._content = body
+    resp._content_consumed = True
+    return resp
+
+
+class ReadPageTest(unittest.TestCase):
+    def test_binary_types_are_skipped_without_reading(self):
+        resp = _streamed(b"%PDF-1.7", "application/pdf", "209715200")
+        with patch.object(resp, "iter_content") as iter_content:
+            with self.assertRaises(UnsupportedContentError):
+                read_page(resp)
+        iter_content.assert_not_called()
+
+    def test_body_is_capped_and_decoded_with_document_charset(self):
+        body = '<meta charset="windows-1254"><p>Üretim ağı</p>'.encode("cp1254") + b"x" * 200
+        page = read_page(_streamed(body, "text/html"), max_bytes=60)
+        self.assertTrue(page.truncated)
+        self.assertEqual(page.encoding, "windows-1254")
+        self.assertIn("Üretim ağı", page.text)
+        self.assertEqual(len(page.text), 60)
+
+    def test_header_charset_wins(self):
+        page = read_page(_streamed("Çağ".encode("iso-8859-9"), "text/plain; charset=ISO-8859-9"))
+        self.assertEqual(page.text, "Çağ")
+        self.assertFalse(page.truncated)
+
+    def test_site_refusals_are_target_errors(self):
+        def http_error(status):
+            resp = _streamed(b"", "text/html")
+            resp.status_code = status
+            return requests.HTTPError(response=resp)
+
+        self.assertTrue(is_target_error(http_error(404)))
+        self.assertTrue(is_target_error(http_error(403)))
+        self.assertTrue(is_target_error(UnsupportedContentError("application/pdf")))
+        self.assertFalse(is_target_error(http_error(429)))
+        self.assertFalse(is_target_error(http_error(503)))
+        self.assertFalse(is_target_error(requests.ConnectionError()))
+
+
 if __name__ == "__main__":
     unittest.main()
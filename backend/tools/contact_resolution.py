@@ -0,0 +1,233 @@
+"""Resolve duplicate decision-maker contacts found by several engines.
+
+One person often comes back as ``Ayşe Yılmaz - CEO``, ``Dr. Ayse Yilmaz –
+Genel Müdür`` and ``Ayşe Yılmaz | LinkedIn``. Names are normalized (Turkish
+diacritics folded, honorifics dropped), candidates are compared only within
+blocks sharing a name-token prefix, matches are clustered with union-find
+and each cluster is merged into one contact. Contacts linking different
+profile URLs are never merged, however close their names. Contacts are then ranked by the
+seniority of their title.
+"""
+
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .result_merge import canonicalize_url
+
+NAME_MATCH_RATIO = 0.88
+FIRST_NAME_RATIO = 0.8
+BLOCK_PREFIX = 3
+
+HONORIFICS = {
+    "dr", "prof", "doc", "av", "muh", "mr", "mrs", "ms", "miss", "sn", "sayin",
+    "bay", "bayan", "eng", "ing", "phd", "mba", "msc", "bsc", "cpa", "pmp", "jr", "sr",
+}
+
+_FOLD = str.maketrans({"ı": "i", "İ": "i", "I": "i", "ş": "s", "Ş": "s", "ğ": "g", "Ğ": "g"})
+_TITLE_SEPARATORS = re.compile(r"\s*[–—|·]\s*|\s+-\s+")
+_WORDS = re.compile(r"[a-z0-9]+")
+
+# (score, keywords) by seniority, matched on folded title words. Keywords
+# inside a longer match are ignored ("genel mudur" in "genel mudur
+# yardimcisi"); of the rest the highest score counts.
+SENIORITY: List[Tuple[int, List[str]]] = [
+    (100, ["ceo", "chief executive officer", "founder", "co founder", "kurucu", "kurucu ortak", "owner", "sahibi", "chairman",
+           "yonetim kurulu baskani", "yk baskani", "president", "baskan", "genel mudur", "general manager",
+           "managing director"]),
+    (90, ["board member", "yonetim kurulu uyesi", "managing partner", "vice chairman", "deputy chairman",
+          "yonetim kurulu baskan yardimcisi", "yonetim kurulu baskanvekili"]),
+    (80, ["cfo", "coo", "cto", "cio", "cmo", "cso", "chief", "vice president", "vp", "evp", "svp",
+          "genel mudur yardimcisi", "gmy", "deputy general manager", "assistant general manager", "baskan yardimcisi",
+          "direktor", "director", "direktoru"]),
+    (60, ["head", "mudur", "muduru", "manager", "koordinator", "coordinator"]),
+    (40, ["lead", "sef", "sefi", "supervisor", "sorumlu", "sorumlusu", "team leader", "takim lideri"]),
+    (20, ["engineer", "muhendis", "muhendisi", "uzman", "specialist", "analyst", "analist",
+          "temsilci", "representative", "executive", "assistant", "asistan", "asistani", "executive assistant",
+          "yonetici asistani"]),
+    (0, ["intern", "stajyer", "student", "ogrenci"]),
+]
+# "Assistant to the CEO" is an assistant, whatever else the title names
+ASSISTANT_KEYWORDS = {"assistant", "asistan", "asistani", "executive assistant", "yonetici asistani"}
+# "Deputy CEO" or "CFO Yardımcısı" ranks one step below the C-level keyword it qualifies
+DEPUTY_PREFIXES = {"deputy", "assistant", "vice"}
+DEPUTY_SUFFIXES = {"yardimcisi", "vekili"}
+DEPUTY_SCORES = {100: 80, 90: 80, 80: 60}
+_SENIORITY_KEYWORDS = [(keyword, score) for score, keywords in SENIORITY for keyword in keywords]
+
+
+def fold(text: str) -> str:
+    """Lower-case ``text`` and strip Turkish and other diacritics."""
+    text = unicodedata.normalize("NFKD", text.translate(_FOLD))
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def name_tokens(name: str) -> List[str]:
+    """Return the folded name words without honorifics or credentials."""
+    name = name.split(",")[0]
+    return [t for t in _WORDS.findall(fold(name)) if t not in HONORIFICS]
+
+
+def parse_title(title: str) -> Tuple[str, str]:
+    """Split a LinkedIn result title into ``(name, role)``.
+
+    Handles ``-``, en/em dash and ``|`` separators; hyphenated surnames
+    without surrounding spaces stay intact.
+    """
+    parts = [p.strip() for p in _TITLE_SEPARATORS.split(title) if p.strip()]
+    parts = [p for p in parts if fold(p) not in {"linkedin", "linkedin turkiye"}]
+    if not parts:
+        return "", ""
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+def _keyword_spans(padded: str) -> List[Tuple[int, int, str, int]]:
+    """Return ``(start, end, keyword, score)`` of every keyword in ``padded``."""
+    spans = []
+    for keyword, score in _SENIORITY_KEYWORDS:
+        needle = f" {keyword} "
+        start = padded.find(needle)
+        while start != -1:
+            begin, end, rank = start, start + len(needle), score
+            if score in DEPUTY_SCORES:
+                before = padded[:begin].split()[-1:]
+                after = padded[end:].split()[:1]
+                if before and before[0] in DEPUTY_PREFIXES:
+                    begin, rank = begin - len(before[0]) - 1, DEPUTY_SCORES[score]
+                elif after and after[0] in DEPUTY_SUFFIXES:
+                    end, rank = end + len(after[0]) + 1, DEPUTY_SCORES[score]
+            spans.append((begin, end, keyword, rank))
+            start = padded.find(needle, start + 1)
+    return spans
+
+
+def seniority(title: str) -> int:
+    """Return the seniority score of a job title (-1 if unknown)."""
+    padded = f" {' '.join(_WORDS.findall(fold(title)))} "
+    spans = _keyword_spans(padded)
+    found = [
+        (start, end, keyword, score)
+        for start, end, keyword, score in spans
+        if not any(s <= start and end <= e and e - s > end - start for s, e, _, _ in spans)
+    ]
+    if not found:
+        return -1
+    assistants = [score for _, _, keyword, score in found if keyword in ASSISTANT_KEYWORDS]
+    return min(assistants) if assistants else max(score for *_, score in found)
+
+
+def _same_person(a: List[str], b: List[str]) -> bool:
+    if not a or not b:
+        return False
+    if sorted(a) == sorted(b):
+        return True
+    short, long_ = (a, b) if len(a) <= len(b) else (b, a)
+    # a missing middle name: "ayse yilmaz" vs "ayse nur yilmaz"
+    if len(short) >= 2 and set(short) <= set(long_) and short[0] == long_[0]:
+        return True
+    # typos and transliterations, but not "ahmet yilmaz" vs "mehmet yilmaz"
+    if SequenceMatcher(None, a[0], b[0]).ratio() < FIRST_NAME_RATIO:
+        return False
+    return SequenceMatcher(None, " ".join(a), " ".join(b)).ratio() >= NAME_MATCH_RATIO
+
+
+class _UnionFind:
+    """Union-find whose sets hold at most one canonical profile URL."""
+
+    def __init__(self, urls: Sequence[str]) -> None:
+        self.parent = list(range(len(urls)))
+        self.url = list(urls)
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri == rj:
+            return
+        # two different profiles are two people, however similar the names
+        if self.url[ri] and self.url[rj] and self.url[ri] != self.url[rj]:
+            return
+        root, child = min(ri, rj), max(ri, rj)
+        self.parent[child] = root
+        self.url[root] = self.url[root] or self.url[child]
+
+
+def _blocks(tokens: Sequence[List[str]]) -> Dict[str, List[int]]:
+    """Group contact indexes by the prefixes of their first and last name."""
+    blocks: Dict[str, List[int]] = {}
+    for i, toks in enumerate(tokens):
+        keys: Set[str] = set()
+        if toks:
+            keys.add("f:" + toks[0][:BLOCK_PREFIX])
+            keys.add("l:" + toks[-1][:BLOCK_PREFIX])
+        for key in keys:
+            blocks.setdefault(key, []).append(i)
+    return blocks
+
+
+def _merge(cluster: List[Dict[str, str]]) -> Dict[str, str]:
+    # name and profile URL come from one contact: the fullest spelling that
+    # keeps its diacritics, preferring contacts with a URL
+    source = max(
+        cluster,
+        key=lambda c: (
+            bool(c.get("source_url")),
+            len(name_tokens(c.get("full_name", ""))),
+            fold(c.get("full_name", "")) != c.get("full_name", "").lower(),
+            len(c.get("full_name", "")),
+        ),
+    )
+    title = max((c.get("title", "") for c in cluster), key=lambda t: (seniority(t), len(t)))
+    summary = max((c.get("summary", "") for c in cluster), key=len)
+    merged = dict(source)
+    merged.update(title=title, summary=summary)
+    return merged
+
+
+def resolve_contacts(contacts: Iterable[Dict[str, str]], limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """Merge duplicate contacts and order them by seniority.
+
+    Contacts sharing a canonical ``source_url`` are one person; so are
+    contacts with a matching name unless they link different profiles. Ties keep the order in which people were first found. At most
+    ``limit`` contacts are returned.
+    """
+    contacts = [c for c in contacts if c.get("full_name") or c.get("source_url")]
+    tokens = [name_tokens(c.get("full_name", "")) for c in contacts]
+    urls = [canonicalize_url(c.get("source_url", "")) for c in contacts]
+    uf = _UnionFind(urls)
+
+    by_url: Dict[str, int] = {}
+    for i, url in enumerate(urls):
+        if url:
+            if url in by_url:
+                uf.union(by_url[url], i)
+            else:
+                by_url[url] = i
+
+    compared: Set[Tuple[int, int]] = set()
+    for members in _blocks(tokens).values():
+        for x, i in enumerate(members):
+            for j in members[x + 1 :]:
+                if (i, j) in compared or uf.find(i) == uf.find(j):
+                    continue
+                compared.add((i, j))
+                if _same_person(tokens[i], tokens[j]):
+                    uf.union(i, j)
+
+    clusters: Dict[int, List[Dict[str, str]]] = {}
+    for i, contact in enumerate(contacts):
+        clusters.setdefault(uf.find(i), []).append(contact)
+
+    ranked = []
+    for root, cluster in clusters.items():
+        merged = _merge(cluster)
+        ranked.append((-seniority(merged.get("title", "")), -len(cluster), root, merged))
+    ranked.sort(key=lambda item: item[:3])
+    return [merged for *_, merged in ranked[:limit]]
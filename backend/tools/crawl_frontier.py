@@ -0,0 +1,169 @@
+"""Priority-scored crawl frontier.
+
+Candidate URLs are ranked by keywords in their path and anchor text so pages
+that answer the analysis fields (see ``enhanced_search_agent.QUERY_MAP``) are
+fetched first, and legal, login, tag or archive pages are skipped; category
+pages only when their path names no field, so product listings are kept.
+Only one language variant (``/en/…``, ``/tr/…``) of a page is queued.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ..utils import normalize_domain
+
+# Path/anchor keywords per analysis field, English and Turkish (ASCII-folded)
+FIELD_KEYWORDS: Dict[str, List[str]] = {
+    "foundation": ["about", "hakkimizda", "hakkinda", "kurumsal", "company", "tarihce", "history", "biz-kimiz", "who-we-are"],
+    "products": ["products", "urunler", "urun", "product", "katalog", "catalog"],
+    "production_capacity": ["production", "uretim", "capacity", "kapasite", "tesis", "facility", "facilities", "factory", "fabrika"],
+    "production_technology": ["technology", "teknoloji", "manufacturing", "imalat", "quality", "kalite"],
+    "machinery": ["machinery", "makine", "makine-parki", "machine-park", "equipment", "ekipman"],
+    "services": ["services", "service", "hizmet", "hizmetler", "hizmetlerimiz", "solutions", "cozumler"],
+    "r_and_d": ["ar-ge", "arge", "r-d", "rd", "research", "innovation", "inovasyon"],
+    "references": ["references", "referans", "referanslar", "customers", "musteriler", "projects", "projeler", "case-studies"],
+    "decision_makers": ["team", "ekibimiz", "ekip", "yonetim", "management", "leadership", "board", "yonetim-kurulu"],
+    "growth_signals": ["careers", "kariyer", "jobs", "insan-kaynaklari", "news", "haberler", "press", "basin", "investor", "yatirimci"],
+}
+
+# Pages that never help the analysis
+NEGATIVE_KEYWORDS = [
+    "privacy", "gizlilik", "cookie", "cookies", "cerez", "kvkk", "kvk", "terms", "kosullar", "sartlar",
+    "disclaimer", "login", "giris", "signin", "register", "uye-ol", "cart", "sepet", "checkout",
+    "search", "arama", "feed", "rss", "wp-json", "wp-login", "print", "share", "sitemap",
+]
+# Listing pages skipped unless the path names a field: /blog/tag/fuar is an
+# archive, /urun-kategori/hidrolik-silindir a product listing
+ARCHIVE_KEYWORDS = ["tag", "tags", "etiket", "category", "kategori", "author"]
+
+SKIP_EXTENSIONS = {
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".rar", ".mp4", ".mp3",
+    ".avi", ".mov", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".css", ".js", ".xml",
+}
+
+LANGUAGE_CODES = {"tr", "en", "de", "fr", "es", "it", "ru", "ar", "nl", "pl", "pt", "ro", "bg", "fa", "zh"}
+
+_FOLD = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+_TOKEN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+# /2021/05/ style archive paths and ?page=2 / /page/2 pagination
+_ARCHIVE = re.compile(r"/(?:19|20)\d\d/(?:\d\d/)?|/page/\d+|[?&](?:page|paged|p)=\d+")
+
+FIELD_WEIGHT_PATH = 3.0
+FIELD_WEIGHT_ANCHOR = 2.0
+LEVEL_PENALTY = 1.0
+
+
+def _tokens(text: str) -> Set[str]:
+    """Return lower-case, ASCII-folded words and hyphenated phrases of ``text``."""
+    folded = text.translate(_FOLD).lower().replace("_", "-").replace("&", "-")
+    tokens: Set[str] = set()
+    for match in _TOKEN.findall(folded):
+        tokens.add(match)
+        tokens.update(match.split("-"))
+    return tokens
+
+
+def language_variant(url: str) -> Tuple[str, str]:
+    """Return ``(page_key, language)`` for ``url``.
+
+    ``/en/about`` and ``/tr/about`` share the key ``host/about``; the language
+    is ``""`` when the URL carries none.
+    """
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s]
+    lang = ""
+    if segments and segments[0].lower() in LANGUAGE_CODES:
+        lang = segments.pop(0).lower()
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in {"lang", "language", "hl"}]
+    for key, value in parse_qsl(parts.query):
+        if key.lower() in {"lang", "language", "hl"}:
+            lang = value.lower()[:2]
+    key = urlunsplit(("", normalize_domain(url), "/".join(segments), urlencode(query), ""))
+    return key, lang
+
+
+def score_url(url: str, anchor: str = "") -> Optional[float]:
+    """Return the priority of ``url``; None if it should not be fetched."""
+    parts = urlsplit(url)
+    path = parts.path.lower()
+    if any(path.endswith(ext) for ext in SKIP_EXTENSIONS):
+        return None
+    if _ARCHIVE.search(path + ("?" + parts.query if parts.query else "")):
+        return None
+    path_tokens = _tokens(parts.path)
+    if path_tokens & set(NEGATIVE_KEYWORDS):
+        return None
+    anchor_tokens = _tokens(anchor)
+    score = 0.0
+    path_fields = 0
+    for keywords in FIELD_KEYWORDS.values():
+        words = set(keywords)
+        if path_tokens & words:
+            score += FIELD_WEIGHT_PATH
+            path_fields += 1
+        elif anchor_tokens & words:
+            score += FIELD_WEIGHT_ANCHOR
+    if path_tokens & set(ARCHIVE_KEYWORDS) and not path_fields:
+        return None
+    if anchor_tokens & set(NEGATIVE_KEYWORDS) and not score:
+        return None
+    # shallow paths are more often section landing pages
+    score -= 0.1 * path.count("/")
+    return score
+
+
+class CrawlFrontier:
+    """Best-first queue of same-site URLs with one entry per language variant."""
+
+    def __init__(self, start_url: str) -> None:
+        self.domain = normalize_domain(start_url)
+        _, self.preferred_lang = language_variant(start_url)
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._counter = itertools.count()
+        self._seen: Set[str] = set()
+        self._variants: Dict[str, Tuple[str, str]] = {}
+        self._queued: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def add(self, url: str, anchor: str = "", level: int = 0, bonus: float = 0.0) -> bool:
+        """Queue ``url`` unless it is off-site, already known or low value."""
+        url = url.split("#")[0]
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"} or normalize_domain(url) != self.domain:
+            return False
+        if url in self._seen:
+            return False
+        key, lang = language_variant(url)
+        known = self._variants.get(key)
+        if known is not None and (
+            known[0] == self.preferred_lang or lang != self.preferred_lang or known[1] not in self._queued
+        ):
+            return False
+        score = 0.0 if level == 0 else score_url(url, anchor)
+        if score is None:
+            return False
+        if known is not None:
+            # the preferred language replaces a variant still waiting in the queue
+            self._queued.discard(known[1])
+        self._seen.add(url)
+        self._queued.add(url)
+        self._variants[key] = (lang, url)
+        priority = score + bonus - LEVEL_PENALTY * level
+        heapq.heappush(self._heap, (-priority, next(self._counter), url, level))
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Return the highest priority ``(url, level)`` or None when empty."""
+        while self._heap:
+            _, _, url, level = heapq.heappop(self._heap)
+            if url in self._queued:
+                self._queued.discard(url)
+                return url, level
+        return None
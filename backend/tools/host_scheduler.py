@@ -0,0 +1,260 @@
+"""Process-wide politeness scheduler for outgoing page fetches.
+
+All crawls and ``staticscraper`` fetch through one :class:`HostScheduler`,
+which caches parsed robots.txt rules per host, caps concurrent requests per
+host, spaces requests by the host's ``Crawl-delay`` (or
+:data:`HOST_MIN_DELAY`), and backs off after 429/503 responses, honouring
+``Retry-After``. A request that would have to wait longer than
+:data:`HOST_MAX_RETRY_WAIT` for a backoff raises :class:`HostThrottledError`
+instead of blocking its caller. Host state and robots rules are kept for at
+most :data:`HOST_CACHE_SIZE` hosts, least recently used first out.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from ..utils import metrics
+from ..utils.logger import logger
+from ..utils.singleflight import SingleFlight
+
+HOST_MAX_CONCURRENCY = int(os.getenv("HOST_MAX_CONCURRENCY", "2"))
+# Seconds between request starts to one host when robots.txt sets no Crawl-delay
+HOST_MIN_DELAY = float(os.getenv("HOST_MIN_DELAY", "0.5"))
+# Upper bound for Crawl-delay and Retry-After values taken from sites
+HOST_MAX_DELAY = float(os.getenv("HOST_MAX_DELAY", "10"))
+HOST_MAX_BACKOFF = float(os.getenv("HOST_MAX_BACKOFF", "300"))
+# A throttled request is retried once if the wait is at most this long
+HOST_MAX_RETRY_WAIT = float(os.getenv("HOST_MAX_RETRY_WAIT", "30"))
+ROBOTS_TTL_SECONDS = float(os.getenv("ROBOTS_TTL_SECONDS", "3600"))
+# robots.txt that timed out, was throttled or answered 5xx is retried sooner
+ROBOTS_ERROR_TTL_SECONDS = 300.0
+# Hosts whose state and robots rules stay cached in a long-running process
+HOST_CACHE_SIZE = int(os.getenv("HOST_CACHE_SIZE", "1024"))
+BACKOFF_BASE_SECONDS = 5.0
+USER_AGENT = "*"
+
+THROTTLE_STATUSES = {429, 503}
+
+
+class HostThrottledError(requests.RequestException):
+    """The host is backing off for longer than :data:`HOST_MAX_RETRY_WAIT`; skip the request."""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Return the seconds to wait for a ``Retry-After`` header value."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (now or time.time()))
+
+
+def host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+
+class _Host:
+    __slots__ = ("semaphore", "next_start", "backoff_until", "failures")
+
+    def __init__(self, concurrency: int) -> None:
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+        self.next_start = 0.0
+        self.backoff_until = 0.0
+        self.failures = 0
+
+
+class HostScheduler:
+    """Per-host robots cache, concurrency cap, request spacing and backoff."""
+
+    def __init__(
+        self,
+        max_concurrency: int = HOST_MAX_CONCURRENCY,
+        min_delay: float = HOST_MIN_DELAY,
+        robots_ttl: float = ROBOTS_TTL_SECONDS,
+        cache_size: int = HOST_CACHE_SIZE,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_delay = min_delay
+        self.robots_ttl = robots_ttl
+        self.cache_size = max(1, cache_size)
+        self._lock = threading.Lock()
+        # least recently used first; an evicted host that is still in use
+        # only loses its spacing and backoff state
+        self._hosts: "OrderedDict[str, _Host]" = OrderedDict()
+        self._robots: "OrderedDict[str, Tuple[float, RobotFileParser]]" = OrderedDict()
+        self._robots_fetches = SingleFlight("robots")
+
+    def _host(self, key: str) -> _Host:
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                host = self._hosts[key] = _Host(self.max_concurrency)
+                if len(self._hosts) > self.cache_size:
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(key)
+            return host
+
+    def _cached_robots(self, key: str) -> Optional[Tuple[float, RobotFileParser]]:
+        with self._lock:
+            cached = self._robots.get(key)
+            if cached is not None:
+                self._robots.move_to_end(key)
+            return cached
+
+    # robots.txt
+
+    def robots(self, url: str) -> RobotFileParser:
+        """Return the cached robots.txt rules of ``url``'s host.
+
+        Unreachable robots.txt files allow everything, 401/403 disallow
+        everything, as :class:`RobotFileParser` does.
+        """
+        key = host_key(url)
+        cached = self._cached_robots(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return self._robots_fetches.do(key, self._load_robots, key)
+
+    def _load_robots(self, key: str) -> RobotFileParser:
+        rp = RobotFileParser()
+        rp.set_url(f"{key}/robots.txt")
+        ttl = self.robots_ttl
+        try:
+            resp = self.fetch(f"{key}/robots.txt", retry=False)
+            if resp.status_code in {401, 403}:
+                rp.disallow_all = True
+            elif resp.status_code >= 400:
+                rp.allow_all = True
+                if resp.status_code >= 500 or resp.status_code in THROTTLE_STATUSES:
+                    ttl = ROBOTS_ERROR_TTL_SECONDS
+            else:
+                rp.parse(resp.text.splitlines())
+        except requests.RequestException as exc:
+            logger.warning("HostScheduler robots.txt unavailable for %s: %s", key, exc)
+            rp.allow_all = True
+            ttl = ROBOTS_ERROR_TTL_SECONDS
+        with self._lock:
+            self._robots[key] = (time.monotonic() + ttl, rp)
+            self._robots.move_to_end(key)
+            while len(self._robots) > self.cache_size:
+                self._robots.popitem(last=False)
+        return rp
+
+    def can_fetch(self, url: str) -> bool:
+        return self.robots(url).can_fetch(USER_AGENT, url)
+
+    def delay(self, key: str) -> float:
+        """Seconds between request starts to ``key``."""
+        cached = self._cached_robots(key)
+        crawl_delay = cached[1].crawl_delay(USER_AGENT) if cached else None
+        if crawl_delay is None:
+            return self.min_delay
+        return min(float(crawl_delay), HOST_MAX_DELAY)
+
+    # request spacing
+
+    def _throttled(self, key: str, wait: float) -> HostThrottledError:
+        metrics.incr("host_throttled_skipped")
+        return HostThrottledError(f"{key} is backing off for {wait:.0f} s")
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Hold one of the host's request slots, waiting for its delay and backoff.
+
+        Raises :class:`HostThrottledError` instead of waiting longer than
+        :data:`HOST_MAX_RETRY_WAIT`.
+        """
+        key = host_key(url)
+        host = self._host(key)
+        delay = self.delay(key)
+        # fail before queueing on the semaphore behind other throttled callers
+        backoff = host.backoff_until - time.monotonic()
+        if backoff > HOST_MAX_RETRY_WAIT:
+            raise self._throttled(key, backoff)
+        with host.semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, host.next_start, host.backoff_until)
+                if start - now <= HOST_MAX_RETRY_WAIT:
+                    host.next_start = start + delay
+            if start - now > HOST_MAX_RETRY_WAIT:
+                raise self._throttled(key, start - now)
+            if start > now:
+                metrics.incr("host_wait_ms", int((start - now) * 1000))
+                time.sleep(start - now)
+            yield
+
+    def note_response(self, url: str, response: requests.Response) -> Optional[float]:
+        """Record a response; return the backoff in seconds if it was throttled."""
+        host = self._host(host_key(url))
+        with self._lock:
+            if response.status_code not in THROTTLE_STATUSES:
+                host.failures = 0
+                return None
+            host.failures += 1
+            wait = parse_retry_after(response.headers.get("Retry-After"))
+            if wait is None:
+                wait = BACKOFF_BASE_SECONDS * 2 ** (host.failures - 1)
+            wait = min(wait, HOST_MAX_BACKOFF)
+            host.backoff_until = max(host.backoff_until, time.monotonic() + wait)
+        metrics.incr("host_throttled")
+        logger.warning("HostScheduler %s returned %d, backing off %.1f s", host_key(url), response.status_code, wait)
+        return wait
+
+    def fetch(
+        self,
+        url: str,
+        timeout: float = 10,
+        retry: bool = True,
+        read: Optional[Callable[[requests.Response], Any]] = None,
+    ) -> Any:
+        """GET ``url`` politely; a throttled request is retried once after its backoff.
+
+        With ``read`` the response is streamed and ``read(response)`` runs
+        while the host slot is still held, so body downloads count against
+        the per-host concurrency; its result is returned instead of the
+        response unless the request was throttled.
+        """
+        while True:
+            with self.slot(url):
+                response = requests.get(url, timeout=timeout, stream=read is not None)
+                if read is not None and response.status_code not in THROTTLE_STATUSES:
+                    self.note_response(url, response)
+                    return read(response)
+            wait = self.note_response(url, response)
+            if wait is None or not retry or wait > HOST_MAX_RETRY_WAIT:
+                return response
+            response.close()
+            retry = False
+
+
+_scheduler: Optional[HostScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> HostScheduler:
+    """Return the process-wide scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = HostScheduler()
+    return _scheduler
@@ -0,0 +1,139 @@
+"""HTML processing service used by the crawler and the static scraper.
+
+Link extraction, title extraction and text cleanup run on the fastest parser
+available (``selectolax`` > ``lxml`` > the stdlib ``html.parser``). When
+``HTML_PARSE_WORKERS`` is set above ``0`` the work runs in a shared process
+pool so parsing does not hold the GIL of the request thread.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+import importlib.util
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+HTML_PARSE_WORKERS = int(os.getenv("HTML_PARSE_WORKERS", "0"))
+
+PARSERS = ["selectolax", "lxml", "html.parser"]
+
+_SKIP_TAGS = ["script", "style", "noscript", "template", "svg"]
+_WHITESPACE = re.compile(r"\s+")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def available_parsers() -> List[str]:
+    """Return the installed parsers, fastest first."""
+    return [
+        name
+        for name in PARSERS
+        if name == "html.parser" or importlib.util.find_spec(name) is not None
+    ]
+
+
+DEFAULT_PARSER = available_parsers()[0]
+
+
+def _process_selectolax(html: str, base_url: str, want: Sequence[str]) -> Dict[str, object]:
+    from selectolax.parser import HTMLParser
+
+    tree = HTMLParser(html)
+    result: Dict[str, object] = {}
+    if "title" in want:
+        node = tree.css_first("title")
+        result["title"] = node.text(strip=True) if node else ""
+    if "links" in want:
+        result["links"] = [
+            (urljoin(base_url, node.attributes.get("href") or ""), node.text(strip=True))
+            for node in tree.css("a[href]")
+        ]
+    if "text" in want:
+        tree.strip_tags(_SKIP_TAGS)
+        root = tree.body or tree.root
+        text = root.text(separator=" ") if root else ""
+        result["text"] = _WHITESPACE.sub(" ", text).strip()
+    return result
+
+
+def _process_soup(html: str, base_url: str, want: Sequence[str], parser: str) -> Dict[str, object]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, parser)
+    result: Dict[str, object] = {}
+    if "title" in want:
+        result["title"] = soup.title.string.strip() if soup.title and soup.title.string else ""
+    if "links" in want:
+        result["links"] = [
+            (urljoin(base_url, link["href"]), link.get_text(strip=True))
+            for link in soup.find_all("a", href=True)
+        ]
+    if "text" in want:
+        for tag in soup(_SKIP_TAGS):
+            tag.decompose()
+        result["text"] = _WHITESPACE.sub(" ", soup.get_text(" ")).strip()
+    return result
+
+
+def process_page(
+    html: str,
+    base_url: str = "",
+    want: Sequence[str] = ("title", "links", "text"),
+    parser: Optional[str] = None,
+) -> Dict[str, object]:
+    """Parse ``html`` in the current process and return the requested parts.
+
+    ``links`` is a list of ``(absolute_url, anchor_text)`` tuples.
+    """
+    parser = parser or DEFAULT_PARSER
+    if parser == "selectolax":
+        return _process_selectolax(html, base_url, want)
+    return _process_soup(html, base_url, want, parser)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=HTML_PARSE_WORKERS)
+    return _pool
+
+
+def parse_page(
+    html: str, base_url: str = "", want: Sequence[str] = ("title", "links", "text")
+) -> Dict[str, object]:
+    """Parse a page, off the calling thread when a worker pool is configured."""
+    if HTML_PARSE_WORKERS > 0:
+        return _get_pool().submit(process_page, html, base_url, tuple(want)).result()
+    return process_page(html, base_url, want)
+
+
+def parse_pages(
+    pages: Sequence[Tuple[str, str]], want: Sequence[str] = ("title", "links", "text")
+) -> List[Dict[str, object]]:
+    """Parse ``(html, base_url)`` pairs, in parallel when a pool is configured."""
+    if HTML_PARSE_WORKERS > 0:
+        pool = _get_pool()
+        futures = [pool.submit(process_page, html, url, tuple(want)) for html, url in pages]
+        return [f.result() for f in futures]
+    return [process_page(html, url, want) for html, url in pages]
+
+
+def extract_title(html: str) -> str:
+    """Return the page ``<title>`` text."""
+    return str(parse_page(html, want=("title",))["title"])
+
+
+def extract_links(html: str, base_url: str) -> List[Tuple[str, str]]:
+    """Return ``(absolute_url, anchor_text)`` for every ``<a href>`` on the page."""
+    return list(parse_page(html, base_url, want=("links",))["links"])
+
+
+def clean_text(html: str) -> str:
+    """Return the visible text of the page with whitespace collapsed."""
+    return str(parse_page(html, want=("text",))["text"])
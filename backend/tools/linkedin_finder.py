@@ -2,10 +2,8 @@ import os
 from typing import Dict, List, Optional
 
 import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 
-EXA_API_URL = "https://api.exa.ai/search"
+EXA_API_URL = os.getenv("EXA_API_URL", "https://api.exa.ai/search")
 EXA_API_KEY = os.getenv("EXA_API_KEY")
 
 
@@ -30,6 +28,9 @@ def linkedinfinder(company_name: str) -> Dict[str, Optional[str]]:
 
 def linkedincontacts(company_url: str) -> Dict[str, List[Dict[str, str]]]:
     """Extract publicly visible employee names and titles from a LinkedIn page."""
+    from bs4 import BeautifulSoup
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
@@ -3,7 +3,7 @@ from typing import Dict, List
 
 import requests
 
-BRAVE_API_URL = "https://api.search.brave.com/res/v1/news/search"
+BRAVE_API_URL = os.getenv("BRAVE_NEWS_URL", "https://api.search.brave.com/res/v1/news/search")
 BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
 
 
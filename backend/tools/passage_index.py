@@ -0,0 +1,126 @@
+"""In-memory BM25 index over the passages of crawled pages.
+
+The analyst prompt only sees the start of the crawled HTML, so facts on
+later pages (machinery lists, R&D, references …) are lost. The index splits
+the visible text into overlapping passages and retrieves the best ones for
+each missing analysis field before paid web search is tried.
+"""
+
+from __future__ import annotations
+
+from array import array
+import math
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .crawl_frontier import FIELD_KEYWORDS
+
+PASSAGE_WORDS = 80
+PASSAGE_OVERLAP = 20
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_FOLD = str.maketrans("çğıöşüâîûÇĞİÖŞÜÂÎÛ", "cgiosuaiuCGIOSUAIU")
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Content words per field on top of the URL keywords of FIELD_KEYWORDS
+FIELD_TERMS: Dict[str, List[str]] = {
+    "foundation": ["founded", "established", "kuruldu", "kurulus", "yil", "since"],
+    "production_technology": ["automation", "otomasyon", "process", "proses", "iso"],
+    "production_capacity": ["ton", "adet", "m2", "metrekare", "annual", "yillik", "capacity"],
+    "machinery": ["cnc", "press", "pres", "torna", "lazer", "laser", "robot", "kaynak", "tezgah"],
+    "r_and_d": ["patent", "tubitak", "tasarim", "design", "merkezi", "center"],
+    "references": ["musterilerimiz", "clients", "partner", "cozum", "ortaklari"],
+    "decision_makers": ["ceo", "genel", "mudur", "director", "founder", "kurucu", "baskan"],
+    "growth_signals": ["yatirim", "ihracat", "export", "yeni", "new", "acilis", "opening"],
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Return lower-case, ASCII-folded word tokens of ``text``."""
+    return _WORD.findall(text.translate(_FOLD).lower())
+
+
+def split_passages(text: str, size: int = PASSAGE_WORDS, overlap: int = PASSAGE_OVERLAP) -> List[str]:
+    """Split ``text`` into passages of ``size`` words overlapping by ``overlap``."""
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, size - overlap)
+    passages = []
+    for start in range(0, len(words), step):
+        passages.append(" ".join(words[start : start + size]))
+        if start + size >= len(words):
+            break
+    return passages
+
+
+def field_query(field: str) -> List[str]:
+    """Return the query tokens used to retrieve passages for ``field``."""
+    terms: List[str] = []
+    for phrase in FIELD_KEYWORDS.get(field, []) + FIELD_TERMS.get(field, []):
+        terms.extend(t for t in tokenize(phrase) if len(t) > 1)
+    return list(dict.fromkeys(terms))
+
+
+class PassageIndex:
+    """Okapi BM25 over a fixed list of passages.
+
+    Postings are stored as parallel ``array`` columns (passage id, term
+    frequency) per term, and passage lengths in one ``array``.
+    """
+
+    def __init__(self, passages: Sequence[str]) -> None:
+        self.passages = list(passages)
+        self._lengths = array("I")
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        for doc_id, passage in enumerate(self.passages):
+            tokens = tokenize(passage)
+            self._lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                ids, freqs = self._postings.setdefault(token, (array("I"), array("H")))
+                ids.append(doc_id)
+                freqs.append(min(count, 65535))
+        total = sum(self._lengths)
+        self._avg_length = total / len(self._lengths) if self._lengths else 0.0
+
+    @classmethod
+    def from_html(cls, html: str) -> "PassageIndex":
+        from .html_processing import clean_text
+
+        return cls(split_passages(clean_text(html)) if html else [])
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings[term][0])
+        n = len(self.passages)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: Iterable[str], k: int = 3) -> List[Tuple[float, str]]:
+        """Return the ``k`` best ``(score, passage)`` pairs for the query tokens."""
+        scores: Dict[int, float] = {}
+        for term in set(query):
+            if term not in self._postings:
+                continue
+            idf = self._idf(term)
+            ids, freqs = self._postings[term]
+            for doc_id, tf in zip(ids, freqs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc_id] / self._avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(score, self.passages[doc_id]) for doc_id, score in best]
+
+
+def field_passages(index: PassageIndex, fields: Iterable[str], k: int = 3) -> Dict[str, List[str]]:
+    """Return the top passages for every field that matches anything."""
+    found: Dict[str, List[str]] = {}
+    for field in fields:
+        hits = index.search(field_query(field), k)
+        if hits:
+            found[field] = [passage for _, passage in hits]
+    return found
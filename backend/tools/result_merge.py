@@ -0,0 +1,87 @@
+"""Merge ranked search results from several engines or queries.
+
+URLs are canonicalized (LinkedIn locale subdomains, tracking parameters,
+fragments and trailing slashes), duplicates collapse into one result and the
+rankings are combined with reciprocal rank fusion: a result scores
+``sum(1 / (k + rank))`` over the lists it appears in.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+RRF_K = 60
+
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "dclid", "yclid", "trk", "trkinfo", "refid", "lipi",
+    "originalsubdomain", "mc_cid", "mc_eid", "_hsenc", "_hsmi", "igshid", "si",
+}
+
+RankedLists = Union[Mapping[str, Sequence[Dict[str, str]]], Sequence[Sequence[Dict[str, str]]]]
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name.startswith("utm_") or name in TRACKING_PARAMS
+
+
+def canonicalize_url(url: str) -> str:
+    """Return ``url`` in a canonical form for deduplication.
+
+    ``tr.linkedin.com/in/x/?trk=…`` and ``https://www.linkedin.com/in/x``
+    both become ``https://www.linkedin.com/in/x``.
+    """
+    url = url.strip()
+    if not url:
+        return ""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host == "linkedin.com" or host.endswith(".linkedin.com"):
+        host, scheme = "www.linkedin.com", "https"
+    netloc = host
+    if parts.port and (scheme, parts.port) not in {("http", 80), ("https", 443)}:
+        netloc = f"{host}:{parts.port}"
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)])
+    path = parts.path.rstrip("/")
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def result_key(result: Dict[str, str]) -> str:
+    """Return the identity of a result: its canonical URL, else its title."""
+    url = canonicalize_url(result.get("url", ""))
+    if url:
+        return url
+    return "title:" + " ".join(result.get("title", "").lower().split())
+
+
+def merge_results(lists: RankedLists, k: int = RRF_K, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """Deduplicate and fuse ranked result lists into one list.
+
+    ``lists`` is a sequence of rankings or a mapping of engine name to
+    ranking. Each merged result is a copy of its first occurrence with the
+    canonical URL; the longest snippet seen is kept. At most ``limit``
+    results are returned.
+    """
+    rankings: Iterable[Sequence[Dict[str, str]]] = lists.values() if isinstance(lists, Mapping) else lists
+    merged: Dict[str, Dict[str, str]] = {}
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        seen_here = set()
+        for rank, result in enumerate(ranking or [], start=1):
+            key = result_key(result)
+            if key in seen_here:
+                continue
+            seen_here.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            if key not in merged:
+                item = dict(result)
+                if item.get("url"):
+                    item["url"] = canonicalize_url(item["url"])
+                merged[key] = item
+            elif len(result.get("snippet", "")) > len(merged[key].get("snippet", "")):
+                merged[key]["snippet"] = result["snippet"]
+    # dicts keep insertion order, so ties go to the earlier result
+    order = sorted(merged, key=lambda key: -scores[key])
+    return [merged[key] for key in order[:limit]]
@@ -1,49 +1,171 @@
 """Collection of real scraping tools used by the orchestration agent."""
 
+import codecs
+from dataclasses import dataclass, field
+import os
+import re
 from typing import Dict
 
 import requests
-from bs4 import BeautifulSoup
 
-# Playwright imports
-from playwright.sync_api import sync_playwright
+from ..utils import metrics
+from ..utils.logger import logger
+from ..utils.llm import get_client
+from ..utils.model_router import run_cascade
+from ..utils.singleflight import SingleFlight
+from . import host_scheduler
+from .html_processing import extract_title
+
+# Browser and crawler backends (Playwright, Selenium, Scrapy) are imported inside
+# the tools that need them, so they load only when their fallback tier is used.
+
+# Bytes of (decompressed) body read per page; the rest is dropped
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+FETCH_CHUNK_BYTES = 64 * 1024
+
+TEXT_CONTENT_TYPES = {"application/xhtml+xml", "application/xml", "application/json"}
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([a-zA-Z0-9_-]+)""", re.IGNORECASE)
+_XML_ENCODING = re.compile(rb"""^<\?xml[^>]+encoding=["']([a-zA-Z0-9_-]+)""")
+
+
+class UnsupportedContentError(requests.RequestException):
+    """The response is not a text document (PDF, image, video, archive …)."""
+
+
+def is_target_error(exc: Exception) -> bool:
+    """Return True if the target site, not the scraping tool, refused the page.
+
+    HTTP 4xx answers other than 429, binary content and hosts that are
+    backing off say nothing about the tool's health.
+    """
+    if isinstance(exc, (UnsupportedContentError, host_scheduler.HostThrottledError)):
+        return True
+    response = getattr(exc, "response", None)
+    return (
+        isinstance(exc, requests.HTTPError)
+        and response is not None
+        and 400 <= response.status_code < 500
+        and response.status_code != 429
+    )
 
-# Selenium imports
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 
-# Scrapy imports
-from scrapy.crawler import CrawlerProcess
-from scrapy import Spider
+@dataclass
+class Page:
+    """Decoded, size-bounded body of a fetched page."""
 
-# OpenAI for llmscraper
-import openai
+    url: str
+    status_code: int
+    text: str
+    content_type: str = ""
+    encoding: str = "utf-8"
+    truncated: bool = False
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def is_text_type(mime: str) -> bool:
+    return not mime or mime.startswith("text/") or mime in TEXT_CONTENT_TYPES or mime.endswith("+xml")
+
+
+def _charset(content_type: str, head: bytes) -> str:
+    """Return the charset from the Content-Type header, else from the document head."""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            return value.strip().strip("\"'")
+    match = _XML_ENCODING.match(head) or _META_CHARSET.search(head[:4096])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def read_page(response: requests.Response, max_bytes: int = FETCH_MAX_BYTES) -> Page:
+    """Stream the body of ``response`` into a :class:`Page`.
+
+    Raises for HTTP errors and :class:`UnsupportedContentError` for binary
+    content types before any of the body is read. At most ``max_bytes``
+    are read and decoded incrementally with the document's charset.
+    """
+    try:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        mime = content_type.split(";")[0].strip().lower()
+        if not is_text_type(mime):
+            metrics.incr("fetch_skipped_binary")
+            raise UnsupportedContentError(f"{mime} not fetched: {response.url}")
+        declared = response.headers.get("Content-Length", "")
+        truncated = declared.isdigit() and int(declared) > max_bytes
+
+        decoder = None
+        encoding = "utf-8"
+        parts = []
+        received = 0
+        for chunk in response.iter_content(FETCH_CHUNK_BYTES):
+            if not chunk:
+                continue
+            if received + len(chunk) > max_bytes:
+                chunk = chunk[: max_bytes - received]
+                truncated = True
+            if decoder is None:
+                encoding = _charset(content_type, chunk)
+                try:
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                except LookupError:
+                    encoding = "utf-8"
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            received += len(chunk)
+            parts.append(decoder.decode(chunk))
+            if received >= max_bytes:
+                break
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+    finally:
+        response.close()
+    if truncated:
+        metrics.incr("fetch_truncated")
+        logger.info("fetch_page truncated %s at %d bytes", response.url, max_bytes)
+    return Page(
+        url=response.url,
+        status_code=response.status_code,
+        text="".join(parts),
+        content_type=mime,
+        encoding=encoding,
+        truncated=truncated,
+        headers=dict(response.headers),
+    )
 
-from ..utils.logger import logger
 
-# create an OpenAI client lazily to avoid requiring API key at import time
-client = None
+_fetches = SingleFlight("page_fetch")
 
 
-def get_client() -> openai.OpenAI:
-    """Return a cached OpenAI client instance."""
-    global client
-    if client is None:
-        client = openai.OpenAI()
-    return client
+def _get(url: str, timeout: float) -> Page:
+    result = host_scheduler.get_scheduler().fetch(url, timeout=timeout, read=read_page)
+    if isinstance(result, requests.Response):
+        # still throttled after the scheduler's retry
+        result.close()
+        result.raise_for_status()
+    return result
+
+
+def fetch_page(url: str, timeout: float = 10) -> Page:
+    """GET ``url`` as a decoded :class:`Page`, raising for HTTP errors.
+
+    The body is streamed and capped at :data:`FETCH_MAX_BYTES`; binary
+    content types raise :class:`UnsupportedContentError` without being
+    downloaded. Requests go through the per-host politeness scheduler, and
+    concurrent fetches of the same URL share one request.
+    """
+    return _fetches.do(url, _get, url, timeout)
 
 
 def staticscraper(target_url: str) -> Dict[str, str]:
-    """Scrape static HTML content using requests and BeautifulSoup."""
-    response = requests.get(target_url, timeout=10)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
-    title = soup.title.string if soup.title else ""
+    """Scrape static HTML content using requests and the HTML processing service."""
+    response = fetch_page(target_url)
+    title = extract_title(response.text)
     return {"title": title, "html": response.text}
 
 
 def jsrender(target_url: str) -> Dict[str, str]:
     """Render JavaScript-heavy pages using Playwright."""
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
@@ -56,6 +178,9 @@ def jsrender(target_url: str) -> Dict[str, str]:
 
 def formbot(target_url: str) -> Dict[str, str]:
     """Interact with pages that require automation using Selenium."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     driver = webdriver.Chrome(options=chrome_options)
@@ -65,22 +190,29 @@ def formbot(target_url: str) -> Dict[str, str]:
     return {"html": html}
 
 
-class _SimpleSpider(Spider):
-    name = "simple_spider"
+def _simple_spider():
+    from scrapy import Spider
+
+    class _SimpleSpider(Spider):
+        name = "simple_spider"
 
-    def __init__(self, url: str, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.start_urls = [url]
-        self.collected_html = ""
+        def __init__(self, url: str, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.start_urls = [url]
+            self.collected_html = ""
 
-    def parse(self, response):
-        self.collected_html = response.text
+        def parse(self, response):
+            self.collected_html = response.text
+
+    return _SimpleSpider
 
 
 def masscrawler(target_url: str) -> Dict[str, str]:
     """Run a minimal Scrapy spider to fetch a page."""
+    from scrapy.crawler import CrawlerProcess
+
     process = CrawlerProcess(settings={"LOG_ENABLED": False})
-    spider = _SimpleSpider
+    spider = _simple_spider()
     process.crawl(spider, url=target_url)
     process.start()
     html = spider.collected_html if hasattr(spider, "collected_html") else ""
@@ -97,12 +229,17 @@ def llmscraper(target_url: str) -> Dict[str, str]:
         "Provide a short summary."
     )
     logger.info("%s INPUT: %s", step, prompt)
-    try:
+
+    def ask(model: str) -> str:
         response = get_client().chat.completions.create(
-            model="gpt-4", messages=[{"role": "user", "content": prompt}]
+            model=model, messages=[{"role": "user", "content": prompt}]
         )
-        summary = response.choices[0].message.content
-        logger.info("%s OUTPUT: %s", step, summary)
+        summary = response.choices[0].message.content or ""
+        logger.info("%s OUTPUT (%s): %s", step, model, summary)
+        return summary
+
+    try:
+        summary = run_cascade("llmscraper", ask, lambda text: len(text.strip()) >= 20)
         return {"summary": summary, "html": html}
     except Exception as exc:
         logger.exception("%s ERROR: %s", step, exc)
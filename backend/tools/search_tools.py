@@ -25,7 +25,7 @@ def company_api_search(query: str) -> List[str]:
 
 
 BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
-BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+BRAVE_SEARCH_URL = os.getenv("BRAVE_SEARCH_URL", "https://api.search.brave.com/res/v1/web/search")
 
 
 def brave_search(query: str) -> List[Dict[str, str]]:
@@ -55,7 +55,7 @@ def brave_search(query: str) -> List[Dict[str, str]]:
 
 
 SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY")
-SERPAPI_URL = "https://serpapi.com/search"
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search")
 
 
 def serpapi_search(query: str) -> List[Dict[str, str]]:
@@ -86,7 +86,7 @@ if not GOOGLE_API_KEYS:
         GOOGLE_API_KEYS = [single]
 
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
-GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
+GOOGLE_CSE_URL = os.getenv("GOOGLE_CSE_URL", "https://www.googleapis.com/customsearch/v1")
 
 
 def google_cse_search(query: str) -> List[Dict[str, str]]:
@@ -0,0 +1,201 @@
+"""Sitemap discovery for the crawler.
+
+Reads the ``Sitemap:`` entries of robots.txt and ``/sitemap.xml``, follows
+sitemap indexes and gzip-compressed sitemaps, and parses them incrementally
+so large sitemaps never sit in memory whole.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import gzip
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional, Set
+from urllib.parse import urljoin
+from xml.etree import ElementTree
+
+import requests
+
+from ..utils import normalize_domain
+from . import host_scheduler
+from ..utils.logger import logger
+
+MAX_SITEMAPS = 10
+MAX_SITEMAP_URLS = 500
+SITEMAP_CHUNK_BYTES = 64 * 1024
+
+
+class SitemapEntry(NamedTuple):
+    url: str
+    lastmod: Optional[float]
+
+
+def parse_lastmod(value: str) -> Optional[float]:
+    """Return a W3C datetime (``2024-05-01`` or full ISO 8601) as a timestamp."""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap(stream: IO[bytes]) -> Iterator[tuple]:
+    """Yield ``("url" | "sitemap", loc, lastmod)`` from a sitemap XML stream."""
+    loc, lastmod = "", None
+    for event, elem in ElementTree.iterparse(stream, events=("end",)):
+        name = _local(elem.tag)
+        if name == "loc":
+            loc = (elem.text or "").strip()
+        elif name == "lastmod":
+            lastmod = parse_lastmod(elem.text or "")
+        elif name in {"url", "sitemap"}:
+            if loc:
+                yield name, loc, lastmod
+            loc, lastmod = "", None
+            elem.clear()
+
+
+class _ChunkStream:
+    """Read-only file object over the chunks of ``response.iter_content``.
+
+    ``iter_content`` works for streamed responses as well as for already
+    loaded ones (cassette replays), and undoes the transfer encoding.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class _Prefixed:
+    """File-like object that replays ``head`` before reading from ``rest``."""
+
+    def __init__(self, head: bytes, rest: IO[bytes]) -> None:
+        self._head = head
+        self._rest = rest
+
+    def read(self, size: int = -1) -> bytes:
+        if self._head:
+            if size < 0:
+                data, self._head = self._head + self._rest.read(), b""
+                return data
+            data, self._head = self._head[:size], self._head[size:]
+            if len(data) < size:
+                data += self._rest.read(size - len(data))
+            return data
+        return self._rest.read(size)
+
+
+def _body(url: str, response: requests.Response) -> IO[bytes]:
+    stream: IO[bytes] = _ChunkStream(response.iter_content(SITEMAP_CHUNK_BYTES))
+    content_type = response.headers.get("Content-Type", "")
+    if url.endswith(".gz") or "gzip" in content_type:
+        head = stream.read(2)
+        stream = _Prefixed(head, stream)
+        if head == b"\x1f\x8b":
+            stream = gzip.GzipFile(fileobj=stream)
+    return stream
+
+
+def _fetch(url: str, timeout: float, max_urls: int) -> List[tuple]:
+    """Return the ``iter_sitemap`` items of one sitemap, at most ``max_urls`` page URLs.
+
+    The sitemap is fetched through the host scheduler and parsed while its
+    host slot is held.
+    """
+
+    def read(response: requests.Response) -> List[tuple]:
+        try:
+            response.raise_for_status()
+            items = []
+            urls = 0
+            for item in iter_sitemap(_body(url, response)):
+                items.append(item)
+                if item[0] == "url":
+                    urls += 1
+                    if urls >= max_urls:
+                        break
+            return items
+        finally:
+            response.close()
+
+    result = host_scheduler.get_scheduler().fetch(url, timeout=timeout, read=read)
+    if isinstance(result, requests.Response):
+        # still throttled after the scheduler's retry
+        result.close()
+        result.raise_for_status()
+    return result
+
+
+def discover_sitemap_urls(
+    base_url: str,
+    robots_sitemaps: Optional[Iterable[str]] = None,
+    max_urls: int = MAX_SITEMAP_URLS,
+    timeout: float = 10,
+) -> List[SitemapEntry]:
+    """Return same-site page URLs listed in the site's sitemaps.
+
+    ``robots_sitemaps`` are the ``Sitemap:`` URLs from robots.txt; when empty
+    ``/sitemap.xml`` is tried. Errors are logged and yield no entries.
+    """
+    step = "Sitemap"
+    domain = normalize_domain(base_url)
+    pending = list(robots_sitemaps or []) or [urljoin(base_url, "/sitemap.xml")]
+    visited: Set[str] = set()
+    entries: List[SitemapEntry] = []
+    seen_urls: Set[str] = set()
+    while pending and len(visited) < MAX_SITEMAPS and len(entries) < max_urls:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+        try:
+            items = _fetch(sitemap_url, timeout, max_urls)
+        except Exception as exc:
+            logger.info("%s %s unavailable: %s", step, sitemap_url, exc)
+            continue
+        for kind, loc, lastmod in items:
+            if kind == "sitemap":
+                pending.append(loc)
+            elif normalize_domain(loc) == domain and loc not in seen_urls:
+                seen_urls.add(loc)
+                entries.append(SitemapEntry(loc, lastmod))
+                if len(entries) >= max_urls:
+                    break
+    logger.info("%s %s: %d urls from %d sitemaps", step, domain, len(entries), len(visited))
+    return entries
+
+
+def changed_since(entries: Iterable[SitemapEntry], timestamp: float, complete: bool = True) -> Optional[bool]:
+    """Return whether any entry was modified after ``timestamp``.
+
+    None when the answer is unknown: no entry carries a ``lastmod``, or none
+    of an incomplete list (``complete=False``, e.g. cut at
+    :data:`MAX_SITEMAP_URLS`) changed.
+    """
+    known = [e.lastmod for e in entries if e.lastmod is not None]
+    if not known:
+        return None
+    if max(known) > timestamp:
+        return True
+    return False if complete else None
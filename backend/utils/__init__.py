@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from urllib.parse import urlsplit, urlunsplit
+
 
 def normalize_url(url: str) -> str:
     """Ensure the URL has an HTTP or HTTPS scheme."""
@@ -11,5 +13,29 @@ def normalize_url(url: str) -> str:
     return url
 
 
-__all__ = ["normalize_url"]
+def canonical_url(url: str) -> str:
+    """Return a comparison key for ``url``.
+
+    Treats ``http`` and ``https`` alike and lower-cases the host, dropping a
+    leading ``www.``, default ports, the fragment and a trailing slash, so
+    ``Example.com/`` and ``http://www.example.com`` map to the same key.
+    """
+
+    parts = urlsplit(normalize_url(url.strip()))
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https" if parts.scheme == "http" else parts.scheme.lower(), host, path, parts.query, ""))
+
+
+def normalize_domain(url: str) -> str:
+    """Return the lower-cased host of ``url`` without a leading ``www.``."""
+
+    return urlsplit(canonical_url(url)).netloc
+
+
+__all__ = ["canonical_url", "normalize_domain", "normalize_url"]
 
@@ -0,0 +1,173 @@
+"""Run many chat completion requests as one batch job.
+
+Bulk workflows collect the requests of a stage across all companies and run
+them with :func:`run_batch`. :class:`OpenAIBatchBackend` uploads them as
+JSONL to the OpenAI Batch API: batch calls are cheaper and have their own
+rate limit, so they do not compete with interactive traffic, but answers only
+arrive within the completion window. :class:`LocalBatchBackend` runs the same
+requests through the regular client in a thread pool; it stands in for the
+Batch API in tests and development. ``BATCH_BACKEND`` selects ``openai``
+(default) or ``local``.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from . import metrics
+from .llm import get_client
+from .logger import logger
+
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "openai")
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "60"))
+# Give up (and cancel) after this long; the Batch API window is 24 hours
+BATCH_TIMEOUT_SECONDS = float(os.getenv("BATCH_TIMEOUT_SECONDS", str(25 * 3600)))
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_ENDPOINT = "/v1/chat/completions"
+LOCAL_BATCH_WORKERS = int(os.getenv("LOCAL_BATCH_WORKERS", "4"))
+
+# Batch states after which no more results arrive
+TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchError(RuntimeError):
+    """Raised when a batch job does not finish in time."""
+
+
+def batch_line(custom_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Return one Batch API request line for the chat completion ``body``."""
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+
+def to_jsonl(lines: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode("utf-8")
+
+
+class OpenAIBatchBackend:
+    """Submit requests to the OpenAI Batch API."""
+
+    def __init__(self, client: Any = None) -> None:
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        return self._client or get_client()
+
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        upload = self.client.files.create(file=("batch.jsonl", to_jsonl(lines)), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        batch = self.client.batches.retrieve(batch_id)
+        lines: List[Dict[str, Any]] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                text = self.client.files.content(file_id).text
+                lines += [json.loads(line) for line in text.splitlines() if line.strip()]
+        return lines
+
+    def cancel(self, batch_id: str) -> None:
+        self.client.batches.cancel(batch_id)
+
+
+class LocalBatchBackend:
+    """Run batch requests with the interactive client; results use the Batch API format."""
+
+    def __init__(self, client: Any = None, workers: int = LOCAL_BATCH_WORKERS) -> None:
+        self._client = client
+        self.workers = workers
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _run(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = (self._client or get_client()).chat.completions.create(**line["body"])
+        except Exception as exc:
+            return {"custom_id": line["custom_id"], "response": None, "error": {"message": str(exc)}}
+        content = response.choices[0].message.content
+        body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+        return {"custom_id": line["custom_id"], "response": {"status_code": 200, "body": body}, "error": None}
+
+    def submit(self, lines: List[Dict[str, Any]]) -> str:
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            self._results[batch_id] = list(executor.map(self._run, lines))
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if batch_id in self._results else "cancelled"
+
+    def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        return self._results.pop(batch_id, [])
+
+    def cancel(self, batch_id: str) -> None:
+        self._results.pop(batch_id, None)
+
+
+def make_backend(name: Optional[str] = None) -> Any:
+    """Return the batch backend called ``name`` (default :data:`BATCH_BACKEND`)."""
+    if (name or BATCH_BACKEND) == "local":
+        return LocalBatchBackend()
+    return OpenAIBatchBackend()
+
+
+def _content(line: Dict[str, Any]) -> Optional[str]:
+    response = line.get("response") or {}
+    if line.get("error") or response.get("status_code") != 200:
+        return None
+    try:
+        return response["body"]["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def run_batch(
+    lines: List[Dict[str, Any]],
+    backend: Any = None,
+    poll_seconds: float = BATCH_POLL_SECONDS,
+    timeout: float = BATCH_TIMEOUT_SECONDS,
+) -> Dict[str, Optional[str]]:
+    """Run request ``lines`` as one batch and return the answers by ``custom_id``.
+
+    Requests that failed or expired map to ``None``. A batch still running
+    after ``timeout`` seconds is cancelled and :class:`BatchError` raised.
+    """
+    if not lines:
+        return {}
+    backend = backend or make_backend()
+    step = "BatchClient"
+    start = time.monotonic()
+    batch_id = backend.submit(lines)
+    metrics.incr("batch_jobs")
+    metrics.incr("batch_requests", len(lines))
+    logger.info("%s SUBMIT %s: %d requests", step, batch_id, len(lines))
+    status = backend.status(batch_id)
+    while status not in TERMINAL_STATES:
+        if time.monotonic() - start >= timeout:
+            backend.cancel(batch_id)
+            raise BatchError(f"batch {batch_id} still {status} after {timeout:.0f}s")
+        time.sleep(poll_seconds)
+        status = backend.status(batch_id)
+
+    answers: Dict[str, Optional[str]] = dict.fromkeys((line["custom_id"] for line in lines), None)
+    for line in backend.results(batch_id):
+        if line.get("custom_id") in answers:
+            answers[line["custom_id"]] = _content(line)
+    failed = sum(1 for content in answers.values() if content is None)
+    if failed:
+        metrics.incr("batch_failed", failed)
+    duration_ms = int((time.monotonic() - start) * 1000)
+    logger.info("%s OUTPUT %s %s (%d ms): %d/%d answered", step, batch_id, status, duration_ms, len(lines) - failed, len(lines))
+    return answers
@@ -0,0 +1,79 @@
+"""Stage checkpoints for resumable pipeline runs.
+
+Each completed stage of a run is saved under ``(run_id, stage)``; a retry with
+the same run id loads them and continues from the first missing stage.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .logger import logger
+from .sqlite_db import SQLiteDB
+
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.db")
+# Checkpoints of failed or abandoned runs are pruned after this long; keep it
+# well above the time a job can spend being retried
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+CHECKPOINT_PRUNE_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_PRUNE_INTERVAL_SECONDS", "3600"))
+
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        run_id TEXT NOT NULL,
+        stage TEXT NOT NULL,
+        output_json TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (run_id, stage)
+    );
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints (created_at);
+    """,
+]
+
+
+class CheckpointStore:
+    """Save and load stage outputs per run."""
+
+    def __init__(self, path: str = CHECKPOINT_DB_PATH) -> None:
+        self.path = path
+        self.db = SQLiteDB(path, MIGRATIONS)
+
+    def load(self, run_id: str) -> Dict[str, Any]:
+        """Return ``{stage: output}`` of every completed stage of ``run_id``."""
+        rows = self.db.connect().execute(
+            "SELECT stage, output_json FROM checkpoints WHERE run_id = ?", (run_id,)
+        ).fetchall()
+        return {row["stage"]: json.loads(row["output_json"]) for row in rows}
+
+    def save(self, run_id: str, stage: str, output: Any) -> None:
+        self.db.connect().execute(
+            "INSERT OR REPLACE INTO checkpoints (run_id, stage, output_json, created_at) VALUES (?, ?, ?, ?)",
+            (run_id, stage, json.dumps(output, ensure_ascii=False), time.time()),
+        )
+        logger.info("Checkpoint SAVE %s: %s", run_id, stage)
+
+    def clear(self, run_id: str) -> None:
+        self.db.connect().execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def prune(self, older_than: float) -> int:
+        """Delete checkpoints created before the ``older_than`` timestamp."""
+        cursor = self.db.connect().execute("DELETE FROM checkpoints WHERE created_at < ?", (older_than,))
+        return cursor.rowcount
+
+
+_store: Optional[CheckpointStore] = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoints() -> CheckpointStore:
+    """Return the process-wide store at :data:`CHECKPOINT_DB_PATH`."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
@@ -0,0 +1,234 @@
+"""Durable local job queue backed by SQLite.
+
+The API enqueues pipeline jobs and separate worker processes claim and run
+them (see :mod:`backend.worker`). A claimed job holds a lease; if its worker
+dies the lease expires and another worker picks it up, so a worker renews the
+lease while it runs a job and only settles jobs it still holds. Failed jobs are
+retried with exponential backoff up to ``max_attempts``; a job whose lease
+expires on its last attempt is marked failed as abandoned.
+
+The interface (enqueue/claim/renew/complete/fail/get) is small on purpose so a
+Redis-backed queue can replace this local stand-in.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+import uuid
+
+from .logger import logger
+from .sqlite_db import SQLiteDB
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.db")
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+# A running job whose lease has expired is considered abandoned
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "1800"))
+# Workers renew the lease of their running job this often
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        dedupe_key TEXT,
+        payload_json TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        available_at REAL NOT NULL,
+        lease_until REAL,
+        worker TEXT,
+        result_json TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, available_at);
+    CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key, status);
+    """,
+]
+
+
+def _to_job(row: Any, with_result: bool = False) -> Dict[str, Any]:
+    job = {
+        "id": row["id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "attempts": row["attempts"],
+        "max_attempts": row["max_attempts"],
+        "payload": json.loads(row["payload_json"]),
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+    if with_result:
+        job["result"] = json.loads(row["result_json"]) if row["result_json"] else None
+    return job
+
+
+class JobQueue:
+    """Enqueue, claim and settle jobs."""
+
+    def __init__(self, path: str = JOB_DB_PATH) -> None:
+        self.path = path
+        self.db = SQLiteDB(path, MIGRATIONS)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        dedupe_key: Optional[str] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> str:
+        """Add a job and return its id.
+
+        If a queued or running job with the same ``dedupe_key`` exists, its
+        id is returned instead of adding a new one.
+        """
+        now = time.time()
+        with self.db.transaction() as conn:
+            if dedupe_key:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN (?, ?) LIMIT 1",
+                    (dedupe_key, QUEUED, RUNNING),
+                ).fetchone()
+                if row:
+                    return row["id"]
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                """
+                INSERT INTO jobs (id, kind, dedupe_key, payload_json, status, max_attempts,
+                                  available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, kind, dedupe_key, json.dumps(payload, ensure_ascii=False), QUEUED, max_attempts, now, now, now),
+            )
+        logger.info("JobQueue ENQUEUE %s: %s %s", job_id, kind, payload)
+        return job_id
+
+    def claim(self, worker: str, kinds: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest runnable job, or return None."""
+        now = time.time()
+        kind_filter = ""
+        params: list = [QUEUED, now, RUNNING, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params += list(kinds)
+        with self.db.transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?))"
+                    f"{kind_filter} ORDER BY available_at LIMIT 1",
+                    params,
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["status"] == QUEUED or row["attempts"] < row["max_attempts"]:
+                    break
+                # the worker died on its last attempt (OOM, crashed browser); don't run it again
+                error = f"abandoned: lease of {row['worker']} expired on attempt {row['attempts']}"
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (FAILED, error, now, row["id"]),
+                )
+                logger.error("JobQueue FAIL %s: %s", row["id"], error)
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ?",
+                (RUNNING, worker, now + JOB_LEASE_SECONDS, now, row["id"]),
+            )
+            job = _to_job(row)
+        job["attempts"] += 1
+        job["status"] = RUNNING
+        return job
+
+    def renew(self, job_id: str, worker: str) -> bool:
+        """Extend the lease of a running job; return False if ``worker`` no longer holds it."""
+        now = time.time()
+        cursor = self.db.connect().execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            (now + JOB_LEASE_SECONDS, now, job_id, worker, RUNNING),
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, result: Any, worker: str) -> bool:
+        """Store the result; return False if ``worker`` lost the job to another worker."""
+        now = time.time()
+        cursor = self.db.connect().execute(
+            "UPDATE jobs SET status = ?, result_json = ?, error = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (DONE, json.dumps(result, ensure_ascii=False), now, job_id, worker, RUNNING),
+        )
+        if cursor.rowcount == 0:
+            logger.warning("JobQueue COMPLETE %s ignored: no longer held by %s", job_id, worker)
+            return False
+        return True
+
+    def fail(self, job_id: str, error: str, worker: str) -> Optional[str]:
+        """Record a failed attempt; requeue with backoff or mark the job failed.
+
+        Returns the new status, or None if ``worker`` no longer holds the job.
+        """
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, RUNNING),
+            ).fetchone()
+            if row is None:
+                logger.warning("JobQueue FAIL %s ignored: no longer held by %s", job_id, worker)
+                return None
+            if row["attempts"] < row["max_attempts"]:
+                status = QUEUED
+                available_at = now + JOB_RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1)
+            else:
+                status, available_at = FAILED, now
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (status, error, available_at, now, job_id),
+            )
+        return status
+
+    def release(self, job_id: str, worker: str) -> None:
+        """Put a claimed job back without counting the attempt (worker shutdown)."""
+        now = time.time()
+        self.db.connect().execute(
+            "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), available_at = ?, lease_until = NULL, "
+            "updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            (QUEUED, now, now, job_id, worker, RUNNING),
+        )
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Dict[str, Any]]:
+        row = self.db.connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _to_job(row, with_result) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs per status."""
+        rows = self.db.connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """Return the process-wide queue at :data:`JOB_DB_PATH`."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
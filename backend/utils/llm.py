@@ -0,0 +1,28 @@
+"""Shared OpenAI client, created lazily on first use."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    import openai
+
+_client: Optional["openai.OpenAI"] = None
+_lock = threading.Lock()
+
+
+def get_client() -> "openai.OpenAI":
+    """Return a cached OpenAI client instance.
+
+    The ``openai`` package is imported and the client built on the first call
+    so importing the backend neither pays for it nor needs ``OPENAI_API_KEY``.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import openai
+
+                _client = openai.OpenAI()
+    return _client
@@ -0,0 +1,64 @@
+"""Process-level counters exposed by the ``/metrics`` endpoint."""
+
+from __future__ import annotations
+
+from collections import Counter
+import os
+import threading
+from typing import Dict
+
+_lock = threading.Lock()
+_gauges: Dict[str, int] = {"in_flight": 0}
+_counters: Counter = Counter()
+
+
+def request_started() -> None:
+    with _lock:
+        _gauges["in_flight"] += 1
+        _counters["requests"] += 1
+
+
+def request_finished(status: int) -> None:
+    with _lock:
+        _gauges["in_flight"] -= 1
+        if status >= 500:
+            _counters["errors"] += 1
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Increase the counter ``name`` by ``value``."""
+    with _lock:
+        _counters[name] += value
+
+
+def rss_bytes() -> int:
+    """Return the resident set size of this process (0 if unknown)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def snapshot() -> Dict[str, int]:
+    """Return the current gauges and counters."""
+    with _lock:
+        data = dict(_gauges)
+        data.update(_counters)
+    data["rss_bytes"] = rss_bytes()
+    return data
+
+
+def reset() -> None:
+    with _lock:
+        _gauges["in_flight"] = 0
+        _counters.clear()
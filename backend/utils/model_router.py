@@ -0,0 +1,67 @@
+"""Per-step model selection and cheap-first model cascades.
+
+Each LLM step has an ordered list of models, configurable with
+``LLM_MODELS_<STEP>`` (comma separated, e.g. ``gpt-4o-mini,gpt-4o``).
+Extraction-style steps run on the first (small) model and escalate to the
+next one only when the output fails validation or the call errors.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, Iterable, List, TypeVar
+
+from . import metrics
+from .logger import logger
+
+T = TypeVar("T")
+
+DEFAULT_MODELS: Dict[str, str] = {
+    "extract": "gpt-4o-mini,gpt-4o",
+    "analysis": "gpt-4o-mini,gpt-4o",
+    "llmscraper": "gpt-4o-mini,gpt-4o",
+    "report": "gpt-4o",
+}
+
+
+def models_for(step: str) -> List[str]:
+    """Return the model cascade of ``step``, cheapest first."""
+    spec = os.getenv(f"LLM_MODELS_{step.upper()}", DEFAULT_MODELS.get(step, "gpt-4o"))
+    models = [m.strip() for m in spec.split(",") if m.strip()]
+    return models or ["gpt-4o"]
+
+
+def run_cascade(step: str, call: Callable[[str], T], accept: Callable[[T], bool]) -> T:
+    """Return ``call(model)`` for the first model whose output is accepted.
+
+    Errors and rejected outputs of a model move on to the next one; the last
+    model's result is returned as is and its errors propagate.
+    """
+    models = models_for(step)
+    for model in models[:-1]:
+        start = time.perf_counter()
+        try:
+            result = call(model)
+        except Exception as exc:
+            reason = f"error: {exc}"
+        else:
+            if accept(result):
+                metrics.incr(f"llm_{step}_accepted_{model}")
+                return result
+            reason = "output rejected"
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        logger.info("ModelRouter %s ESCALATE from %s (%d ms): %s", step, model, duration_ms, reason)
+        metrics.incr(f"llm_{step}_escalated")
+    result = call(models[-1])
+    metrics.incr(f"llm_{step}_accepted_{models[-1]}")
+    return result
+
+
+def has_fields(data: object, keys: Iterable[str], required: Iterable[str] = ()) -> bool:
+    """Return True if ``data`` is a dict with all ``keys`` and non-empty ``required`` fields."""
+    if not isinstance(data, dict):
+        return False
+    if any(key not in data for key in keys):
+        return False
+    return all(data.get(key) not in (None, "", [], {}) for key in required)
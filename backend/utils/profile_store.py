@@ -0,0 +1,315 @@
+"""Persistent company profile store backed by SQLite.
+
+One row per normalized domain holds the latest materialized pipeline result:
+scrape info, LinkedIn data, analysis JSON and report HTML. Rows are indexed
+on domain, company name and update time so repeat lookups are served in
+milliseconds without running the pipeline again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from . import normalize_domain
+from .logger import logger
+from .sqlite_db import SQLiteDB
+
+PROFILE_DB_PATH = os.getenv("PROFILE_DB_PATH", "profiles.db")
+# Profiles younger than this are served as-is
+PROFILE_FRESH_SECONDS = float(os.getenv("PROFILE_FRESH_SECONDS", str(7 * 24 * 3600)))
+# Older than fresh but younger than this: served, then refreshed in the background
+PROFILE_MAX_STALE_SECONDS = float(os.getenv("PROFILE_MAX_STALE_SECONDS", str(30 * 24 * 3600)))
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+# Applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS profiles (
+        id INTEGER PRIMARY KEY,
+        domain TEXT NOT NULL UNIQUE,
+        website TEXT NOT NULL,
+        company_name TEXT,
+        company_key TEXT,
+        scrape_json TEXT,
+        linkedin_json TEXT,
+        analysis_json TEXT,
+        report_html TEXT,
+        timings_json TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_profiles_company ON profiles (company_key);
+    CREATE INDEX IF NOT EXISTS idx_profiles_updated ON profiles (updated_at);
+    """,
+    # per-part refresh times and access tracking for the refresh scheduler
+    """
+    ALTER TABLE profiles ADD COLUMN news_json TEXT;
+    ALTER TABLE profiles ADD COLUMN site_refreshed_at REAL;
+    ALTER TABLE profiles ADD COLUMN linkedin_refreshed_at REAL;
+    ALTER TABLE profiles ADD COLUMN news_refreshed_at REAL;
+    ALTER TABLE profiles ADD COLUMN access_score REAL NOT NULL DEFAULT 0;
+    ALTER TABLE profiles ADD COLUMN last_accessed_at REAL;
+    UPDATE profiles SET site_refreshed_at = updated_at, linkedin_refreshed_at = updated_at,
+        news_refreshed_at = updated_at;
+    CREATE INDEX IF NOT EXISTS idx_profiles_accessed ON profiles (last_accessed_at);
+    """,
+    # crawl depth of the stored site scrape; older rows count as the shallowest crawl
+    """
+    ALTER TABLE profiles ADD COLUMN depth INTEGER NOT NULL DEFAULT 0;
+    """,
+]
+
+# Parts of a profile that can be refreshed on their own, with their JSON column
+PARTS = {"site": "scrape_json", "linkedin": "linkedin_json", "news": "news_json"}
+
+# Access scores decay with this half-life so recent lookups weigh more
+ACCESS_HALF_LIFE_SECONDS = float(os.getenv("PROFILE_ACCESS_HALF_LIFE_SECONDS", str(7 * 24 * 3600)))
+
+_JSON_COLUMNS = {
+    "scrape": "scrape_json",
+    "linkedin": "linkedin_json",
+    "analysis": "analysis_json",
+    "timings": "timings_json",
+    "news": "news_json",
+}
+
+
+def company_key(name: str) -> str:
+    """Return the case- and whitespace-insensitive lookup key of a company name."""
+    return " ".join(name.casefold().split())
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value if value is not None else {}, ensure_ascii=False)
+
+
+def decayed_score(score: float, last_accessed_at: Optional[float], now: float) -> float:
+    """Return ``score`` decayed from ``last_accessed_at`` to ``now``."""
+    if not last_accessed_at:
+        return 0.0
+    return score * 0.5 ** (max(0.0, now - last_accessed_at) / ACCESS_HALF_LIFE_SECONDS)
+
+
+class ProfileStore:
+    """Read and write materialized pipeline results."""
+
+    def __init__(self, path: str = PROFILE_DB_PATH) -> None:
+        self.path = path
+        self.db = SQLiteDB(path, MIGRATIONS)
+
+    def connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the store."""
+        return self.db.connect()
+
+    # -- reads -----------------------------------------------------------
+    def _to_profile(self, row: sqlite3.Row) -> Dict[str, Any]:
+        profile: Dict[str, Any] = {
+            "domain": row["domain"],
+            "website": row["website"],
+            "company_name": row["company_name"],
+            "depth": row["depth"],
+            "report": row["report_html"] or "",
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "refreshed_at": {part: row[f"{part}_refreshed_at"] for part in PARTS},
+            "access_score": row["access_score"],
+            "last_accessed_at": row["last_accessed_at"],
+        }
+        for key, column in _JSON_COLUMNS.items():
+            profile[key] = json.loads(row[column] or "{}")
+        return profile
+
+    def get(self, website: str) -> Optional[Dict[str, Any]]:
+        """Return the stored profile for ``website``'s domain, if any."""
+        row = self.connect().execute(
+            "SELECT * FROM profiles WHERE domain = ?", (normalize_domain(website),)
+        ).fetchone()
+        return self._to_profile(row) if row else None
+
+    def find_by_company(self, company_name: str) -> List[Dict[str, Any]]:
+        """Return profiles whose company name matches, newest first."""
+        rows = self.connect().execute(
+            "SELECT * FROM profiles WHERE company_key = ? ORDER BY updated_at DESC",
+            (company_key(company_name),),
+        ).fetchall()
+        return [self._to_profile(row) for row in rows]
+
+    def updated_before(self, timestamp: float, limit: int = 100) -> List[str]:
+        """Return domains last updated before ``timestamp``, oldest first."""
+        rows = self.connect().execute(
+            "SELECT domain FROM profiles WHERE updated_at < ? ORDER BY updated_at LIMIT ?",
+            (timestamp, limit),
+        ).fetchall()
+        return [row["domain"] for row in rows]
+
+    def refresh_candidates(self, ttls: Dict[str, float], now: Optional[float] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return profiles with at least one part older than its TTL.
+
+        Each entry lists its ``stale_parts``; entries are ordered by decayed
+        access score, most requested first.
+        """
+        now = now or time.time()
+        clauses = " OR ".join(f"COALESCE({part}_refreshed_at, 0) < ?" for part in ttls)
+        rows = self.connect().execute(
+            f"SELECT domain, website, company_name, access_score, last_accessed_at, "
+            f"{', '.join(f'{part}_refreshed_at' for part in PARTS)} FROM profiles WHERE {clauses}",
+            [now - ttl for ttl in ttls.values()],
+        ).fetchall()
+        candidates = []
+        for row in rows:
+            stale = [p for p, ttl in ttls.items() if (row[f"{p}_refreshed_at"] or 0) < now - ttl]
+            candidates.append(
+                {
+                    "domain": row["domain"],
+                    "website": row["website"],
+                    "company_name": row["company_name"],
+                    "stale_parts": stale,
+                    "priority": decayed_score(row["access_score"], row["last_accessed_at"], now),
+                }
+            )
+        candidates.sort(key=lambda c: c["priority"], reverse=True)
+        return candidates[:limit]
+
+    # -- writes ----------------------------------------------------------
+    def record_access(self, website: str, now: Optional[float] = None) -> None:
+        """Count one lookup of ``website`` towards its refresh priority."""
+        now = now or time.time()
+        domain = normalize_domain(website)
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT access_score, last_accessed_at FROM profiles WHERE domain = ?", (domain,)
+            ).fetchone()
+            if row:
+                score = decayed_score(row["access_score"], row["last_accessed_at"], now) + 1
+                conn.execute(
+                    "UPDATE profiles SET access_score = ?, last_accessed_at = ? WHERE domain = ?",
+                    (score, now, domain),
+                )
+
+    def update_parts(
+        self,
+        website: str,
+        parts: Dict[str, Any],
+        analysis: Optional[Dict[str, Any]] = None,
+        report: Optional[str] = None,
+    ) -> None:
+        """Store refreshed ``parts`` (keys of :data:`PARTS`) and a new analysis/report."""
+        now = time.time()
+        assignments: List[str] = []
+        values: List[Any] = []
+        for part, data in parts.items():
+            assignments += [f"{PARTS[part]} = ?", f"{part}_refreshed_at = ?"]
+            values += [_dumps(data), now]
+        if analysis is not None:
+            assignments.append("analysis_json = ?")
+            values.append(_dumps(analysis))
+        if report is not None:
+            assignments.append("report_html = ?")
+            values.append(report)
+        assignments.append("updated_at = ?")
+        values += [now, normalize_domain(website)]
+        self.connect().execute(f"UPDATE profiles SET {', '.join(assignments)} WHERE domain = ?", values)
+        logger.info("ProfileStore UPDATE %s: %s", normalize_domain(website), sorted(parts))
+
+    def save(
+        self,
+        website: str,
+        result: Dict[str, Any],
+        company_name: Optional[str] = None,
+        depth: int = 1,
+    ) -> str:
+        """Insert or replace the profile for ``website`` from a pipeline result.
+
+        ``depth`` is the crawl depth the result was scraped with. Returns the
+        normalized domain used as key.
+        """
+        domain = normalize_domain(website)
+        scrape = result.get("scrape") or {}
+        analysis = result.get("analysis") or {}
+        name = company_name or scrape.get("company_name") or ""
+        now = time.time()
+        self.connect().execute(
+            """
+            INSERT INTO profiles (domain, website, company_name, company_key, scrape_json, linkedin_json,
+                                  news_json, analysis_json, report_html, timings_json, created_at, updated_at,
+                                  site_refreshed_at, linkedin_refreshed_at, news_refreshed_at, depth)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET
+                website = excluded.website,
+                company_name = excluded.company_name,
+                company_key = excluded.company_key,
+                scrape_json = excluded.scrape_json,
+                linkedin_json = excluded.linkedin_json,
+                news_json = excluded.news_json,
+                analysis_json = excluded.analysis_json,
+                report_html = excluded.report_html,
+                timings_json = excluded.timings_json,
+                updated_at = excluded.updated_at,
+                site_refreshed_at = excluded.site_refreshed_at,
+                linkedin_refreshed_at = excluded.linkedin_refreshed_at,
+                news_refreshed_at = excluded.news_refreshed_at,
+                depth = excluded.depth
+            """,
+            (
+                domain,
+                website,
+                name,
+                company_key(name),
+                _dumps(scrape),
+                _dumps(result.get("linkedin")),
+                _dumps({"news": analysis.get("news", [])}),
+                _dumps(analysis),
+                result.get("report") or "",
+                _dumps(result.get("timings")),
+                now,
+                now,
+                now,
+                now,
+                now,
+                depth,
+            ),
+        )
+        logger.info("ProfileStore SAVE: %s", domain)
+        return domain
+
+    def delete(self, website: str) -> None:
+        self.connect().execute("DELETE FROM profiles WHERE domain = ?", (normalize_domain(website),))
+
+
+def freshness(
+    profile: Dict[str, Any],
+    max_age: Optional[float] = None,
+    max_stale: Optional[float] = None,
+    now: Optional[float] = None,
+) -> str:
+    """Classify ``profile`` as :data:`FRESH`, :data:`STALE` or :data:`EXPIRED`."""
+    fresh_for = PROFILE_FRESH_SECONDS if max_age is None else max_age
+    stale_for = PROFILE_MAX_STALE_SECONDS if max_stale is None else max_stale
+    age = (now or time.time()) - profile["updated_at"]
+    if age <= fresh_for:
+        return FRESH
+    if age <= max(stale_for, fresh_for):
+        return STALE
+    return EXPIRED
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ProfileStore:
+    """Return the process-wide store at :data:`PROFILE_DB_PATH`."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore()
+    return _store
@@ -0,0 +1,228 @@
+"""Health tracking and circuit breaking for external search/scraping providers.
+
+Each provider keeps a rolling window of recent calls (latency, error, empty
+result). After ``failure_threshold`` consecutive errors the circuit opens and
+the provider is skipped until ``cooldown`` seconds have passed; then a single
+half-open probe decides whether it closes again. :func:`order_providers`
+reorders a fallback sequence by observed yield and latency once a provider
+has ``min_samples`` recent calls; calls older than ``max_age`` seconds are
+forgotten, so a demoted provider returns to its configured place.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import threading
+import time
+
+from .logger import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Yield assumed for a provider without enough recent calls to rank it
+UNKNOWN_SUCCESS_RATE = 0.5
+
+
+class ProviderHealth:
+    """Rolling health statistics and circuit state for a single provider."""
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        latency_bucket_ms: int = 1000,
+        min_samples: int = 5,
+        max_age: float = 900.0,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_bucket_ms = latency_bucket_ms
+        self.min_samples = min_samples
+        self.max_age = max_age
+        # (recorded_at, latency_ms, ok, empty)
+        self._calls: Deque[Tuple[float, float, bool, bool]] = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if now - self._opened_at >= self.cooldown:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted right now.
+
+        In the half-open state only one probe call is let through at a time.
+        """
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, latency_ms: float, ok: bool, empty: bool = False) -> None:
+        """Record the outcome of a call."""
+        with self._lock:
+            self._calls.append((time.monotonic(), latency_ms, ok, empty))
+            self._probing = False
+            if ok:
+                if self._opened_at is not None:
+                    logger.info("ProviderHealth CLOSE provider=%s", self.name)
+                self._consecutive_failures = 0
+                self._opened_at = None
+                return
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(
+                        "ProviderHealth OPEN provider=%s failures=%d",
+                        self.name,
+                        self._consecutive_failures,
+                    )
+                self._opened_at = time.monotonic()
+
+    def discard(self) -> None:
+        """End a call without recording it (the target, not the provider, failed)."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, object]:
+        """Return rolling statistics for the provider."""
+        now = time.monotonic()
+        with self._lock:
+            calls = [call[1:] for call in self._calls if now - call[0] <= self.max_age]
+            state = self._state(now)
+        total = len(calls)
+        if not total:
+            return {
+                "state": state,
+                "calls": 0,
+                "error_rate": 0.0,
+                "empty_rate": 0.0,
+                "success_rate": 1.0,
+                "latency_ms": 0.0,
+            }
+        errors = sum(1 for _, ok, _ in calls if not ok)
+        empties = sum(1 for _, ok, empty in calls if ok and empty)
+        return {
+            "state": state,
+            "calls": total,
+            "error_rate": errors / total,
+            "empty_rate": empties / total,
+            "success_rate": (total - errors - empties) / total,
+            "latency_ms": sum(lat for lat, _, _ in calls) / total,
+        }
+
+    def sort_key(self) -> Tuple[int, float, float]:
+        """Key used to rank providers: closed first, best yield, fastest.
+
+        With fewer than ``min_samples`` recent calls the provider counts as
+        :data:`UNKNOWN_SUCCESS_RATE` yield and ranks behind every provider
+        known to do at least as well.
+        """
+        stats = self.stats()
+        closed = 0 if stats["state"] != OPEN else 1
+        if int(stats["calls"]) < self.min_samples:
+            return (closed, -UNKNOWN_SUCCESS_RATE, float("inf"))
+        return (
+            closed,
+            -round(float(stats["success_rate"]), 1),
+            float(stats["latency_ms"]) // self.latency_bucket_ms,
+        )
+
+
+_registry: Dict[str, ProviderHealth] = {}
+_registry_lock = threading.Lock()
+
+
+def get_health(name: str) -> ProviderHealth:
+    """Return the shared :class:`ProviderHealth` for ``name``."""
+    with _registry_lock:
+        health = _registry.get(name)
+        if health is None:
+            health = _registry[name] = ProviderHealth(name)
+        return health
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a provider is skipped because its circuit is open."""
+
+
+def call_with_health(
+    name: str,
+    func: Callable[..., Any],
+    *args: Any,
+    ignore_error: Optional[Callable[[Exception], bool]] = None,
+    **kwargs: Any,
+) -> Any:
+    """Call ``func`` and record its latency and outcome under ``name``.
+
+    Raises :class:`CircuitOpenError` without calling ``func`` when the
+    provider's circuit is open. Exceptions for which ``ignore_error``
+    returns True (the target refused the request, not the provider) are
+    re-raised without being recorded.
+    """
+    health = get_health(name)
+    if not health.allow():
+        raise CircuitOpenError(f"{name} circuit open")
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except BaseException as exc:
+        if ignore_error is not None and isinstance(exc, Exception) and ignore_error(exc):
+            health.discard()
+        else:
+            health.record((time.perf_counter() - start) * 1000, ok=False)
+        raise
+    empty = False
+    if isinstance(result, dict):
+        empty = not result.get("html") if "html" in result else not result
+    elif hasattr(result, "__len__"):
+        empty = len(result) == 0
+    health.record((time.perf_counter() - start) * 1000, ok=True, empty=empty)
+    return result
+
+
+def order_providers(
+    names: List[str], labels: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """Return ``names`` reordered by observed health.
+
+    ``labels`` optionally maps each name to the key its health is recorded
+    under. Providers with an open circuit are moved to the end. Providers
+    without enough history to tell apart keep their configured order.
+    """
+    labels = labels or {}
+    position = {name: i for i, name in enumerate(names)}
+    return sorted(names, key=lambda n: (*get_health(labels.get(n, n)).sort_key(), position[n]))
+
+
+def health_snapshot() -> Dict[str, Dict[str, object]]:
+    """Return statistics for every tracked provider."""
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: health.stats() for name, health in items}
+
+
+def reset_health() -> None:
+    """Forget all recorded provider statistics."""
+    with _registry_lock:
+        _registry.clear()
@@ -0,0 +1,173 @@
+"""Deterministic HTML renderer for Delta Proje sales reports.
+
+The layout, CSS and section structure live in precompiled templates here; the
+reporter LLM only supplies the narrative text of each section as JSON.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from html import escape
+from string import Template
+import json
+from typing import Any, Dict, List
+
+# Basic CSS snippet for Delta Proje sales reports
+STYLE_SNIPPET = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@700&family=Open+Sans:wght@400&display=swap');
+body{font-family:'Open Sans',sans-serif;background:#F5F6FA;color:#003366;margin:0;padding:40px 0;}
+.container{max-width:850px;margin:auto;background:#fff;padding:40px 60px;border-radius:12px;box-shadow:0 2px 10px rgba(0,0,0,0.06);}
+h1,h2,h3{font-family:'Montserrat',sans-serif;font-weight:700;margin-top:0;color:#003366;}
+h1{font-size:32px;margin-bottom:20px;}
+h2{font-size:26px;margin-bottom:12px;}
+section{margin-bottom:40px;}
+section+section{border-top:1px solid #E5E8EC;padding-top:30px;}
+p,li{font-size:17px;line-height:1.7;}
+.subtitle{color:#2C85C8;font-weight:700;}
+.alert{background:#FFE6E6;border-left:6px solid #ff0000;padding:15px;}
+.actions li{font-weight:bold;margin-bottom:8px;}
+.actions li::before{content:'💡 ';}
+/* Box styling so the action and value section matches other boxes */
+.actions-box{background:#F5F6FA;padding:20px;border-radius:12px;box-shadow:0 2px 10px rgba(0,0,0,0.06);}
+footer{text-align:center;font-size:14px;color:#003366;position:fixed;bottom:0;left:0;width:100%;background:#fff;padding:8px 0;box-shadow:0 -1px 3px rgba(0,0,0,0.1);}
+</style>
+"""
+
+# Keys the reporter LLM fills in; list-valued sections are rendered as <ul>
+SECTION_KEYS = {
+    "executive_summary": "",
+    "company_overview": "",
+    "growth_signals": [],
+    "sales_opportunities": [],
+    "actions": [],
+    "recent_news": [],
+    "risks": "",
+}
+
+NO_DATA = "Bilgi yok"
+FOOTER = "Bu rapor Delta Proje Akıllı Satış Asistanı tarafından hazırlanmıştır."
+
+PAGE_TEMPLATE = Template(
+    """<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+$style
+</head>
+<body>
+<div class="container">
+<h1>$title</h1>
+<section><h2>Executive Summary</h2><p class="subtitle">$executive_summary</p></section>
+<section><h2>Şirket Özeti</h2>$company_overview</section>
+<section><h2>Karar Vericiler</h2>$decision_makers</section>
+<section><h2>Growth/Market Sinyalleri</h2>$growth_signals</section>
+<section><h2>Delta Proje Satış Fırsatları</h2>$sales_opportunities</section>
+<section class='actions-box'><h2>Aksiyon ve Değer Önerileri</h2>$actions</section>
+<section><h2>Güncel Haberler</h2>$recent_news</section>
+<section><h2>Riskler</h2><div class="alert">$risks</div></section>
+</div>
+<footer>$footer</footer>
+</body>
+</html>
+"""
+)
+
+CONTACT_TEMPLATE = Template("<li><strong>$name</strong>$title$summary</li>")
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, list):
+        value = " ".join(str(v) for v in value if v)
+    value = str(value or "").strip()
+    return escape(value) if value else NO_DATA
+
+
+def _paragraphs(value: Any) -> str:
+    text = value if isinstance(value, str) else _join(value)
+    parts = [p.strip() for p in str(text or "").split("\n") if p.strip()]
+    if not parts:
+        return f"<p>{NO_DATA}</p>"
+    return "".join(f"<p>{escape(p)}</p>" for p in parts)
+
+
+def _join(value: Any) -> str:
+    if isinstance(value, list):
+        return "\n".join(str(v) for v in value if v)
+    return str(value or "")
+
+
+def _items(value: Any, css_class: str = "") -> str:
+    if isinstance(value, str):
+        value = [line for line in value.split("\n")]
+    items: List[str] = [str(v).strip() for v in value or [] if str(v).strip()]
+    if not items:
+        return f"<p>{NO_DATA}</p>"
+    cls = f" class='{css_class}'" if css_class else ""
+    return f"<ul{cls}>" + "".join(f"<li>{escape(i)}</li>" for i in items) + "</ul>"
+
+
+def _contacts(contacts: Any) -> str:
+    rows: List[str] = []
+    for person in contacts or []:
+        if not isinstance(person, dict):
+            continue
+        name = str(person.get("full_name") or "").strip()
+        if not name:
+            continue
+        title = str(person.get("title") or "").strip()
+        summary = str(person.get("summary") or "").strip()
+        rows.append(
+            CONTACT_TEMPLATE.substitute(
+                name=escape(name),
+                title=f" – {escape(title)}" if title else "",
+                summary=f"<br>{escape(summary)}" if summary else "",
+            )
+        )
+    if not rows:
+        return f"<p>{NO_DATA}</p>"
+    return "<ul>" + "".join(rows) + "</ul>"
+
+
+@lru_cache(maxsize=256)
+def _render(payload: str) -> str:
+    data = json.loads(payload)
+    sections = data["sections"]
+    title = data["company"] or "Şirket"
+    return PAGE_TEMPLATE.substitute(
+        title=escape(f"{title} Satış Raporu"),
+        style=STYLE_SNIPPET,
+        executive_summary=_text(sections.get("executive_summary")),
+        company_overview=_paragraphs(sections.get("company_overview")),
+        decision_makers=_contacts(data["decision_makers"]),
+        growth_signals=_items(sections.get("growth_signals")),
+        sales_opportunities=_items(sections.get("sales_opportunities")),
+        actions=_items(sections.get("actions"), "actions"),
+        recent_news=_items(sections.get("recent_news")),
+        risks=_text(sections.get("risks")),
+        footer=FOOTER,
+    )
+
+
+def render_report(
+    sections: Dict[str, Any],
+    decision_makers: List[Dict[str, str]],
+    company: str = "",
+) -> str:
+    """Render the full HTML report.
+
+    ``sections`` holds the LLM-written texts keyed by :data:`SECTION_KEYS`.
+    Decision makers are rendered from the analysis data directly so names are
+    never rewritten by the model. Output is cached by input.
+    """
+    payload = json.dumps(
+        {
+            "sections": {k: sections.get(k, v) for k, v in SECTION_KEYS.items()},
+            "decision_makers": decision_makers or [],
+            "company": company or "",
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return _render(payload)
@@ -0,0 +1,63 @@
+"""Single-flight request coalescing.
+
+Concurrent calls with the same key share one execution: the first caller runs
+the function, later callers wait for it and receive the same result (or the
+same exception). Results are shared objects, so callers must treat them as
+read-only. Nothing is cached once the call has finished.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from . import metrics
+from .logger import logger
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``func(*args, **kwargs)`` unless a call for ``key`` is in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            logger.info("SingleFlight %s JOIN: %s", self.name, key)
+            metrics.incr(f"singleflight_{self.name}_shared")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """Return the number of keys currently being executed."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,64 @@
+"""Shared SQLite plumbing for the local stores (profiles, jobs, checkpoints)."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import os
+import sqlite3
+import threading
+from typing import Iterator, List
+
+
+class SQLiteDB:
+    """Per-thread (and per-process) connections with ordered schema migrations.
+
+    ``migrations`` is a list of SQL scripts applied in order; ``PRAGMA
+    user_version`` records how many have run. Connections are in autocommit
+    mode; use :meth:`transaction` for multi-statement writes.
+    """
+
+    def __init__(self, path: str, migrations: List[str]) -> None:
+        self.path = path
+        self.migrations = migrations
+        self._local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the schema on first use."""
+        conn = getattr(self._local, "conn", None)
+        # a forked worker must not reuse its parent's connection
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._migrate(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction that holds the database lock from the start."""
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        # BEGIN IMMEDIATE so concurrent processes apply each migration once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for index, script in enumerate(self.migrations[version:], start=version + 1):
+                for statement in filter(None, (s.strip() for s in script.split(";"))):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {index}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
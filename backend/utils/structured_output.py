@@ -0,0 +1,139 @@
+"""JSON-schema constrained LLM answers validated with Pydantic.
+
+The request carries a strict ``json_schema`` ``response_format`` built from a
+Pydantic model. An answer that still fails validation gets one repair call
+quoting the validation errors instead of a rerun of the whole step. The
+outcomes are counted per step for ``/metrics``: ``llm_<step>_structured``
+(answers), ``llm_<step>_parse_failed``, ``llm_<step>_repaired`` and
+``llm_<step>_repair_failed``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from . import metrics
+from .logger import logger
+
+M = TypeVar("M", bound=BaseModel)
+
+REPAIR_PROMPT = (
+    "Your previous answer did not match the required JSON schema:\n{errors}\n"
+    "Return only the corrected JSON object, without any other text."
+)
+MAX_REPAIR_ERRORS = 10
+
+# Older models without structured outputs; only these accept JSON mode
+JSON_MODE_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+LEGACY_MODELS = ("gpt-4", "gpt-3.5")
+
+
+class StructuredOutputError(ValueError):
+    """Raised when an answer fails validation even after the repair call."""
+
+
+def _tighten(node: Any) -> None:
+    if isinstance(node, list):
+        for item in node:
+            _tighten(item)
+        return
+    if not isinstance(node, dict):
+        return
+    node.pop("title", None)
+    node.pop("default", None)
+    properties = node.get("properties")
+    if isinstance(properties, dict):
+        # strict mode needs every property listed and no extra keys
+        node["required"] = list(properties)
+        node["additionalProperties"] = False
+        for prop in properties.values():
+            _tighten(prop)
+    for defs in node.get("$defs", {}).values():
+        _tighten(defs)
+    _tighten(node.get("items"))
+    _tighten(node.get("anyOf"))
+
+
+def strict_schema(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """Return the JSON schema of ``schema`` in OpenAI strict mode form."""
+    result = schema.model_json_schema()
+    _tighten(result)
+    return result
+
+
+def _base_model(model: str) -> str:
+    # fine-tuned models are named "ft:<base>:<org>::<id>"
+    return model.split(":", 2)[1] if model.startswith("ft:") else model
+
+
+def supports_json_schema(model: str) -> bool:
+    """Return True unless ``model`` is a legacy model without structured outputs."""
+    name = _base_model(model)
+    return name.startswith(("gpt-4o", "gpt-4.1")) or not name.startswith(LEGACY_MODELS)
+
+
+def response_format(schema: Type[BaseModel], model: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Return the ``response_format`` option constraining answers to ``schema``.
+
+    Legacy ``model`` names get JSON mode where they support it and no option
+    otherwise; their answers are still validated and repaired.
+    """
+    if model is None or supports_json_schema(model):
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": schema.__name__, "strict": True, "schema": strict_schema(schema)},
+        }
+    if _base_model(model).startswith(JSON_MODE_MODELS):
+        return {"type": "json_object"}
+    return None
+
+
+def _describe(error: ValidationError) -> str:
+    lines = []
+    for item in error.errors()[:MAX_REPAIR_ERRORS]:
+        loc = ".".join(str(part) for part in item.get("loc", ())) or "(root)"
+        lines.append(f"- {loc}: {item.get('msg', '')}")
+    return "\n".join(lines)
+
+
+def complete_json(
+    client: Any,
+    step: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    schema: Type[M],
+    **options: Any,
+) -> M:
+    """Ask ``model`` for an answer matching ``schema`` and return it validated.
+
+    ``options`` are passed on to ``chat.completions.create``. A failed
+    validation triggers a single repair call; if that answer fails too
+    :class:`StructuredOutputError` is raised.
+    """
+    fmt = response_format(schema, model)
+    if fmt is not None:
+        options["response_format"] = fmt
+    response = client.chat.completions.create(model=model, messages=messages, **options)
+    content = response.choices[0].message.content or ""
+    metrics.incr(f"llm_{step}_structured")
+    try:
+        return schema.model_validate_json(content)
+    except ValidationError as exc:
+        error = exc
+    metrics.incr(f"llm_{step}_parse_failed")
+    logger.warning("StructuredOutput %s REPAIR %s: %s", step, model, _describe(error))
+    repair = list(messages) + [
+        {"role": "assistant", "content": content},
+        {"role": "user", "content": REPAIR_PROMPT.format(errors=_describe(error))},
+    ]
+    response = client.chat.completions.create(model=model, messages=repair, **options)
+    content = response.choices[0].message.content or ""
+    try:
+        result = schema.model_validate_json(content)
+    except ValidationError as exc:
+        metrics.incr(f"llm_{step}_repair_failed")
+        raise StructuredOutputError(f"{step}: invalid {schema.__name__} from {model}: {_describe(exc)}") from exc
+    metrics.incr(f"llm_{step}_repaired")
+    return result
@@ -0,0 +1,198 @@
+"""Pipeline worker processes for the queue execution mode.
+
+With ``EXECUTION_MODE=queue`` the API only enqueues ``/analyze`` jobs; run one
+or more workers next to it to execute them::
+
+    python -m backend.worker --processes 4
+
+SIGTERM or Ctrl+C stops claiming new jobs and lets running ones finish; a
+second signal aborts and hands the current job back to the queue.
+"""
+
+from __future__ import annotations
+
+import argparse
+from contextlib import contextmanager
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .utils.checkpoint_store import (
+    CHECKPOINT_PRUNE_INTERVAL_SECONDS,
+    CHECKPOINT_TTL_SECONDS,
+    get_checkpoints,
+)
+from .utils.job_queue import FAILED, JOB_HEARTBEAT_SECONDS, JobQueue, get_queue
+from .utils.logger import logger
+
+
+def run_analyze_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the pipeline for an ``analyze`` job and store the profile.
+
+    The job id doubles as pipeline run id, so a retried job resumes from its
+    last completed stage.
+    """
+    from .workflows import company_analysis_workflow
+
+    payload = job["payload"]
+    return company_analysis_workflow.refresh(
+        payload["website"],
+        payload.get("company"),
+        payload.get("depth", 1),
+        run_id=job["id"],
+    )
+
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "analyze": run_analyze_job,
+}
+
+
+class Worker:
+    """Claim jobs from the queue and run them until stopped."""
+
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        name: Optional[str] = None,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = JOB_HEARTBEAT_SECONDS,
+    ) -> None:
+        self.queue = queue or get_queue()
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._stop = threading.Event()
+        self._next_prune = 0.0
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @contextmanager
+    def _heartbeat(self, job_id: str) -> Iterator[None]:
+        """Renew the lease of ``job_id`` in the background while the block runs."""
+        done = threading.Event()
+
+        def beat() -> None:
+            while not done.wait(self.heartbeat_interval):
+                if not self.queue.renew(job_id, self.name):
+                    logger.warning("Worker %s job %s lost its lease", self.name, job_id)
+                    return
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def run_one(self) -> bool:
+        """Claim and execute one job; return False if none was available."""
+        job = self.queue.claim(self.name, list(JOB_HANDLERS))
+        if job is None:
+            return False
+        step = f"Worker {self.name} job {job['id']}"
+        logger.info("%s START: %s attempt %d", step, job["kind"], job["attempts"])
+        try:
+            with self._heartbeat(job["id"]):
+                result = JOB_HANDLERS[job["kind"]](job)
+        except KeyboardInterrupt:
+            self.queue.release(job["id"], self.name)
+            logger.info("%s RELEASED", step)
+            raise
+        except Exception as exc:
+            status = self.queue.fail(job["id"], repr(exc), self.name)
+            if status is None:
+                return True
+            log = logger.error if status == FAILED else logger.warning
+            log("%s ERROR (%s): %s", step, status, exc)
+            if status == FAILED:
+                # no further attempt will resume from these
+                get_checkpoints().clear(job["id"])
+            return True
+        if self.queue.complete(job["id"], result, self.name):
+            logger.info("%s DONE", step)
+        return True
+
+    def prune_checkpoints(self) -> None:
+        """Drop checkpoints older than :data:`CHECKPOINT_TTL_SECONDS`, at most once per interval."""
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + CHECKPOINT_PRUNE_INTERVAL_SECONDS
+        try:
+            pruned = get_checkpoints().prune(time.time() - CHECKPOINT_TTL_SECONDS)
+        except Exception as exc:
+            logger.warning("Worker %s checkpoint prune failed: %s", self.name, exc)
+            return
+        if pruned:
+            logger.info("Worker %s pruned %d checkpoints", self.name, pruned)
+
+    def run(self) -> None:
+        logger.info("Worker %s started", self.name)
+        while not self._stop.is_set():
+            self.prune_checkpoints()
+            if not self.run_one():
+                self._stop.wait(self.poll_interval)
+        logger.info("Worker %s stopped", self.name)
+
+
+def _install_signal_handlers(worker: Worker) -> None:
+    signals = {"count": 0}
+
+    def handle(signum: int, frame: Any) -> None:
+        signals["count"] += 1
+        if signals["count"] > 1:
+            raise KeyboardInterrupt
+        logger.info("Worker %s shutting down after the current job", worker.name)
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+
+
+def _serve(poll_interval: float) -> None:
+    worker = Worker(poll_interval=poll_interval)
+    _install_signal_handlers(worker)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run pipeline workers")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _serve(args.poll_interval)
+        return
+
+    children = [
+        multiprocessing.Process(target=_serve, args=(args.poll_interval,), name=f"worker-{i}")
+        for i in range(args.processes)
+    ]
+    for child in children:
+        child.start()
+
+    def forward(signum: int, frame: Any) -> None:
+        for child in children:
+            if child.is_alive() and child.pid:
+                os.kill(child.pid, signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    # Ctrl+C already reaches every process in the foreground group
+    signal.signal(signal.SIGINT, lambda signum, frame: None)
+    for child in children:
+        child.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Nightly bulk refresh of company profiles through batch LLM jobs.
+
+Instead of one interactive LLM call per company and step, every LLM stage
+collects the prompts of all companies and runs them as one batch job (see
+:mod:`backend.utils.batch_client`); the answers are fanned back into the
+per-company state before the next stage starts:
+
+1. gather   - fetch stale site (without LLM extraction), LinkedIn and news parts
+2. extract  - batch the company info extraction of freshly scraped sites
+3. analysis - batch the data analyst prompts
+4. report   - prefetch report context, batch the report section prompts
+5. save     - store the refreshed parts, analysis and report
+
+Batch requests use the first model of each step's cascade. Answers that are
+missing from the batch, fail schema validation or would be escalated by the
+cascade are redone with the interactive agent function; if a batch job fails
+or times out, all of its answers are. Run it with::
+
+    python -m backend.workflows.bulk_refresh --limit 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from ..agents import data_analyst_agent, reporter_agent, scraper_agent
+from ..agents.schemas import Analysis, CompanyInfo, ReportSections
+from ..utils import metrics
+from ..utils.batch_client import batch_line, run_batch
+from ..utils.logger import logger
+from ..utils.model_router import has_fields, models_for
+from ..utils.profile_store import ProfileStore, get_store
+from ..utils.structured_output import response_format
+from .refresh_scheduler import REFRESH_TTLS, fetch_parts
+
+BULK_REFRESH_LIMIT = int(os.getenv("BULK_REFRESH_LIMIT", "1000"))
+# Companies whose sites, LinkedIn and news are fetched at the same time
+BULK_GATHER_WORKERS = int(os.getenv("BULK_GATHER_WORKERS", "8"))
+
+
+@dataclass
+class _Account:
+    website: str
+    domain: str
+    company: str
+    profile: Dict[str, Any]
+    parts: List[str]
+    fresh: Dict[str, Any] = field(default_factory=dict)
+    analysis: Dict[str, Any] = field(default_factory=dict)
+    report: str = ""
+
+    @property
+    def scrape(self) -> Dict[str, Any]:
+        return self.fresh.get("site", self.profile["scrape"])
+
+    @property
+    def linkedin(self) -> Dict[str, Any]:
+        return self.fresh.get("linkedin", self.profile["linkedin"])
+
+    @property
+    def news(self) -> Dict[str, Any]:
+        return self.fresh.get("news", self.profile["news"] or {"news": []})
+
+
+def _parse(step: str, content: Optional[str], schema: Type[BaseModel], accept: Callable[[Dict], bool]) -> Optional[Dict]:
+    """Return the validated answer, or ``None`` if it has to be redone interactively."""
+    if content is None:
+        return None
+    metrics.incr(f"llm_{step}_structured")
+    try:
+        data = schema.model_validate_json(content).model_dump()
+    except ValidationError:
+        metrics.incr(f"llm_{step}_parse_failed")
+        return None
+    return data if accept(data) else None
+
+
+def _map(func: Callable[[_Account], Any], accounts: List[_Account], stage: str) -> List[_Account]:
+    """Run ``func`` for every account concurrently; return the accounts it succeeded for."""
+
+    def run(account: _Account) -> bool:
+        try:
+            func(account)
+            return True
+        except Exception as exc:
+            logger.exception("BulkRefresh %s %s ERROR: %s", stage, account.domain, exc)
+            metrics.incr(f"bulk_{stage}_failed")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, BULK_GATHER_WORKERS)) as executor:
+        ok = list(executor.map(run, accounts))
+    return [account for account, success in zip(accounts, ok) if success]
+
+
+def _body(model: str, prompt: str, schema: Type[BaseModel], **options: Any) -> Dict[str, Any]:
+    body: Dict[str, Any] = {"model": model, "messages": [{"role": "user", "content": prompt}], **options}
+    fmt = response_format(schema, model)
+    if fmt is not None:
+        body["response_format"] = fmt
+    return body
+
+
+def _run_batch(stage: str, lines: List[Dict[str, Any]], backend: Any) -> Dict[str, Optional[str]]:
+    """Run one stage's batch; if the job fails every answer is redone interactively."""
+    try:
+        return run_batch(lines, backend)
+    except Exception as exc:
+        logger.exception("BulkRefresh %s batch ERROR: %s", stage, exc)
+        metrics.incr(f"bulk_{stage}_batch_failed")
+        return {}
+
+
+def _redo(stage: str, account: _Account, func: Callable[[], Any]) -> Any:
+    metrics.incr(f"bulk_{stage}_interactive")
+    logger.info("BulkRefresh %s %s redone interactively", stage, account.domain)
+    return func()
+
+
+def _gather(store: ProfileStore, accounts: List[_Account]) -> List[_Account]:
+    unchanged = set()
+
+    def gather(account: _Account) -> None:
+        fresh = fetch_parts(store, account.profile, account.parts, extract=False)
+        if fresh is None:
+            unchanged.add(account.domain)
+        else:
+            account.fresh = fresh
+
+    done = _map(gather, accounts, "gather")
+    return [account for account in done if account.domain not in unchanged]
+
+
+def _extract(accounts: List[_Account], backend: Any) -> List[_Account]:
+    # freshly scraped sites only carry their HTML until extraction
+    pending = {
+        str(i): account
+        for i, account in enumerate(accounts)
+        if "site" in account.fresh and "company_name" not in account.fresh["site"]
+    }
+    model = models_for("extract")[0]
+    answers = _run_batch(
+        "extract",
+        [
+            batch_line(key, _body(model, scraper_agent.company_info_prompt(a.fresh["site"]["html"]), CompanyInfo, temperature=0))
+            for key, a in pending.items()
+        ],
+        backend,
+    )
+
+    def accept(data: Dict) -> bool:
+        return has_fields(data, scraper_agent.COMPANY_INFO_KEYS, required=scraper_agent.COMPANY_INFO_REQUIRED)
+
+    for key, account in pending.items():
+        info = _parse("extract", answers.get(key), CompanyInfo, accept)
+        if info is None:
+            info = _redo("extract", account, lambda: scraper_agent.extract_company_info(account.fresh["site"]["html"]))
+        account.fresh["site"].update(info)
+    return accounts
+
+
+def _analyze(accounts: List[_Account], backend: Any) -> List[_Account]:
+    start = time.perf_counter()
+    model = models_for("analysis")[0]
+    answers = _run_batch(
+        "analysis",
+        [
+            batch_line(
+                str(i),
+                _body(model, data_analyst_agent.make_prompt(account.scrape, account.linkedin, account.news), Analysis),
+            )
+            for i, account in enumerate(accounts)
+        ],
+        backend,
+    )
+    duration_ms = int((time.perf_counter() - start) * 1000)
+
+    def accept(data: Dict) -> bool:
+        return has_fields(data, data_analyst_agent.ANALYSIS_KEYS, required=data_analyst_agent.ANALYSIS_REQUIRED)
+
+    def finish(account: _Account, content: Optional[str]) -> None:
+        data = _parse("analysis", content, Analysis, accept)
+        if data is None:
+            account.analysis = _redo(
+                "analysis",
+                account,
+                lambda: data_analyst_agent.analyze_data(
+                    account.scrape, account.linkedin, account.company, news_data=account.news
+                ),
+            )
+        else:
+            account.analysis = data_analyst_agent.analysis_result(data, account.linkedin, account.news, duration_ms)
+
+    done = []
+    for i, account in enumerate(accounts):
+        try:
+            finish(account, answers.get(str(i)))
+            done.append(account)
+        except Exception as exc:
+            logger.exception("BulkRefresh analysis %s ERROR: %s", account.domain, exc)
+            metrics.incr("bulk_analysis_failed")
+    return done
+
+
+def _report(accounts: List[_Account], backend: Any) -> List[_Account]:
+    prompts: Dict[str, str] = {}
+
+    def prefetch(account: _Account) -> None:
+        analysis = json.loads(account.analysis.get("summary", "{}"))
+        context = reporter_agent.prefetch_context(analysis, account.company, account.analysis.get("news"))
+        prompts[account.domain] = reporter_agent.make_prompt(analysis, context, template=True)
+
+    accounts = _map(prefetch, accounts, "report")
+    model = models_for("report")[0]
+    answers = _run_batch(
+        "report",
+        [
+            batch_line(
+                str(i),
+                _body(model, prompts[account.domain], ReportSections, temperature=reporter_agent.REPORT_TEMPERATURE),
+            )
+            for i, account in enumerate(accounts)
+        ],
+        backend,
+    )
+    done = []
+    for i, account in enumerate(accounts):
+        content = answers.get(str(i))
+        try:
+            if content is None:
+                account.report = _redo(
+                    "report",
+                    account,
+                    lambda: reporter_agent.generate_report(
+                        account.analysis.get("summary", "{}"),
+                        prefetch=True,
+                        company=account.company,
+                        news=account.analysis.get("news"),
+                    ).get("html", ""),
+                )
+            else:
+                analysis = json.loads(account.analysis.get("summary", "{}"))
+                account.report = reporter_agent.render_sections(content, analysis, account.company)
+            done.append(account)
+        except Exception as exc:
+            logger.exception("BulkRefresh report %s ERROR: %s", account.domain, exc)
+            metrics.incr("bulk_report_failed")
+    return done
+
+
+def bulk_refresh(
+    store: Optional[ProfileStore] = None,
+    websites: Optional[List[str]] = None,
+    ttls: Optional[Dict[str, float]] = None,
+    limit: int = BULK_REFRESH_LIMIT,
+    backend: Any = None,
+    now: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Refresh stale profiles (or all parts of ``websites``) with batched LLM stages.
+
+    Returns ``{"domain", "parts"}`` for every profile that was saved.
+    ``backend`` defaults to :func:`~backend.utils.batch_client.make_backend`.
+    """
+    store = store or get_store()
+    step = "BulkRefresh"
+    start = time.perf_counter()
+    accounts: List[_Account] = []
+    if websites is not None:
+        candidates = [{"website": w, "stale_parts": list(REFRESH_TTLS)} for w in websites[:limit]]
+    else:
+        candidates = store.refresh_candidates(ttls or dict(REFRESH_TTLS), now, limit=limit)
+    for candidate in candidates:
+        profile = store.get(candidate["website"])
+        if profile is None:
+            continue
+        accounts.append(
+            _Account(
+                website=profile["website"],
+                domain=profile["domain"],
+                company=profile["company_name"] or profile["domain"],
+                profile=profile,
+                parts=candidate["stale_parts"],
+            )
+        )
+    logger.info("%s INPUT: %d profiles", step, len(accounts))
+
+    accounts = _gather(store, accounts)
+    accounts = _extract(accounts, backend)
+    accounts = _analyze(accounts, backend)
+    accounts = _report(accounts, backend)
+
+    refreshed = []
+    for account in accounts:
+        try:
+            store.update_parts(account.website, account.fresh, analysis=account.analysis, report=account.report)
+        except Exception as exc:
+            logger.exception("%s save %s ERROR: %s", step, account.domain, exc)
+            continue
+        refreshed.append({"domain": account.domain, "parts": sorted(account.fresh)})
+    duration_ms = int((time.perf_counter() - start) * 1000)
+    logger.info("%s OUTPUT (%d ms): %d profiles saved", step, duration_ms, len(refreshed))
+    return refreshed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh stale company profiles with batch LLM jobs")
+    parser.add_argument("--limit", type=int, default=BULK_REFRESH_LIMIT, help="maximum profiles to refresh")
+    parser.add_argument("--website", action="append", help="refresh all parts of this website (repeatable)")
+    args = parser.parse_args()
+    print(json.dumps(bulk_refresh(websites=args.website, limit=args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
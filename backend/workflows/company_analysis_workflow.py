@@ -1,8 +1,158 @@
 """Workflow that runs the full analysis pipeline."""
 
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
 from ..agents import run_pipeline
+from ..utils import normalize_domain
+from ..utils.logger import logger
+from ..utils.profile_store import FRESH, STALE, ProfileStore, company_key, freshness, get_store
+
+_refreshing: Set[str] = set()
+_refreshing_lock = threading.Lock()
+
+
+def _in_background(func: Callable[..., Any], *args: Any) -> None:
+    threading.Thread(target=func, args=args, daemon=True).start()
+
+
+def refresh(
+    website: str,
+    company: Optional[str] = None,
+    depth: int = 1,
+    store: Optional[ProfileStore] = None,
+    run_id: Optional[str] = None,
+) -> Dict[str, object]:
+    """Run the pipeline and save the result to the profile store.
+
+    ``run_id`` enables stage checkpoints so a retry resumes the run.
+    """
+    store = store or get_store()
+    result = run_pipeline(website, company, depth, run_id=run_id)
+    try:
+        store.save(website, result, company, depth)
+    except Exception as exc:  # a broken store must not fail the analysis
+        logger.warning("ProfileStore save failed for %s: %s", website, exc)
+    return result
+
+
+def _background_refresh(website: str, company: Optional[str], depth: int, store: ProfileStore) -> None:
+    domain = normalize_domain(website)
+    try:
+        refresh(website, company, depth, store)
+    except Exception as exc:
+        logger.warning("ProfileStore background refresh failed for %s: %s", domain, exc)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(domain)
+
+
+def _record_access(store: ProfileStore, website: str) -> None:
+    try:
+        store.record_access(website)
+    except Exception as exc:
+        logger.warning("ProfileStore access update failed for %s: %s", website, exc)
+
+
+def _from_profile(profile: Dict[str, Any], status: str) -> Dict[str, object]:
+    return {
+        "scrape": profile["scrape"],
+        "linkedin": profile["linkedin"],
+        "analysis": profile["analysis"],
+        "report": profile["report"],
+        "timings": profile["timings"],
+        "profile": {
+            "domain": profile["domain"],
+            "status": status,
+            "depth": profile["depth"],
+            "updated_at": profile["updated_at"],
+            "age_seconds": int(time.time() - profile["updated_at"]),
+        },
+    }
+
+
+MISSING = "missing"
+
+
+def _mismatch(profile: Dict[str, Any], company: Optional[str], depth: Optional[int]) -> Optional[str]:
+    if depth is not None and profile["depth"] < depth:
+        return f"stored depth {profile['depth']} < {depth}"
+    if company and company_key(company) != company_key(profile["company_name"] or ""):
+        return f"stored company {profile['company_name']!r} != {company!r}"
+    return None
+
+
+def lookup(
+    website: str,
+    max_age: Optional[float] = None,
+    store: Optional[ProfileStore] = None,
+    company: Optional[str] = None,
+    depth: Optional[int] = None,
+) -> Tuple[Optional[Dict[str, object]], str]:
+    """Return the stored analysis for ``website`` and its freshness.
+
+    The status is ``fresh``, ``stale``, ``expired`` or ``missing``; the
+    analysis is None when missing. A profile crawled shallower than
+    ``depth`` or saved under another ``company`` counts as missing.
+    Counts the lookup as an access.
+    """
+    store = store or get_store()
+    try:
+        profile = store.get(website)
+    except Exception as exc:
+        logger.warning("ProfileStore read failed for %s: %s", website, exc)
+        profile = None
+    if not profile:
+        return None, MISSING
+    reason = _mismatch(profile, company, depth)
+    if reason:
+        logger.info("ProfileStore MISS %s: %s", profile["domain"], reason)
+        return None, MISSING
+    _record_access(store, website)
+    status = freshness(profile, max_age, max_stale=max_age)
+    return _from_profile(profile, status), status
+
+
+def run(
+    website: str,
+    company: Optional[str] = None,
+    depth: int = 1,
+    max_age: Optional[float] = None,
+    schedule: Optional[Callable[..., Any]] = None,
+    store: Optional[ProfileStore] = None,
+) -> Dict[str, object]:
+    """Return the company analysis, from the profile store when possible.
 
+    Fresh profiles are returned directly. Stale ones are returned and
+    refreshed through ``schedule(func, *args)`` (a daemon thread by default).
+    Missing or expired profiles run the pipeline synchronously. ``max_age``
+    in seconds overrides the freshness policy; anything older is rerun.
+    """
+    store = store or get_store()
+    stored, status = lookup(website, max_age, store, company, depth)
+    if status == FRESH:
+        logger.info("ProfileStore HIT: %s", stored["profile"]["domain"])
+        return stored
+    if status == STALE:
+        domain = stored["profile"]["domain"]
+        with _refreshing_lock:
+            start = domain not in _refreshing
+            _refreshing.add(domain)
+        if start:
+            logger.info("ProfileStore STALE, refreshing in background: %s", domain)
+            # keep the stored crawl depth so the refresh never makes it shallower
+            depth = max(depth, stored["profile"]["depth"])
+            (schedule or _in_background)(_background_refresh, website, company, depth, store)
+        return stored
 
-def run(website: str) -> dict:
-    """Run analysis pipeline for the given website."""
-    return run_pipeline(website)
+    # the pipeline result is shared with concurrent callers of the same run
+    result = dict(refresh(website, company, depth, store))
+    _record_access(store, website)
+    result["profile"] = {
+        "domain": normalize_domain(website),
+        "status": "new",
+        "updated_at": time.time(),
+        "age_seconds": 0,
+    }
+    return result
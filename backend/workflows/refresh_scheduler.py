@@ -0,0 +1,266 @@
+"""Background refresh of stale company profiles.
+
+Each part of a stored profile has its own TTL: news (``brave_news``),
+LinkedIn (``orchestrate_linkedin``) and the website (``orchestrate_scraping``).
+The scheduler wakes up periodically, and during the off-peak window refreshes
+the stale parts of the most frequently requested profiles first, then re-runs
+the analysis and report. Provider calls are capped by an hourly budget.
+
+Run it next to the API with ``REFRESH_SCHEDULER=1`` or standalone::
+
+    python -m backend.workflows.refresh_scheduler
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..agents import analyze_data, generate_report, orchestrate_linkedin, orchestrate_scraping
+from ..tools import brave_news, host_scheduler
+from ..tools.sitemap import MAX_SITEMAP_URLS, changed_since, discover_sitemap_urls
+from ..utils import normalize_url
+from ..utils.logger import logger
+from ..utils.profile_store import ProfileStore, get_store
+
+REFRESH_TTLS = {
+    "news": float(os.getenv("REFRESH_TTL_NEWS", str(24 * 3600))),
+    "linkedin": float(os.getenv("REFRESH_TTL_LINKEDIN", str(14 * 24 * 3600))),
+    "site": float(os.getenv("REFRESH_TTL_SITE", str(30 * 24 * 3600))),
+}
+# Local hours "start-end" during which refreshes may run; empty means always
+REFRESH_WINDOW = os.getenv("REFRESH_WINDOW", "22-6")
+# Provider calls allowed per hour, e.g. "search=300,brave=200,openai=100"
+REFRESH_BUDGET = os.getenv("REFRESH_BUDGET", "search=300,brave=200,openai=100")
+REFRESH_INTERVAL_SECONDS = float(os.getenv("REFRESH_INTERVAL_SECONDS", "300"))
+REFRESH_SITE_DEPTH = int(os.getenv("REFRESH_SITE_DEPTH", "1"))
+
+# Approximate provider calls per refreshed part
+PART_COSTS: Dict[str, Dict[str, int]] = {
+    "news": {"brave": 1},
+    "linkedin": {"search": 3},
+    "site": {"openai": 1},
+    "analysis": {"openai": 2},
+}
+
+
+def parse_window(spec: str) -> Optional[tuple]:
+    """Parse ``"22-6"`` into ``(22, 6)``; empty means no restriction."""
+    if not spec.strip():
+        return None
+    start, _, end = spec.partition("-")
+    return int(start), int(end)
+
+
+def in_window(window: Optional[tuple], hour: int) -> bool:
+    """Return True if ``hour`` falls in ``window`` (which may wrap midnight)."""
+    if window is None:
+        return True
+    start, end = window
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class Budget:
+    """Hourly allowance of provider calls per provider group."""
+
+    def __init__(self, limits: Dict[str, int], period: float = 3600.0) -> None:
+        self.limits = limits
+        self.period = period
+        self._spent: Dict[str, int] = {}
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str) -> "Budget":
+        limits = {}
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            name, _, value = part.partition("=")
+            limits[name.strip()] = int(value)
+        return cls(limits)
+
+    def try_spend(self, cost: Dict[str, int]) -> bool:
+        """Reserve ``cost`` if it fits in the current period."""
+        with self._lock:
+            if time.monotonic() - self._started >= self.period:
+                self._spent.clear()
+                self._started = time.monotonic()
+            for name, amount in cost.items():
+                limit = self.limits.get(name)
+                if limit is not None and self._spent.get(name, 0) + amount > limit:
+                    return False
+            for name, amount in cost.items():
+                self._spent[name] = self._spent.get(name, 0) + amount
+            return True
+
+
+def _total_cost(parts: List[str]) -> Dict[str, int]:
+    total: Dict[str, int] = {}
+    for part in parts + ["analysis"]:
+        for name, amount in PART_COSTS[part].items():
+            total[name] = total.get(name, 0) + amount
+    return total
+
+
+def site_unchanged(profile: Dict[str, Any]) -> bool:
+    """Return True if the site's sitemap shows no page modified since the last crawl.
+
+    Sitemaps are found like :func:`crawl_site` does, through robots.txt
+    ``Sitemap:`` entries. Sites without sitemap ``lastmod`` dates, and
+    sitemaps cut at :data:`MAX_SITEMAP_URLS`, are treated as changed.
+    """
+    refreshed_at = profile["refreshed_at"].get("site")
+    if not refreshed_at:
+        return False
+    website = normalize_url(profile["website"])
+    sitemaps = host_scheduler.get_scheduler().robots(website).site_maps() or []
+    entries = discover_sitemap_urls(website, sitemaps)
+    return changed_since(entries, refreshed_at, complete=len(entries) < MAX_SITEMAP_URLS) is False
+
+
+def fetch_parts(
+    store: ProfileStore,
+    profile: Dict[str, Any],
+    parts: List[str],
+    extract: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """Fetch the stale ``parts`` of ``profile`` without re-running the analysis.
+
+    Returns ``None`` when nothing needs a new analysis: only the site was
+    stale and its sitemap is unchanged, so just its timestamp is bumped.
+    ``extract`` is forwarded to :func:`orchestrate_scraping`.
+    """
+    company = profile["company_name"] or profile["domain"]
+    fresh: Dict[str, Any] = {}
+    if "site" in parts and site_unchanged(profile):
+        logger.info("RefreshScheduler %s site unchanged since last crawl", profile["domain"])
+        parts = [p for p in parts if p != "site"]
+        if not parts:
+            # only bump the timestamp; analysis inputs are the same
+            store.update_parts(profile["website"], {"site": profile["scrape"]})
+            return None
+        fresh["site"] = profile["scrape"]
+    elif "site" in parts:
+        # never crawl shallower than the stored scrape, which lookups rely on
+        depth = max(REFRESH_SITE_DEPTH, profile.get("depth") or 0)
+        fresh["site"] = orchestrate_scraping(profile["website"], depth, extract=extract)
+    if "linkedin" in parts:
+        fresh["linkedin"] = orchestrate_linkedin(company, contacts=True)
+    if "news" in parts:
+        fresh["news"] = brave_news(company)
+    return fresh
+
+
+def refresh_profile(store: ProfileStore, website: str, parts: List[str]) -> Dict[str, Any]:
+    """Refresh ``parts`` of the stored profile, then re-run analysis and report."""
+    profile = store.get(website)
+    if profile is None:
+        return {}
+    company = profile["company_name"] or profile["domain"]
+    fresh = fetch_parts(store, profile, parts)
+    if fresh is None:
+        return {}
+
+    scrape = fresh.get("site", profile["scrape"])
+    linkedin = fresh.get("linkedin", profile["linkedin"])
+    news = fresh.get("news", profile["news"] or {"news": []})
+    analysis = analyze_data(scrape, linkedin, company, news_data=news)
+    report = generate_report(
+        analysis.get("summary", "{}"),
+        prefetch=True,
+        company=company,
+        news=analysis.get("news"),
+    )
+    store.update_parts(website, fresh, analysis=analysis, report=report.get("html", ""))
+    return fresh
+
+
+class RefreshScheduler:
+    """Periodically refresh stale profiles within the off-peak window and budget."""
+
+    def __init__(
+        self,
+        store: Optional[ProfileStore] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        window: Optional[tuple] = parse_window(REFRESH_WINDOW),
+        budget: Optional[Budget] = None,
+        interval: float = REFRESH_INTERVAL_SECONDS,
+    ) -> None:
+        self.store = store or get_store()
+        self.ttls = ttls or dict(REFRESH_TTLS)
+        self.window = window
+        self.budget = budget or Budget.parse(REFRESH_BUDGET)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Refresh as many stale profiles as the window and budget allow."""
+        now = now or time.time()
+        if not in_window(self.window, time.localtime(now).tm_hour):
+            return []
+        refreshed = []
+        for candidate in self.store.refresh_candidates(self.ttls, now):
+            if self._stop.is_set():
+                break
+            parts = candidate["stale_parts"]
+            if not self.budget.try_spend(_total_cost(parts)):
+                logger.info("RefreshScheduler budget exhausted")
+                break
+            step = f"RefreshScheduler {candidate['domain']}"
+            logger.info("%s INPUT: %s", step, parts)
+            start = time.perf_counter()
+            try:
+                refresh_profile(self.store, candidate["website"], parts)
+            except Exception as exc:
+                logger.exception("%s ERROR: %s", step, exc)
+                continue
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            logger.info("%s OUTPUT (%d ms)", step, duration_ms)
+            refreshed.append({"domain": candidate["domain"], "parts": parts})
+        return refreshed
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:
+                logger.exception("RefreshScheduler ERROR: %s", exc)
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh stale company profiles")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--ignore-window", action="store_true", help="run outside the off-peak window")
+    args = parser.parse_args()
+    scheduler = RefreshScheduler(window=None if args.ignore_window else parse_window(REFRESH_WINDOW))
+    if args.once:
+        print(json.dumps(scheduler.run_once(), indent=2))
+        return
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
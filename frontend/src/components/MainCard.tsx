@@ -2,6 +2,24 @@ import React, { useState } from 'react';
 import ConnectionPopup from './ConnectionPopup';
 import PipelineProgress, { Step } from './PipelineProgress';
 
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_POLL_TIMEOUT_MS = 15 * 60 * 1000;
+
+// In queue mode /analyze answers 202 with a job id; poll until it finishes
+const waitForJob = async (jobId: string) => {
+  const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    const res = await fetch(`/jobs/${jobId}/result`);
+    const data = await res.json();
+    if (res.status === 202) continue;
+    // HTTPException responses carry the message in `detail`
+    if (!res.ok) throw new Error(data.detail || data.error || 'analyze failed');
+    return data;
+  }
+  throw new Error('analyze timed out');
+};
+
 export default function MainCard() {
   const [query, setQuery] = useState('');
   const [company, setCompany] = useState('');
@@ -115,8 +133,9 @@ export default function MainCard() {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ website: query, company: company || null })
       });
-      const data = await res.json();
+      let data = await res.json();
       if (!res.ok) throw new Error(data.error || 'analyze failed');
+      if (res.status === 202 && data.job_id) data = await waitForJob(data.job_id);
       setResult(data.report || data.analysis?.summary || '');
       update(3, { status: 'success', duration: performance.now() - s3 });
     } catch (err: any) {
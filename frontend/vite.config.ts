@@ -10,7 +10,8 @@ export default defineConfig({
       '/analyze': 'http://localhost:8000',
       '/scrape': 'http://localhost:8000',
       '/find_linkedin': 'http://localhost:8000',
-      '/check_internet': 'http://localhost:8000'
+      '/check_internet': 'http://localhost:8000',
+      '/jobs': 'http://localhost:8000'
     }
   }
 });